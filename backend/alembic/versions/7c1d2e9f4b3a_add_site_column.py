@@ -0,0 +1,41 @@
+"""add site column and make (site, timestamp) unique
+
+Revision ID: 7c1d2e9f4b3a
+Revises: 3ae937608294
+Create Date: 2026-10-17 09:12:41.530218
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1d2e9f4b3a"
+down_revision: Union[str, Sequence[str], None] = "3ae937608294"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("weather") as batch_op:
+        batch_op.add_column(
+            sa.Column("site", sa.String, nullable=False, server_default="default")
+        )
+        batch_op.drop_constraint("timestamp_is_unique", type_="unique")
+        batch_op.create_unique_constraint(
+            "site_timestamp_is_unique", ["site", "timestamp"]
+        )
+        batch_op.create_index("ix_weather_site", ["site"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("weather") as batch_op:
+        batch_op.drop_index("ix_weather_site")
+        batch_op.drop_constraint("site_timestamp_is_unique", type_="unique")
+        batch_op.create_unique_constraint("timestamp_is_unique", ["timestamp"])
+        batch_op.drop_column("site")
@@ -0,0 +1,51 @@
+"""add weather forecast table
+
+Revision ID: a7d3e9b2c5f1
+Revises: f6c2a8e5b4d0
+Create Date: 2026-10-17 16:22:09.541870
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d3e9b2c5f1"
+down_revision: Union[str, Sequence[str], None] = "f6c2a8e5b4d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "weather_forecast",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("site", sa.String, nullable=False),
+        sa.Column("issued_at", sa.DateTime, nullable=False),
+        sa.Column("resolution", sa.String, nullable=False),
+        sa.Column("target_time", sa.DateTime, nullable=False),
+        sa.Column("temperature_k", sa.Float, nullable=False),
+        sa.Column("pressure_pa", sa.Float, nullable=False),
+        sa.Column("humidity_percent", sa.Float, nullable=False),
+        sa.Column("dew_point_k", sa.Float, nullable=False),
+        sa.Column("wind_speed_m_s", sa.Float, nullable=False),
+        sa.Column("wind_deg", sa.Integer, nullable=False),
+        sa.Column("wind_gust_m_s", sa.Float, nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime, default=datetime.now, server_default=sa.func.now()
+        ),
+        sa.UniqueConstraint(
+            "site", "issued_at", "resolution", "target_time",
+            name="weather_forecast_key_is_unique",
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("weather_forecast")
@@ -0,0 +1,58 @@
+"""add simulation table
+
+Revision ID: b5e8a1c4d2f7
+Revises: 7c1d2e9f4b3a
+Create Date: 2026-10-17 10:03:18.204511
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e8a1c4d2f7"
+down_revision: Union[str, Sequence[str], None] = "7c1d2e9f4b3a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "simulation",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("site", sa.String, nullable=False),
+        sa.Column("timestamp", sa.DateTime, nullable=False),
+        sa.Column("air_density_kg_m3", sa.Float, nullable=False),
+        sa.Column("turbine_power_w", sa.Float, nullable=False),
+        sa.Column("stack_power_w", sa.Float, nullable=False),
+        sa.Column("stack_current_a", sa.Float, nullable=False),
+        sa.Column("cell_voltage_v", sa.Float, nullable=False),
+        sa.Column("h2_kg_h", sa.Float, nullable=False),
+        sa.Column("efficiency", sa.Float, nullable=False),
+        sa.Column("heat_w", sa.Float, nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime, default=datetime.now, server_default=sa.func.now()
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime, default=datetime.now, server_default=sa.func.now()
+        ),
+        sa.UniqueConstraint(
+            "site", "timestamp", name="simulation_site_timestamp_is_unique"
+        ),
+        sa.ForeignKeyConstraint(
+            ["site", "timestamp"],
+            ["weather.site", "weather.timestamp"],
+            name="simulation_weather_fk",
+            ondelete="CASCADE",
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("simulation")
@@ -0,0 +1,38 @@
+"""add covered hours to the weather rollups
+
+Revision ID: c3f8d5a1e7b9
+Revises: a7d3e9b2c5f1
+Create Date: 2026-10-17 20:41:17.203954
+
+Energy and yield are now integrated over the rows' sample intervals; rebuild
+the rollups after upgrading (`uv run src/rollups.py`) to fill the column and
+correct partly filled buckets.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f8d5a1e7b9"
+down_revision: Union[str, Sequence[str], None] = "a7d3e9b2c5f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("weather_rollup_hourly", "weather_rollup_daily")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("covered_hours", sa.Float, nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("covered_hours")
@@ -0,0 +1,28 @@
+"""add (timestamp, id) index for keyset pagination
+
+Revision ID: d9f3c6a2e8b1
+Revises: b5e8a1c4d2f7
+Create Date: 2026-10-17 11:26:02.771934
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d9f3c6a2e8b1"
+down_revision: Union[str, Sequence[str], None] = "b5e8a1c4d2f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_weather_timestamp_id", "weather", ["timestamp", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_weather_timestamp_id", table_name="weather")
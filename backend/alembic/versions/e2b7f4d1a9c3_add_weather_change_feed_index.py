@@ -0,0 +1,30 @@
+"""add (site, updated_at, id) index for incremental dashboard fetches
+
+Revision ID: e2b7f4d1a9c3
+Revises: d9f3c6a2e8b1
+Create Date: 2026-10-17 12:48:37.105262
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b7f4d1a9c3"
+down_revision: Union[str, Sequence[str], None] = "d9f3c6a2e8b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_weather_site_updated_at_id", "weather", ["site", "updated_at", "id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_weather_site_updated_at_id", table_name="weather")
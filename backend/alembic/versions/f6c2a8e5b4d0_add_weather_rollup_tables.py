@@ -0,0 +1,67 @@
+"""add hourly and daily weather rollup tables
+
+Revision ID: f6c2a8e5b4d0
+Revises: e2b7f4d1a9c3
+Create Date: 2026-10-17 14:05:51.318640
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f6c2a8e5b4d0"
+down_revision: Union[str, Sequence[str], None] = "e2b7f4d1a9c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+WEATHER_FIELDS = {
+    "temperature_k": False,  # nullable
+    "pressure_pa": False,
+    "humidity_percent": False,
+    "dew_point_k": False,
+    "wind_speed_m_s": False,
+    "wind_deg": False,
+    "wind_gust_m_s": True,
+    "turbine_power_w": True,
+}
+
+
+def rollup_columns() -> list[sa.Column]:
+    stats = [
+        sa.Column(f"{name}_{stat}", sa.Float, nullable=nullable)
+        for name, nullable in WEATHER_FIELDS.items()
+        for stat in ("min", "mean", "max")
+    ]
+    return [
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("site", sa.String, nullable=False),
+        sa.Column("bucket", sa.DateTime, nullable=False),
+        sa.Column("count", sa.Integer, nullable=False),
+        *stats,
+        sa.Column("turbine_energy_wh", sa.Float, nullable=True),
+        sa.Column("h2_kg", sa.Float, nullable=True),
+        sa.Column(
+            "updated_at", sa.DateTime, default=datetime.now, server_default=sa.func.now()
+        ),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("weather_rollup_hourly", "weather_rollup_daily"):
+        op.create_table(
+            table,
+            *rollup_columns(),
+            sa.UniqueConstraint("site", "bucket", name=f"{table}_site_bucket_is_unique"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("weather_rollup_daily")
+    op.drop_table("weather_rollup_hourly")
@@ -0,0 +1,77 @@
+"""Benchmark the scalar vs. the array path of air density and turbine power.
+
+Run from the backend folder:
+
+    uv run benchmarks/air_wind.py --rows 1000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from models.air import AirState, weather_air_density  # noqa: E402
+from models.wind import WindTurbineModel, fleet_power_output_watts  # noqa: E402
+
+
+def synthetic_weather(rows: int, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {
+        "temperature_k": rng.uniform(260, 310, rows),
+        "pressure_pa": rng.uniform(97_000, 104_000, rows),
+        "humidity_percent": rng.uniform(20, 100, rows),
+        "wind_speed_m_s": rng.weibull(2.0, rows) * 7,
+    }
+
+
+def scalar_path(weather: dict[str, np.ndarray], turbine: WindTurbineModel) -> np.ndarray:
+    power = np.empty(len(weather["wind_speed_m_s"]))
+    for i, (t, p, h, v) in enumerate(
+        zip(
+            weather["temperature_k"].tolist(),
+            weather["pressure_pa"].tolist(),
+            weather["humidity_percent"].tolist(),
+            weather["wind_speed_m_s"].tolist(),
+        )
+    ):
+        air = AirState(temperature_c=t - 273.15, pressure_pa=p, relative_humidity=h / 100)
+        power[i] = turbine.power_output_watts(v, air.density_kg_m3)
+    return power
+
+
+def array_path(weather: dict[str, np.ndarray], turbine: WindTurbineModel) -> np.ndarray:
+    density = weather_air_density(
+        weather["temperature_k"], weather["pressure_pa"], weather["humidity_percent"]
+    )
+    return fleet_power_output_watts([turbine], weather["wind_speed_m_s"], density)[:, 0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    turbine = WindTurbineModel(rotor_diameter_m=40, power_coefficient=0.4)
+    weather = synthetic_weather(args.rows)
+
+    start = time.perf_counter()
+    expected = scalar_path(weather, turbine)
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = array_path(weather, turbine)
+    array_s = time.perf_counter() - start
+
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+    print(f"rows:   {args.rows:>12,}")
+    print(f"scalar: {scalar_s:>12.3f} s")
+    print(f"array:  {array_s:>12.3f} s")
+    print(f"speedup: {scalar_s / array_s:>11.0f}x")
+
+
+if __name__ == "__main__":
+    main()
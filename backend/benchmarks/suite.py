@@ -0,0 +1,469 @@
+"""Benchmark suite of the physics, ETL, API and dashboard hot paths.
+
+Run from the backend folder:
+
+    uv run benchmarks/suite.py                       # writes results/<commit>.json
+    uv run benchmarks/suite.py --filter api --quick  # subset, smallest sizes only
+    uv run benchmarks/suite.py --compare results/abc1234.json
+    uv run benchmarks/suite.py --compare results/abc1234.json results/def5678.json
+
+Cases are timed asv-style: after a warm-up call, each repeat calls the case
+`number` times, with `number` grown until a repeat lasts MIN_REPEAT_S, and
+the median time per call is reported. Cases slower than MAX_CASE_S / REPEAT
+are repeated fewer times. `--compare` flags every case whose
+median grew by more than the threshold, and exits with status 1 if any did.
+The dashboard cases need the viz dependency group and are skipped without it.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND / "src"))
+sys.path.append(str(BACKEND.parent / "frontend" / "src"))  # after src: both have a main.py
+# the application modules read their settings at import time
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+# no background refreshes of the dashboard window while timing
+os.environ.setdefault("DASH_UPDATE_INTERVAL_MS", str(24 * 3600 * 1000))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from loguru import logger  # noqa: E402
+from sqlalchemy import Engine, create_engine, select  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+import api  # noqa: E402
+from config import settings  # noqa: E402
+from database import configure_sqlite, frame_to_records, upsert_records  # noqa: E402
+from db_models.weather import WEATHER_KEY  # noqa: E402
+from dispatch import dispatch_stacks  # noqa: E402
+from etl import load_weather_frames, simulate_weather_rows  # noqa: E402
+from main import StackParameters, generate_lut  # noqa: E402
+from models.air import calc_humid_air_density  # noqa: E402
+from models.wind import WindTurbineModel  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+from scenarios import run_scenarios, sample_scenarios  # noqa: E402
+from thermal import simulate_weather_thermal  # noqa: E402
+from synthetic import START, STEP, seed_database, weather_frame  # noqa: E402
+
+try:
+    import weather_feed
+except ImportError:  # the viz dependency group is not installed
+    weather_feed = None
+
+RESULTS_DIR = BACKEND / "benchmarks" / "results"
+MIN_REPEAT_S = 0.2
+REPEAT = 5
+MAX_CASE_S = 60.0  # slow cases are repeated fewer times
+THRESHOLD = 0.10  # relative slowdown reported as a regression
+
+Case = Callable[[], object]
+Setup = Callable[[int | None, Path], Case | None]
+
+BENCHMARKS: dict[str, tuple[Setup, list[int | None]]] = {}
+
+
+def benchmark(*params: int):
+    """Register `bench_<name>(param, workdir)`, which returns the timed callable.
+
+    The setup runs once per parameter, outside the timing. It returns None to
+    skip the case.
+    """
+
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[setup.__name__.removeprefix("bench_")] = (setup, list(params) or [None])
+        return setup
+
+    return register
+
+
+# --- physics ---
+
+
+@benchmark()
+def bench_generate_lut(param, workdir):
+    return generate_lut
+
+
+@benchmark(1, 1_000, 100_000)
+def bench_humid_air_density(rows, workdir):
+    weather = weather_frame(rows)
+    temperature_c = weather["temperature_k"].to_numpy() - 273.15
+    pressure_pa = weather["pressure_pa"].to_numpy()
+    humidity = weather["humidity_percent"].to_numpy() / 100
+    return lambda: calc_humid_air_density(temperature_c, pressure_pa, humidity)
+
+
+@benchmark(1, 1_000, 100_000)
+def bench_turbine_power(rows, workdir):
+    turbine = WindTurbineModel(rotor_diameter_m=40, power_coefficient=0.4)
+    wind_speed = weather_frame(rows)["wind_speed_m_s"].to_numpy()
+    density = np.full(rows, 1.225)
+    return lambda: turbine.power_output_watts(wind_speed, density)
+
+
+@benchmark(1, 3)
+def bench_thermal(years, workdir):
+    """One stack with temperature and ageing over years of 5-minute weather."""
+    weather = weather_frame(years * 105_120)
+    return lambda: simulate_weather_thermal(weather)
+
+
+@benchmark(4, 32)
+def bench_dispatch(stacks, workdir):
+    """A year of 5-minute turbine power shared by a plant of stacks."""
+    turbine = WindTurbineModel(rotor_diameter_m=40 * np.sqrt(stacks), power_coefficient=0.4)
+    weather = weather_frame(105_120)
+    power = turbine.power_output_watts(weather["wind_speed_m_s"].to_numpy(), 1.225)
+    hours = np.full(len(power), STEP.total_seconds() / 3600)
+    return lambda: dispatch_stacks(power, hours, [StackParameters()] * stacks)
+
+
+# --- ETL ---
+
+
+@benchmark(1_000, 100_000)
+def bench_simulate(rows, workdir):
+    weather = weather_frame(rows)
+    return lambda: simulate_weather_rows(weather)
+
+
+@benchmark(1, 2, 4)
+def bench_scenarios(workers, workdir):
+    # a week of 5-minute weather; with enough cores the time halves per doubling
+    # of workers, plus the start-up of the spawned processes
+    weather = weather_frame(2_016)
+    scenarios = sample_scenarios(2_048, seed=0)
+    return lambda: run_scenarios(weather, scenarios, workers)
+
+
+@benchmark(1, 1_000, 100_000)
+def bench_etl_load(rows, workdir):
+    """Insert `rows` new weather and simulation rows, rollups included."""
+    engine = create_engine(f"sqlite+pysqlite:///{workdir / f'load-{rows}.db'}")
+    SQLModel.metadata.create_all(engine)
+    weather = weather_frame(rows)
+    simulation = simulate_weather_rows(weather)
+    span = (weather["timestamp"].iloc[-1] - weather["timestamp"].iloc[0]) + STEP
+    calls = iter(range(1_000_000))
+
+    def load():
+        # every call inserts: the rows move past the ones already loaded
+        offset = span * next(calls)
+        load_weather_frames(
+            engine,
+            weather.assign(timestamp=weather["timestamp"] + offset),
+            simulation.assign(timestamp=simulation["timestamp"] + offset),
+        )
+
+    return load
+
+
+# --- SQLite concurrency ---
+# The ETL writes while the API and the dashboard read. A call is a fixed
+# amount of work: WRITE_BATCHES upserts in one thread and READ_QUERIES
+# window queries in each of the reader threads, so the time is inverse to
+# the mixed throughput. Compare the default journal with the WAL profile.
+
+WRITE_BATCHES = 10
+WRITE_BATCH_ROWS = 500
+READ_QUERIES = 20
+READ_ROWS = 2_000  # the dashboard window
+SEED_ROWS = 10_000
+
+
+def mixed_workload(writer: Engine, reader: Engine, readers: int) -> Case:
+    seed_database(writer, SEED_ROWS)
+    weather = weather_frame(WRITE_BATCHES * WRITE_BATCH_ROWS, start=START + SEED_ROWS * STEP)
+    span = weather["timestamp"].iloc[-1] - weather["timestamp"].iloc[0] + STEP
+    table = api.WEATHER_TABLE
+    window = select(table).order_by(table.c.timestamp.desc()).limit(READ_ROWS)
+    calls = iter(range(1_000_000))
+
+    def write(offset):
+        records = frame_to_records(weather.assign(timestamp=weather["timestamp"] + offset))
+        for i in range(0, len(records), WRITE_BATCH_ROWS):
+            upsert_records(writer, table, records[i : i + WRITE_BATCH_ROWS], WEATHER_KEY)
+
+    def read():
+        for _ in range(READ_QUERIES):
+            with reader.connect() as conn:
+                conn.execute(window).all()
+
+    def run():
+        # every call inserts: the rows move past the ones already written
+        threads = [threading.Thread(target=write, args=(span * next(calls),))]
+        threads += [threading.Thread(target=read) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return run
+
+
+@benchmark(1, 4)
+def bench_sqlite_mixed_default(readers, workdir):
+    """Default rollback journal, as `create_engine` opens the file."""
+    engine = create_engine(f"sqlite+pysqlite:///{workdir / f'mixed-default-{readers}.db'}")
+    return mixed_workload(engine, engine, readers)
+
+
+@benchmark(1, 4)
+def bench_sqlite_mixed_wal(readers, workdir):
+    """WAL profile, with a separate read-only pool as used by the API."""
+    url = f"sqlite+pysqlite:///{workdir / f'mixed-wal-{readers}.db'}"
+    writer = configure_sqlite(create_engine(url))
+    reader = configure_sqlite(create_engine(url), read_only=True)
+    return mixed_workload(writer, reader, readers)
+
+
+# --- API ---
+
+
+def api_client(rows: int, workdir: Path) -> TestClient:
+    engine = create_engine(f"sqlite+pysqlite:///{workdir / f'api-{rows}.db'}")
+    seed_database(engine, rows)
+    api.get_read_engine = lambda: engine
+    api.RESPONSE_CACHE = ResponseCache(0)  # time the queries, not the cache
+    settings.ARCHIVE_DIR = str(workdir / "archive")
+    return TestClient(api.app)
+
+
+@benchmark(1_000, 10_000, 100_000)
+def bench_api_weather_page(rows, workdir):
+    """A JSON page of PAGE_SIZE rows from the middle of the table."""
+    client = api_client(rows, workdir)
+    with api.get_read_engine().connect() as conn:
+        query = select(api.WEATHER_TABLE.c.timestamp, api.WEATHER_TABLE.c.id)
+        middle = conn.execute(query.order_by("timestamp", "id").offset(rows // 2)).first()
+    params = {"after_timestamp": middle.timestamp.isoformat(), "after_id": middle.id}
+    return lambda: client.get("/weather/", params=params).raise_for_status()
+
+
+@benchmark(10_000, 100_000)
+def bench_api_weather_revalidate(rows, workdir):
+    """A polling client repeating a JSON page request, answered with a 304."""
+    client = api_client(rows, workdir)
+    etag = client.get("/weather/").raise_for_status().headers["etag"]
+
+    def revalidate():
+        response = client.get("/weather/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    return revalidate
+
+
+@benchmark(10_000, 100_000)
+def bench_api_weather_cached(rows, workdir):
+    """A JSON page another client asked for before, served from the cache."""
+    client = api_client(rows, workdir)
+    api.RESPONSE_CACHE = ResponseCache(settings.API_CACHE_MAX_BYTES)
+    return lambda: client.get("/weather/").raise_for_status()
+
+
+@benchmark(1_000, 10_000, 100_000)
+def bench_api_weather_ndjson(rows, workdir):
+    """The whole table, streamed as NDJSON."""
+    client = api_client(rows, workdir)
+    return lambda: client.get("/weather/", params={"format": "ndjson"}).raise_for_status()
+
+
+# --- dashboard ---
+# update_weather_data and update_graph became the shared window and the
+# clientside callbacks; these time the server side that replaced them.
+
+
+def dashboard_engine(rows: int, workdir: Path):
+    engine = create_engine(f"sqlite+pysqlite:///{workdir / f'dash-{rows}.db'}")
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    seed_database(engine, rows, start=now - rows * STEP)
+    weather_feed.ENGINE = engine
+    return engine
+
+
+@benchmark(10_000, 100_000)
+def bench_dashboard_initial_fetch(rows, workdir):
+    if weather_feed is None:
+        return None
+    dashboard_engine(rows, workdir)
+    cursor = {"updated_at": None, "id": None, "last_x": None}
+    return lambda: weather_feed.fetch_weather_data(cursor)
+
+
+@benchmark(10_000, 100_000)
+def bench_dashboard_incremental_fetch(rows, workdir):
+    """Fetch of the last 500 rows written, as after a refresh interval."""
+    if weather_feed is None:
+        return None
+    engine = dashboard_engine(rows, workdir)
+    with engine.connect() as conn:
+        updated_at, last_id = conn.execute(weather_feed.LATEST_ROW_QUERY, {"site": "default"}).one()
+    cursor = {"updated_at": str(updated_at), "id": last_id - 500, "last_x": None}
+    return lambda: weather_feed.fetch_weather_data(cursor)
+
+
+@benchmark()
+def bench_dashboard_figure(param, workdir):
+    """Event payload and prefilled figure of a full window."""
+    if weather_feed is None:
+        return None
+    dashboard_engine(weather_feed.MAX_POINTS, workdir)
+    import dash_chart  # builds the app, which loads its window, on import
+
+    window = weather_feed.WeatherWindow()
+    window.refresh()
+
+    def render():
+        weather_feed.event_payload(window.rows_since(0), window.max_points)
+        dash_chart.create_figure(window)
+
+    return render
+
+
+# --- runner ---
+
+
+def time_case(case: Case, repeat: int = REPEAT, min_repeat_s: float = MIN_REPEAT_S) -> dict:
+    start = time.perf_counter()
+    case()  # warm-up
+    warmup_s = time.perf_counter() - start
+    repeat = max(1, min(repeat, int(MAX_CASE_S / warmup_s)))
+    number, times = 1, []
+    while len(times) < repeat:
+        start = time.perf_counter()
+        for _ in range(number):
+            case()
+        elapsed = time.perf_counter() - start
+        if not times and elapsed < min_repeat_s and number < 1_000_000:
+            number *= 10
+            continue
+        times.append(elapsed / number)
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run_suite(pattern: str | None = None, quick: bool = False) -> dict[str, dict]:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (setup, params) in BENCHMARKS.items():
+            if pattern and pattern not in name:
+                continue
+            for param in params[:1] if quick else params:
+                key = name if param is None else f"{name}[{param}]"
+                case = setup(param, Path(tmp))
+                if case is None:
+                    print(f"{key:<40} skipped")
+                    continue
+                results[key] = time_case(case, repeat=2 if quick else REPEAT)
+                print(f"{key:<40} {format_time(results[key]['median_s'])}")
+    return results
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=BACKEND,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True, cwd=BACKEND,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def save_results(results: dict[str, dict], path: Path | None = None) -> Path:
+    commit = git_commit()
+    path = path or RESULTS_DIR / f"{commit}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    return path
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def compare(base: dict, head: dict, threshold: float = THRESHOLD) -> list[str]:
+    """Print the median of each case in both runs; return the regressions."""
+    regressions = []
+    print(f"{'case':<40} {base['commit']:>11} {head['commit']:>11}  ratio")
+    for key in sorted(base["results"].keys() | head["results"].keys()):
+        if key not in base["results"] or key not in head["results"]:
+            print(f"{key:<40} only in {'head' if key in head['results'] else 'base'}")
+            continue
+        before = base["results"][key]["median_s"]
+        after = head["results"][key]["median_s"]
+        ratio = after / before
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 / (1 + threshold):
+            flag = "  faster"
+        print(f"{key:<40} {format_time(before)} {format_time(after)}  {ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", help="Only run the cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="Smallest size of each case only")
+    parser.add_argument("--output", type=Path, help="Default: results/<commit>.json")
+    parser.add_argument(
+        "--compare", nargs="+", type=Path, metavar="RESULTS",
+        help="Compare BASE with HEAD, or with a new run if HEAD is omitted",
+    )
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes at most two result files")
+    if args.compare and len(args.compare) == 2:
+        base, head = (json.loads(path.read_text()) for path in args.compare)
+    else:
+        results = run_suite(args.filter, args.quick)
+        path = save_results(results, args.output)
+        print(f"Results written to {path}")
+        if not args.compare:
+            return
+        base, head = json.loads(args.compare[0].read_text()), json.loads(path.read_text())
+
+    if compare(base, head, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
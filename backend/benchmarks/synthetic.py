@@ -0,0 +1,50 @@
+"""Synthetic weather data for the benchmarks.
+
+Rows look like the output of `etl.transform_weather_data`: one row per site
+and timestamp, 5 minutes apart, with plausible weather values. The same seed
+always gives the same rows, so timings of different commits are comparable.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Engine
+from sqlmodel import SQLModel
+
+from etl import load_weather_frames, simulate_weather_rows
+from rollups import rebuild_rollups
+
+START = datetime(2026, 1, 1)
+STEP = timedelta(minutes=5)
+
+
+def weather_frame(
+    rows: int, sites: int = 1, start: datetime = START, seed: int = 0
+) -> pd.DataFrame:
+    """`rows` weather rows, spread round-robin over `sites` sites."""
+    rng = np.random.default_rng(seed)
+    steps = np.arange(rows) // sites
+    return pd.DataFrame(
+        {
+            "site": [f"site-{i % sites}" if sites > 1 else "default" for i in range(rows)],
+            "timestamp": pd.to_datetime(start) + steps * pd.Timedelta(STEP),
+            "temperature_k": rng.uniform(260, 310, rows),
+            "pressure_pa": rng.uniform(97_000, 104_000, rows),
+            "humidity_percent": rng.uniform(20, 100, rows),
+            "dew_point_k": rng.uniform(250, 290, rows),
+            "wind_speed_m_s": rng.weibull(2.0, rows) * 7,
+            "wind_deg": rng.integers(0, 360, rows),
+            "wind_gust_m_s": np.where(rng.random(rows) < 0.3, rng.weibull(2.0, rows) * 10, np.nan),
+        }
+    )
+
+
+def seed_database(
+    engine: Engine, rows: int, sites: int = 1, start: datetime = START
+) -> None:
+    """Fill an empty database with `rows` weather rows and their simulation."""
+    SQLModel.metadata.create_all(engine)
+    weather = weather_frame(rows, sites, start)
+    load_weather_frames(engine, weather, simulate_weather_rows(weather))
+    rebuild_rollups(engine)
@@ -1,23 +1,639 @@
-from datetime import datetime
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from enum import StrEnum
+from itertools import chain
 
-from fastapi import FastAPI
+import numpy as np
+import pyarrow as pa
+import sqlalchemy as sa
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from sqlmodel import Session, select
+from archive import iter_archive
+from config import settings
+from db_models.rollup import ROLLUP_WEATHER_FIELDS, DailyWeatherRollup, HourlyWeatherRollup
+from db_models.simulation import Simulation
 from db_models.weather import Weather
-from database import engine
+from database import create_db_and_tables, get_read_engine
+from forecast import PROJECTION_HOURS, latest_forecast, project_forecast, projection_totals
+from metrics import API_CACHE_REQUESTS, API_REQUEST_SECONDS, API_ROWS, span
+from queries import BUCKET_SECONDS, bucket_bounds, from_epoch, numeric_columns, time_bucket
+from response_cache import (
+    CachedResponse,
+    ResponseCache,
+    data_version,
+    is_not_modified,
+    query_key,
+    validators,
+)
+from simulation import SIMULATION_COLUMNS
+from sites import DEFAULT_SITE_NAME
+from streaming import MEDIA_TYPES, SERIALIZERS
+from timeseries import InterpolationMethod, Resampler, TrapezoidIntegrator, lttb
 
+PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10_000
+STREAM_BATCH_SIZE = 5000  # rows fetched from the server-side cursor at a time
 
-app = FastAPI()
+MAX_LTTB_POINTS = 10_000
+MAX_AGGREGATE_BUCKETS = 2000  # for automatic bucket widths
+MAX_RESAMPLED_POINTS = 100_000
+MAX_GAP_MINUTES = 15.0  # three missed 5-minute polls are still filled
 
+WEATHER_TABLE: sa.Table = Weather.__table__  # type: ignore[assignment]
+SIMULATION_TABLE: sa.Table = Simulation.__table__  # type: ignore[assignment]
+# archived simulation rows keep the created_at and updated_at of their weather row, but no id
+SIMULATION_ARCHIVE_COLUMNS = [
+    SIMULATION_TABLE.c[name] for name in ("timestamp", *SIMULATION_COLUMNS, "created_at", "updated_at")
+]
+# rate column -> amount it integrates to, and the factor from (rate * hours)
+ENERGY_FIELDS = {
+    "turbine_power_w": ("turbine_energy_kwh", 1e-3),
+    "stack_power_w": ("stack_energy_kwh", 1e-3),
+    "h2_kg_h": ("h2_kg", 1.0),
+}
 
-@app.get("/weather/", response_model=list[Weather])
+# JSON pages of /weather/, each valid until the ETL writes its site
+RESPONSE_CACHE = ResponseCache(settings.API_CACHE_MAX_BYTES)
+WEATHER_VALUE_FIELDS = numeric_columns(WEATHER_TABLE)
+
+
+class Bucket(StrEnum):
+    five_minutes = "5m"
+    hour = "1h"
+    day = "1d"
+
+
+class Granularity(StrEnum):
+    hourly = "hourly"
+    daily = "daily"
+
+
+ROLLUP_TABLES: dict[str, sa.Table] = {
+    Granularity.hourly: HourlyWeatherRollup.__table__,  # type: ignore[dict-item]
+    Granularity.daily: DailyWeatherRollup.__table__,  # type: ignore[dict-item]
+}
+BUCKET_ROLLUPS = {Bucket.hour: Granularity.hourly, Bucket.day: Granularity.daily}
+
+
+class ResponseFormat(StrEnum):
+    json = "json"
+    ndjson = "ndjson"
+    csv = "csv"
+    arrow = "arrow"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    create_db_and_tables()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    with span("api.request", method=request.method, path=request.url.path) as attributes:
+        response = await call_next(request)
+        attributes["status"] = response.status_code
+    route = request.scope.get("route")
+    API_REQUEST_SECONDS.labels(
+        route=route.path if route else "unmatched",
+        method=request.method,
+        status=response.status_code,
+    ).observe(time.perf_counter() - start)
+    return response
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def weather_columns(fields: str | None) -> list[sa.Column]:
+    if fields is None:
+        return list(WEATHER_TABLE.columns)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in WEATHER_TABLE.c]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown fields {unknown}, choose from {list(WEATHER_TABLE.c.keys())}",
+        )
+    return [WEATHER_TABLE.c[name] for name in dict.fromkeys(names)]
+
+
+def value_fields(fields: str | None) -> list[str]:
+    if fields is None:
+        return WEATHER_VALUE_FIELDS
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in WEATHER_VALUE_FIELDS]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown fields {unknown}, choose from {WEATHER_VALUE_FIELDS}",
+        )
+    return list(dict.fromkeys(names))
+
+
+def auto_bucket(start_timestamp: datetime | None, end_timestamp: datetime | None) -> Bucket:
+    """Finest bucket giving at most MAX_AGGREGATE_BUCKETS over the range."""
+    if start_timestamp is None:
+        return Bucket.day
+    end_timestamp = end_timestamp or datetime.now(timezone.utc).replace(tzinfo=None)
+    span_s = (end_timestamp - start_timestamp).total_seconds()
+    for bucket in Bucket:
+        if span_s / BUCKET_SECONDS[bucket] <= MAX_AGGREGATE_BUCKETS:
+            return bucket
+    return Bucket.day
+
+
+def weather_query(
+    columns: list[sa.Column],
+    site: str | None,
+    start_timestamp: datetime | None,
+    end_timestamp: datetime | None,
+    after_timestamp: datetime | None,
+    after_id: int | None,
+) -> sa.Select:
+    """Weather rows in (timestamp, id) order, resuming after a keyset cursor."""
+    table = WEATHER_TABLE
+    query = sa.select(*columns).order_by(table.c.timestamp, table.c.id)
+    if site is not None:
+        query = query.where(table.c.site == site)
+    if start_timestamp is not None:
+        query = query.where(table.c.timestamp >= start_timestamp)
+    if end_timestamp is not None:
+        query = query.where(table.c.timestamp <= end_timestamp)
+    if after_timestamp is not None and after_id is not None:
+        query = query.where(
+            sa.tuple_(table.c.timestamp, table.c.id) > sa.tuple_(after_timestamp, after_id)
+        )
+    elif after_timestamp is not None:
+        query = query.where(table.c.timestamp > after_timestamp)
+    return query
+
+
+def stream_batches(query: sa.Select):
+    with get_read_engine().connect() as conn:
+        options = {"stream_results": True, "yield_per": STREAM_BATCH_SIZE}
+        result = conn.execution_options(**options).execute(query)
+        yield from result.partitions()
+
+
+def archive_batches(
+    columns: list[sa.Column],
+    site: str | None,
+    start_timestamp: datetime | None,
+    end_timestamp: datetime | None,
+    after_timestamp: datetime | None = None,
+    after_id: int | None = None,
+) -> Iterator[list[tuple]]:
+    """Archived weather rows of a range, as row batches like `stream_batches`.
+
+    Compaction archives the oldest whole days first, so archived rows all
+    precede the rows still in the database and the two can be chained.
+    """
+    after = None if after_timestamp is None else (after_timestamp, after_id)
+    names = [column.name for column in columns]
+    for table in iter_archive(names, site, start_timestamp, end_timestamp, after):
+        yield list(zip(*(column.to_pylist() for column in table.columns)))
+
+
+def limit_batches(batches: Iterable[Sequence], limit: int | None) -> Iterator[Sequence]:
+    for batch in batches:
+        if limit is not None:
+            batch = batch[:limit]
+            limit -= len(batch)
+        if batch:
+            yield batch
+        if limit == 0:
+            return
+
+
+def count_rows(batches: Iterable[Sequence], route: str, format: str) -> Iterator[Sequence]:
+    rows = 0
+    try:
+        for batch in batches:
+            rows += len(batch)
+            yield batch
+    finally:
+        API_ROWS.labels(route=route, format=format).observe(rows)
+
+
+@app.get("/weather/")
 def get_weather_data(
-    start_timestamp: datetime | None = None, end_timestamp: datetime | None = None
+    request: Request,
+    site: str | None = None,
+    start_timestamp: datetime | None = None,
+    end_timestamp: datetime | None = None,
+    fields: str | None = Query(None, description="Comma-separated columns, default all"),
+    after_timestamp: datetime | None = Query(None, description="Keyset cursor: last timestamp seen"),
+    after_id: int | None = Query(None, description="Keyset cursor: last id seen"),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    format: ResponseFormat = ResponseFormat.json,
+):
+    """Weather rows ordered by (timestamp, id).
+
+    JSON responses are pages of `limit` rows (default PAGE_SIZE). When more
+    rows follow, a `Link: <...>; rel="next"` header holds the URL of the next
+    page, which resumes after the (timestamp, id) of the last row. NDJSON, CSV
+    and Arrow responses stream the whole range (or `limit` rows) from a
+    server-side cursor, one batch at a time. Rows compacted into the Parquet
+    archive are read from there first.
+
+    Responses carry an ETag of the data version (latest `updated_at` and row
+    count); a request with a matching If-None-Match gets a 304 without any
+    rows being read. JSON pages are kept in RESPONSE_CACHE until the ETL
+    writes the site again.
+    """
+    columns = weather_columns(fields)
+    bounds = (site, start_timestamp, end_timestamp, after_timestamp, after_id)
+
+    with get_read_engine().connect() as conn:
+        version = data_version(conn, WEATHER_TABLE, site)
+    key = query_key(request.query_params)
+    cache_headers = validators(version, key)
+    if is_not_modified(request.headers.get("if-none-match"), cache_headers["ETag"]):
+        API_CACHE_REQUESTS.labels(route="/weather/", result="not_modified").inc()
+        return Response(status_code=304, headers=cache_headers)
+
+    if format != ResponseFormat.json:
+        query = weather_query(columns, *bounds)
+        if limit is not None:
+            query = query.limit(limit)
+        batches = chain(archive_batches(columns, *bounds), stream_batches(query))
+        batches = count_rows(limit_batches(batches, limit), "/weather/", format)
+        return StreamingResponse(
+            SERIALIZERS[format](columns, batches),
+            media_type=MEDIA_TYPES[format],
+            headers=cache_headers,
+        )
+
+    cached = RESPONSE_CACHE.get(key, version)
+    API_CACHE_REQUESTS.labels(route="/weather/", result="miss" if cached is None else "hit").inc()
+    if cached is not None:
+        return Response(
+            cached.body, media_type="application/json", headers=cached.headers | cache_headers
+        )
+
+    limit = limit or PAGE_SIZE
+    cursor_columns = (WEATHER_TABLE.c.timestamp, WEATHER_TABLE.c.id)
+    keys = [column for column in cursor_columns if column not in columns]
+    rows = [
+        row
+        for batch in limit_batches(archive_batches(columns + keys, *bounds), limit + 1)
+        for row in batch
+    ]
+    if len(rows) <= limit:
+        query = weather_query(columns + keys, *bounds).limit(limit + 1 - len(rows))
+        with get_read_engine().connect() as conn:
+            rows += conn.execute(query).all()
+
+    names = [column.name for column in columns + keys]
+    items = [dict(zip(names, row)) for row in rows]
+    headers = {}
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_url = request.url.include_query_params(
+            after_timestamp=last["timestamp"].isoformat(), after_id=last["id"]
+        )
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    for item in items:
+        for column in keys:
+            del item[column.name]
+    API_ROWS.labels(route="/weather/", format=format).observe(len(items))
+    response = JSONResponse(jsonable_encoder(items), headers=headers | cache_headers)
+    RESPONSE_CACHE.put(key, version, CachedResponse(bytes(response.body), headers))
+    return response
+
+
+@app.get("/weather/aggregate")
+def get_weather_aggregate(
+    bucket: Bucket | None = Query(None, description="Default: chosen from the range"),
+    site: str = DEFAULT_SITE_NAME,
+    start_timestamp: datetime | None = None,
+    end_timestamp: datetime | None = None,
+    fields: str | None = Query(None, description="Comma-separated numeric columns, default all"),
+):
+    """Row count and min/mean/max of each field per time bucket.
+
+    Buckets are aligned to the epoch and labelled with their start. Without a
+    bucket, the finest one giving at most MAX_AGGREGATE_BUCKETS is used.
+    Hourly and daily buckets are read from the rollup tables, and are then
+    returned whole even when the range starts or ends inside them; 5-minute
+    buckets are computed from the raw rows, archived ones included.
+    """
+    names = value_fields(fields)
+    bucket = bucket or auto_bucket(start_timestamp, end_timestamp)
+    if bucket in BUCKET_ROLLUPS and set(names) <= set(ROLLUP_WEATHER_FIELDS):
+        rollup = ROLLUP_TABLES[BUCKET_ROLLUPS[bucket]]
+        query = rollup_aggregate_query(
+            rollup, BUCKET_SECONDS[bucket], names, site, start_timestamp, end_timestamp
+        )
+        with get_read_engine().connect() as conn:
+            rows = conn.execute(query).all()
+        return JSONResponse(jsonable_encoder([row._asdict() for row in rows]))
+
+    table = WEATHER_TABLE
+    dialect = get_read_engine().dialect.name
+    bucket_start = time_bucket(table.c.timestamp, BUCKET_SECONDS[bucket], dialect)
+    bucket_start = bucket_start.label("bucket")
+    aggregates = [
+        aggregate(table.c[name]).label(f"{name}_{stat}")
+        for name in names
+        for stat, aggregate in (("min", sa.func.min), ("mean", sa.func.avg), ("max", sa.func.max))
+    ]
+    query = (
+        sa.select(bucket_start, sa.func.count().label("count"), *aggregates)
+        .where(table.c.site == site)
+        .group_by(bucket_start)
+        .order_by(bucket_start)
+    )
+    if start_timestamp is not None:
+        query = query.where(table.c.timestamp >= start_timestamp)
+    if end_timestamp is not None:
+        query = query.where(table.c.timestamp <= end_timestamp)
+
+    items = list(archive_aggregates(names, BUCKET_SECONDS[bucket], site, start_timestamp, end_timestamp))
+    with get_read_engine().connect() as conn:
+        rows = conn.execute(query).all()
+    items += [{**row._asdict(), "bucket": from_epoch(row.bucket)} for row in rows]
+    return JSONResponse(jsonable_encoder(items))
+
+
+def archive_aggregates(
+    names: list[str],
+    width_s: int,
+    site: str,
+    start_timestamp: datetime | None,
+    end_timestamp: datetime | None,
+) -> Iterator[dict]:
+    """Row count and min/mean/max of archived rows per bucket, like the SQL aggregate.
+
+    Days are archived whole and every bucket divides a day, so no bucket has
+    rows in both the archive and the database.
+    """
+    stats = [(name, stat) for name in names for stat in ("min", "mean", "max")]
+    for table in iter_archive(["timestamp", *names], site, start_timestamp, end_timestamp):
+        epoch_us = table.column("timestamp").cast(pa.int64()).to_numpy()
+        buckets = epoch_us // 1_000_000 // width_s * width_s
+        grouped = (
+            table.append_column("bucket", pa.array(buckets))
+            .group_by("bucket")
+            .aggregate([([], "count_all"), *stats])
+            .sort_by("bucket")
+        )
+        for row in grouped.to_pylist():
+            yield {
+                "bucket": from_epoch(row["bucket"]),
+                "count": row["count_all"],
+                **{f"{name}_{stat}": row[f"{name}_{stat}"] for name, stat in stats},
+            }
+
+
+def rollup_aggregate_query(
+    rollup: sa.Table,
+    width_s: int,
+    names: list[str],
+    site: str,
+    start_timestamp: datetime | None,
+    end_timestamp: datetime | None,
+) -> sa.Select:
+    stats = [rollup.c[f"{name}_{stat}"] for name in names for stat in ("min", "mean", "max")]
+    query = (
+        sa.select(rollup.c.bucket, rollup.c.count, *stats)
+        .where(rollup.c.site == site)
+        .order_by(rollup.c.bucket)
+    )
+    if start_timestamp is not None:
+        first_bucket, _ = bucket_bounds(start_timestamp, start_timestamp, width_s)
+        query = query.where(rollup.c.bucket >= first_bucket)
+    if end_timestamp is not None:
+        query = query.where(rollup.c.bucket <= end_timestamp)
+    return query
+
+
+@app.get("/rollups/{granularity}")
+def get_rollups(
+    granularity: Granularity,
+    site: str = DEFAULT_SITE_NAME,
+    start_timestamp: datetime | None = None,
+    end_timestamp: datetime | None = None,
+):
+    """Hourly or daily weather statistics, turbine energy and H2 yield."""
+    rollup = ROLLUP_TABLES[granularity]
+    columns = [column for column in rollup.columns if column.name not in ("id", "updated_at")]
+    query = sa.select(*columns).where(rollup.c.site == site).order_by(rollup.c.bucket)
+    if start_timestamp is not None:
+        query = query.where(rollup.c.bucket >= start_timestamp)
+    if end_timestamp is not None:
+        query = query.where(rollup.c.bucket <= end_timestamp)
+    with get_read_engine().connect() as conn:
+        rows = conn.execute(query).all()
+    return JSONResponse(jsonable_encoder([row._asdict() for row in rows]))
+
+
+@app.get("/forecast/")
+def get_forecast(
+    site: str = DEFAULT_SITE_NAME,
+    horizon_hours: int = Query(PROJECTION_HOURS, ge=1, le=PROJECTION_HOURS),
+):
+    """Expected turbine power and H2 of the next hours, from the latest forecast."""
+    projection = project_forecast(latest_forecast(get_read_engine(), site), horizon_hours)
+    totals = projection_totals(projection).to_dict("records")
+    return JSONResponse(
+        jsonable_encoder(
+            {"totals": totals[0] if totals else None, "hours": projection.to_dict("records")}
+        )
+    )
+
+
+@app.get("/weather/lttb")
+def get_weather_lttb(
+    field: str,
+    points: int = Query(1000, ge=3, le=MAX_LTTB_POINTS),
+    site: str = DEFAULT_SITE_NAME,
+    start_timestamp: datetime | None = None,
+    end_timestamp: datetime | None = None,
+):
+    """At most `points` rows of one field, picked by Largest-Triangle-Three-Buckets.
+
+    Only the timestamp and the field are read, batch by batch into arrays, so
+    the server holds 16 bytes per row of the range and the payload never
+    exceeds `points` rows. Archived rows are included.
+    """
+    (name,) = value_fields(field)
+    table = WEATHER_TABLE
+    query = (
+        sa.select(table.c.timestamp, table.c[name])
+        .where((table.c.site == site) & table.c[name].is_not(None))
+        .order_by(table.c.timestamp)
+    )
+    if start_timestamp is not None:
+        query = query.where(table.c.timestamp >= start_timestamp)
+    if end_timestamp is not None:
+        query = query.where(table.c.timestamp <= end_timestamp)
+
+    archived = archive_batches([table.c.timestamp, table.c[name]], site, start_timestamp, end_timestamp)
+    timestamps, values = [np.empty(0, dtype="datetime64[us]")], [np.empty(0)]
+    for batch in chain(archived, stream_batches(query)):
+        timestamps.append(np.array([row[0] for row in batch], dtype="datetime64[us]"))
+        values.append(np.array([row[1] for row in batch], dtype=float))
+    t, y = np.concatenate(timestamps), np.concatenate(values)
+    t, y = t[~np.isnan(y)], y[~np.isnan(y)]  # archived rows are not filtered in SQL
+
+    keep = lttb(t.astype(np.int64) / 1e6, y, points)
+    items = [{"timestamp": t[i].item(), name: float(y[i])} for i in keep]
+    return JSONResponse(jsonable_encoder(items))
+
+
+def series_batches(
+    table: sa.Table,
+    names: list[str],
+    site: str,
+    start_timestamp: datetime | None,
+    end_timestamp: datetime | None,
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Epoch seconds and float values of a site's rows, batch by batch.
+
+    Archived rows come first; NULL values are NaN.
+    """
+    columns = [table.c.timestamp, *(table.c[name] for name in names)]
+    query = sa.select(*columns).where(table.c.site == site).order_by(table.c.timestamp)
+    if start_timestamp is not None:
+        query = query.where(table.c.timestamp >= start_timestamp)
+    if end_timestamp is not None:
+        query = query.where(table.c.timestamp <= end_timestamp)
+    archived = archive_batches(columns, site, start_timestamp, end_timestamp)
+    for batch in chain(archived, stream_batches(query)):
+        timestamps = np.array([row[0] for row in batch], dtype="datetime64[us]")
+        yield timestamps.astype(np.int64) / 1e6, np.array([row[1:] for row in batch], dtype=float)
+
+
+def resampled_batches(
+    batches: Iterable[tuple[np.ndarray, np.ndarray]], resampler: Resampler
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    emitted = 0
+    for t, values in batches:
+        grid = resampler.push(t, values)
+        emitted += len(grid[0])
+        if emitted > MAX_RESAMPLED_POINTS:
+            raise HTTPException(
+                status_code=422,
+                detail=f"More than {MAX_RESAMPLED_POINTS} points, widen the step or shorten the range",
+            )
+        yield grid
+    yield resampler.finish()
+
+
+def grid_items(grid: np.ndarray, gap: np.ndarray, columns: dict[str, np.ndarray]) -> list[dict]:
+    """JSON rows of a resampled chunk, with NaN as null."""
+    timestamps = (grid * 1e6).astype("datetime64[us]").tolist()
+    values = {
+        name: np.where(np.isnan(column), None, column).tolist()
+        for name, column in columns.items()
+    }
+    return [
+        {"timestamp": timestamp, "gap": bool(flag), **{name: values[name][i] for name in values}}
+        for i, (timestamp, flag) in enumerate(zip(timestamps, gap))
+    ]
+
+
+@app.get("/weather/resampled")
+def get_weather_resampled(
+    step: Bucket = Bucket.five_minutes,
+    method: InterpolationMethod = "linear",
+    max_gap_minutes: float = Query(MAX_GAP_MINUTES, gt=0),
+    site: str = DEFAULT_SITE_NAME,
+    start_timestamp: datetime | None = None,
+    end_timestamp: datetime | None = None,
+    fields: str | None = Query(None, description="Comma-separated numeric columns, default all"),
+):
+    """Weather on a uniform grid of `step`, aligned to the epoch.
+
+    Values are interpolated between the stored rows; duplicates of a
+    timestamp count once. Grid points inside a stretch without rows longer
+    than `max_gap_minutes` are flagged as gaps and null. The range is read
+    in batches, archived rows included.
+    """
+    names = value_fields(fields)
+    resampler = Resampler(BUCKET_SECONDS[step], method, max_gap_minutes * 60)
+    batches = series_batches(WEATHER_TABLE, names, site, start_timestamp, end_timestamp)
+    items = []
+    for grid, values, gap in resampled_batches(batches, resampler):
+        items += grid_items(grid, gap, dict(zip(names, values.T)))
+    API_ROWS.labels(route="/weather/resampled", format="json").observe(len(items))
+    return JSONResponse(jsonable_encoder(items))
+
+
+@app.get("/energy/")
+def get_energy(
+    step: Bucket = Bucket.five_minutes,
+    method: InterpolationMethod = "linear",
+    max_gap_minutes: float = Query(MAX_GAP_MINUTES, gt=0),
+    site: str = DEFAULT_SITE_NAME,
+    start_timestamp: datetime | None = None,
+    end_timestamp: datetime | None = None,
+    series: bool = Query(False, description="Also return the cumulative series"),
+):
+    """Turbine and stack energy in kWh and H2 in kg over a range.
+
+    The simulated power and H2 rate are resampled like `/weather/resampled`
+    and integrated with the trapezoidal rule in one pass over the range.
+    Gaps add nothing; `covered_hours` and `gap_hours` tell how much of the
+    range the totals stand for. With `series`, the grid is returned too,
+    with the amounts accumulated up to each point.
+    """
+    names = list(ENERGY_FIELDS)
+    amount_names = [amount for amount, _ in ENERGY_FIELDS.values()]
+    factors = np.array([factor for _, factor in ENERGY_FIELDS.values()])
+    resampler = Resampler(BUCKET_SECONDS[step], method, max_gap_minutes * 60)
+    integrator = TrapezoidIntegrator(max_gap_minutes * 60)
+    batches = series_batches(SIMULATION_TABLE, names, site, start_timestamp, end_timestamp)
+    items = []
+    for grid, values, gap in resampled_batches(batches, resampler):
+        if len(grid) == 0:
+            continue
+        cumulative = integrator.push(grid, values) * factors
+        if series:
+            columns = dict(zip(names, values.T))
+            columns |= dict(zip(amount_names, cumulative.T))
+            items += grid_items(grid, gap, columns)
+
+    amounts = np.zeros(len(names)) if integrator.totals is None else integrator.totals * factors
+    totals = {amount: float(total) for amount, total in zip(amount_names, amounts)}
+    totals |= {"covered_hours": integrator.covered_s / 3600, "gap_hours": integrator.gap_s / 3600}
+    return JSONResponse(jsonable_encoder({"totals": totals, "series": items if series else None}))
+
+
+@app.get("/simulation/", response_model=list[Simulation])
+def get_simulation_data(
+    site: str = DEFAULT_SITE_NAME,
+    start_timestamp: datetime | None = None,
+    end_timestamp: datetime | None = None,
 ):
-    with Session(engine) as session:
-        weather_records = session.exec(
-            select(Weather).where(
-                (Weather.timestamp >= start_timestamp if start_timestamp else True)
-                & (Weather.timestamp <= end_timestamp if end_timestamp else True)
+    """Simulated plant output of a site in timestamp order, archived rows first."""
+    archived = archive_batches(SIMULATION_ARCHIVE_COLUMNS, site, start_timestamp, end_timestamp)
+    names = [column.name for column in SIMULATION_ARCHIVE_COLUMNS]
+    simulation_records = [
+        Simulation(site=site, **dict(zip(names, row))) for batch in archived for row in batch
+    ]
+    with Session(get_read_engine()) as session:
+        simulation_records += session.exec(
+            select(Simulation)
+            .where(
+                (Simulation.site == site)
+                & (Simulation.timestamp >= start_timestamp if start_timestamp else True)
+                & (Simulation.timestamp <= end_timestamp if end_timestamp else True)
             )
+            .order_by(Simulation.timestamp)  # type: ignore[arg-type]
         ).all()
-    return weather_records
+    return simulation_records
@@ -0,0 +1,140 @@
+"""Parquet archive of old weather rows.
+
+`compaction.compact_weather_data` moves rows older than
+ARCHIVE_RETENTION_DAYS, whole days at a time, from the weather and
+simulation tables into zstd-compressed Parquet files laid out as
+
+    <ARCHIVE_DIR>/weather/date=YYYY-MM-DD/site=<name>/data.parquet
+
+The hourly and daily rollups stay in the database. `iter_archive` reads the
+archive back in (timestamp, id) order, one day at a time, memory-mapping the
+files and pushing the filters down to partitions and row groups. This module
+does not import Prefect, so the API can read the archive without it.
+"""
+
+import os
+from collections.abc import Iterator
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+import sqlalchemy as sa
+
+from config import settings
+from db_models.simulation import Simulation
+from db_models.weather import Weather
+from simulation import SIMULATION_COLUMNS
+from streaming import arrow_type
+
+WEATHER_TABLE: sa.Table = Weather.__table__  # type: ignore[assignment]
+SIMULATION_TABLE: sa.Table = Simulation.__table__  # type: ignore[assignment]
+
+ARCHIVE_COLUMNS = [
+    *(column for column in WEATHER_TABLE.columns if column.name != "site"),
+    *(SIMULATION_TABLE.c[name] for name in SIMULATION_COLUMNS),
+]
+# the site comes from the partition path, not from the files
+ARCHIVE_SCHEMA = pa.schema(
+    [pa.field(column.name, arrow_type(column)) for column in ARCHIVE_COLUMNS]
+)
+SITE_PARTITIONING = ds.partitioning(pa.schema([("site", pa.string())]), flavor="hive")
+MMAP_FILESYSTEM = fs.LocalFileSystem(use_mmap=True)
+SORT_KEYS = [("timestamp", "ascending"), ("id", "ascending")]
+
+
+def archive_root(archive_dir: str | None = None) -> Path:
+    return Path(archive_dir or settings.ARCHIVE_DIR).resolve() / "weather"
+
+
+def partition_path(root: Path, day: date, site: str) -> Path:
+    return root / f"date={day.isoformat()}" / f"site={quote(site, safe='')}" / "data.parquet"
+
+
+def write_partition(path: Path, rows: pd.DataFrame) -> None:
+    """Merge rows into a partition file, atomically.
+
+    Rows already in the file with the same timestamp are replaced, so
+    archiving a day twice (e.g. after an interrupted run) is harmless.
+    """
+    table = pa.Table.from_pandas(rows[ARCHIVE_SCHEMA.names], schema=ARCHIVE_SCHEMA, preserve_index=False)
+    if path.exists():
+        existing = pq.read_table(path, schema=ARCHIVE_SCHEMA)
+        merged = pd.concat([existing.to_pandas(), table.to_pandas()])
+        merged = merged.drop_duplicates(subset="timestamp", keep="last")
+        table = pa.Table.from_pandas(merged, schema=ARCHIVE_SCHEMA, preserve_index=False)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    pq.write_table(table.sort_by(SORT_KEYS), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time())
+    return start, start + timedelta(days=1)
+
+
+def iter_archive(
+    columns: list[str],
+    site: str | None = None,
+    start_timestamp: datetime | None = None,
+    end_timestamp: datetime | None = None,
+    after: tuple[datetime, int | None] | None = None,
+    archive_dir: str | None = None,
+) -> Iterator[pa.Table]:
+    """Archived rows of a range, one sorted table per day.
+
+    Days outside the range are skipped by name, other sites are pruned by
+    partition, and the timestamp filters are pushed down to the row groups.
+
+    Args:
+        columns (list[str]): Columns of the weather or simulation tables.
+        after (tuple[datetime, int | None] | None): Keyset cursor
+            (timestamp, id); rows up to it are skipped.
+    """
+    root = archive_root(archive_dir)
+    if not root.exists():
+        return
+
+    filters = []
+    if site is not None:
+        filters.append(ds.field("site") == site)
+    if start_timestamp is not None:
+        filters.append(ds.field("timestamp") >= pa.scalar(start_timestamp, pa.timestamp("us")))
+    if end_timestamp is not None:
+        filters.append(ds.field("timestamp") <= pa.scalar(end_timestamp, pa.timestamp("us")))
+    if after is not None:
+        after_timestamp = pa.scalar(after[0], pa.timestamp("us"))
+        if after[1] is None:
+            filters.append(ds.field("timestamp") > after_timestamp)
+        else:
+            filters.append(
+                (ds.field("timestamp") > after_timestamp)
+                | ((ds.field("timestamp") == after_timestamp) & (ds.field("id") > after[1]))
+            )
+
+    first_day = max(
+        (bound.date() for bound in (start_timestamp, after and after[0]) if bound),
+        default=None,
+    )
+    for day_dir in sorted(root.glob("date=*")):
+        day = date.fromisoformat(day_dir.name.removeprefix("date="))
+        if first_day is not None and day < first_day:
+            continue
+        if end_timestamp is not None and day > end_timestamp.date():
+            break
+        dataset = ds.dataset(
+            day_dir, format="parquet", partitioning=SITE_PARTITIONING, filesystem=MMAP_FILESYSTEM
+        )
+        expression = None
+        for condition in filters:
+            expression = condition if expression is None else expression & condition
+        read_columns = list(dict.fromkeys([*columns, "id", "timestamp"]))
+        table = dataset.to_table(columns=read_columns, filter=expression)
+        if table.num_rows:
+            yield table.sort_by(SORT_KEYS).select(columns)
@@ -0,0 +1,203 @@
+"""Historical backfill and replay of weather data.
+
+Streams weather history from local files in fixed-size chunks through
+extract -> transform -> simulate -> load, so memory stays bounded by the chunk
+size whatever the length of the history. Supported sources:
+
+- CSV or Parquet files with the columns of the weather table, or with the
+  OpenWeather field names (dt, temp, pressure in hPa, humidity, ...)
+- JSON Lines files of recorded OpenWeather one-call responses
+
+A checkpoint file records how many source rows have been loaded, so an
+interrupted backfill resumes where it stopped.
+
+    uv run src/backfill.py data/history.parquet --chunk-size 50000
+"""
+
+import argparse
+import json
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from prefect import flow, task
+from prefect.cache_policies import NONE
+from sqlalchemy import Engine
+
+from clients.openweather import OpenWeatherResponse
+from db_models.weather import WEATHER_COLUMNS, WEATHER_KEY
+from database import UpsertResult, get_block_engine
+from etl import load_weather_frames, simulate_weather_rows
+from sites import DEFAULT_SITE_NAME
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+# OpenWeather field name -> weather table column
+OPENWEATHER_COLUMNS = {
+    "dt": "timestamp",
+    "temp": "temperature_k",
+    "pressure": "pressure_pa",
+    "humidity": "humidity_percent",
+    "dew_point": "dew_point_k",
+    "wind_speed": "wind_speed_m_s",
+    "wind_deg": "wind_deg",
+    "wind_gust": "wind_gust_m_s",
+}
+REQUIRED_COLUMNS = [column for column in WEATHER_COLUMNS if column != "wind_gust_m_s"]
+
+
+def iter_source_chunks(
+    path: Path, chunk_size: int, skip_rows: int = 0
+) -> Iterator[pd.DataFrame]:
+    """Yield the rows of a history file in chunks of at most `chunk_size` rows."""
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        chunks = pd.read_csv(path, chunksize=chunk_size)
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size)
+        chunks = (batch.to_pandas() for batch in batches)
+    elif suffix in (".jsonl", ".ndjson"):
+        chunks = _iter_recorded_responses(path, chunk_size)
+    else:
+        raise ValueError(f"Unsupported backfill source: {path}")
+
+    for chunk in chunks:
+        if skip_rows >= len(chunk):
+            skip_rows -= len(chunk)
+            continue
+        yield chunk.iloc[skip_rows:]
+        skip_rows = 0
+
+
+def _iter_recorded_responses(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    rows = []
+    with path.open() as f:
+        for line in f:
+            if not line.strip():
+                continue
+            current = OpenWeatherResponse(**json.loads(line)["current"])
+            rows.append(current.model_dump(by_alias=True))
+            if len(rows) == chunk_size:
+                yield pd.DataFrame(rows)
+                rows = []
+    if rows:
+        yield pd.DataFrame(rows)
+
+
+def read_checkpoint(checkpoint_path: Path, source: Path) -> int:
+    """Number of source rows already loaded by a previous run."""
+    if not checkpoint_path.exists():
+        return 0
+    checkpoint = json.loads(checkpoint_path.read_text())
+    if checkpoint.get("source") != str(source.resolve()):
+        logger.warning(f"Ignoring checkpoint {checkpoint_path} of another source")
+        return 0
+    return int(checkpoint["rows_done"])
+
+
+def write_checkpoint(checkpoint_path: Path, source: Path, rows_done: int) -> None:
+    tmp_path = checkpoint_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({"source": str(source.resolve()), "rows_done": rows_done}))
+    os.replace(tmp_path, checkpoint_path)
+
+
+@task(cache_policy=NONE)
+def transform_weather_chunk(chunk: pd.DataFrame, site: str = DEFAULT_SITE_NAME) -> pd.DataFrame:
+    """Normalize column names and units, and drop invalid or duplicate rows.
+
+    Rows without a site column are attributed to `site`.
+    """
+    if "dt" in chunk.columns:
+        chunk = chunk.rename(columns=OPENWEATHER_COLUMNS)
+        chunk["pressure_pa"] = chunk["pressure_pa"] * 100  # hPa -> Pa
+    if "wind_gust_m_s" not in chunk.columns:
+        chunk["wind_gust_m_s"] = np.nan
+    if "site" not in chunk.columns:
+        chunk["site"] = site
+
+    timestamp = chunk["timestamp"]
+    if pd.api.types.is_numeric_dtype(timestamp):
+        timestamp = pd.to_datetime(timestamp, unit="s", utc=True)
+    else:
+        timestamp = pd.to_datetime(timestamp, utc=True)
+    chunk = chunk.assign(timestamp=timestamp.dt.tz_localize(None))  # stored as UTC
+
+    valid = chunk[REQUIRED_COLUMNS].notna().all(axis=1) & chunk["humidity_percent"].between(0, 100)
+    if not valid.all():
+        logger.warning(f"Dropping {(~valid).sum()} invalid rows")
+    chunk = chunk.loc[valid, WEATHER_COLUMNS]
+    return chunk.drop_duplicates(subset=list(WEATHER_KEY), keep="last").reset_index(drop=True)
+
+
+@task(cache_policy=NONE)
+def simulate_weather_chunk(weather: pd.DataFrame) -> pd.DataFrame:
+    return simulate_weather_rows(weather)
+
+
+@task(cache_policy=NONE)
+def load_weather_chunk(
+    engine: Engine, weather: pd.DataFrame, simulation: pd.DataFrame
+) -> tuple[UpsertResult, UpsertResult]:
+    return load_weather_frames(engine, weather, simulation)
+
+
+@flow
+def backfill_weather_data(
+    source: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    checkpoint: str | None = None,
+    block_name: str = "database-connector",
+    site: str = DEFAULT_SITE_NAME,
+) -> int:
+    """Replay a weather history file into the database, resumably.
+
+    Returns:
+        int: Number of source rows processed, including resumed ones.
+    """
+    source_path = Path(source)
+    checkpoint_path = Path(checkpoint or f"{source}.checkpoint.json")
+    rows_done = read_checkpoint(checkpoint_path, source_path)
+    if rows_done:
+        logger.info(f"Resuming {source_path} after {rows_done:,} rows")
+
+    engine = get_block_engine(block_name)
+    start = time.perf_counter()
+    rows_this_run = 0
+    for chunk in iter_source_chunks(source_path, chunk_size, skip_rows=rows_done):
+        weather = transform_weather_chunk(chunk, site)
+        simulation = simulate_weather_chunk(weather)
+        result, _ = load_weather_chunk(engine, weather, simulation)
+
+        rows_done += len(chunk)
+        rows_this_run += len(chunk)
+        write_checkpoint(checkpoint_path, source_path, rows_done)
+
+        rate = rows_this_run / (time.perf_counter() - start)
+        logger.info(
+            f"{rows_done:,} rows processed, {result.inserted:,} inserted, "
+            f"{result.updated:,} updated, mean H2 rate "
+            f"{simulation['h2_kg_h'].mean():.3f} kg/h ({rate:,.0f} rows/s)"
+        )
+
+    logger.info(f"Backfill of {source_path} complete: {rows_done:,} rows")
+    return rows_done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill weather history")
+    parser.add_argument("source", help="CSV, Parquet or JSON Lines file")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--checkpoint", default=None)
+    parser.add_argument("--site", default=DEFAULT_SITE_NAME, help="site of rows without one")
+    args = parser.parse_args()
+    backfill_weather_data(args.source, args.chunk_size, args.checkpoint, site=args.site)
+
+
+if __name__ == "__main__":
+    main()
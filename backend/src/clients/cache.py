@@ -0,0 +1,95 @@
+"""Persistent HTTP cache for the API clients.
+
+Responses are stored in a local SQLite file that outlives the process, so
+every Prefect flow run (and every worker) shares the same cache. Entries
+expire after their `hishel_ttl` and the storages below additionally keep at
+most `max_entries` entries, evicting the oldest first.
+
+hishel has no public API to list or hard-delete entries, so the eviction
+uses its connection, `entries` table and stream deletion directly; the
+hishel version is pinned exactly for that reason.
+"""
+
+from pydantic import BaseModel
+from hishel import (
+    AsyncSqliteStorage,
+    BaseFilter,
+    FilterPolicy,
+    Response,
+    SyncSqliteStorage,
+)
+
+EVICT_SQL = "SELECT id FROM entries ORDER BY created_at DESC LIMIT -1 OFFSET ?"
+
+
+class CacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def record(self, from_cache: bool) -> None:
+        if from_cache:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+
+class SuccessfulResponseFilter(BaseFilter[Response]):
+    """Store only 200 responses, whatever their cache headers say."""
+
+    def needs_body(self) -> bool:
+        return False
+
+    def apply(self, item: Response, body: bytes | None) -> bool:
+        return item.status_code == 200
+
+
+def ttl_cache_policy() -> FilterPolicy:
+    """Cache successful responses for their `hishel_ttl`.
+
+    The OpenWeather API sends no freshness headers, so a policy following the
+    HTTP caching spec would never serve a response from the cache.
+    """
+    return FilterPolicy(response_filters=[SuccessfulResponseFilter()])
+
+
+class BoundedSyncSqliteStorage(SyncSqliteStorage):
+    """SQLite cache storage that keeps at most `max_entries` entries."""
+
+    def __init__(self, *, max_entries: int, **kwargs):
+        super().__init__(**kwargs)
+        self.max_entries = max_entries
+
+    def create_entry(self, request, response, key, id_=None):
+        entry = super().create_entry(request, response, key, id_)
+        connection = self._ensure_connection()
+        cursor = connection.cursor()
+        cursor.execute(EVICT_SQL, (self.max_entries,))
+        for (entry_id,) in cursor.fetchall():
+            cursor.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+            self._delete_stream(entry_id, cursor)
+        connection.commit()
+        return entry
+
+
+class BoundedAsyncSqliteStorage(AsyncSqliteStorage):
+    """SQLite cache storage that keeps at most `max_entries` entries."""
+
+    def __init__(self, *, max_entries: int, **kwargs):
+        super().__init__(**kwargs)
+        self.max_entries = max_entries
+
+    async def create_entry(self, request, response, key, id_=None):
+        entry = await super().create_entry(request, response, key, id_)
+        connection = await self._ensure_connection()
+        cursor = await connection.cursor()
+        await cursor.execute(EVICT_SQL, (self.max_entries,))
+        for (entry_id,) in await cursor.fetchall():
+            await cursor.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+            await self._delete_stream(entry_id, cursor)
+        await connection.commit()
+        return entry
@@ -0,0 +1,138 @@
+"""Concurrent weather extraction for a fleet of wind sites."""
+
+import asyncio
+import random
+import time
+from collections.abc import Sequence
+
+import httpx
+from loguru import logger
+
+from clients.openweather import OpenWeatherClient, OpenWeatherResponse
+from config import settings
+from sites import Site
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+BACKOFF_SECONDS = 1.0
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # waiters queue on the lock, so tokens are handed out in FIFO order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
+
+
+def _retry_delay(exc: Exception, attempt: int, backoff_s: float) -> float:
+    if isinstance(exc, httpx.HTTPStatusError):
+        retry_after = exc.response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    # exponential backoff with jitter, so retries of many sites do not align
+    return backoff_s * 2**attempt * random.uniform(0.5, 1.5)
+
+
+async def fetch_site_weather(
+    client: OpenWeatherClient,
+    site: Site,
+    http_client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    rate_limiter: TokenBucket,
+    max_retries: int,
+    backoff_s: float = BACKOFF_SECONDS,
+) -> OpenWeatherResponse:
+    """Fetch one site, retrying rate-limited, server and transport errors."""
+    for attempt in range(max_retries + 1):
+        try:
+            async with semaphore:
+                await rate_limiter.acquire()
+                return await client.fetch_current_weather(
+                    site.latitude, site.longitude, http_client
+                )
+        except (httpx.HTTPStatusError, httpx.TransportError) as exc:
+            if attempt == max_retries or not _is_retryable(exc):
+                raise
+            delay = _retry_delay(exc, attempt, backoff_s)
+            logger.warning(f"Site {site.name}: {exc!r}, retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def fetch_fleet_weather(
+    client: OpenWeatherClient,
+    sites: Sequence[Site],
+    http_client: httpx.AsyncClient | None = None,
+    max_concurrency: int | None = None,
+    calls_per_minute: float | None = None,
+    max_retries: int | None = None,
+    backoff_s: float = BACKOFF_SECONDS,
+) -> tuple[dict[str, OpenWeatherResponse], dict[str, Exception]]:
+    """Fetch the current weather of all sites concurrently.
+
+    All requests go through one shared HTTP client, by default the pooled and
+    cached client owned by `client`. A semaphore bounds the requests in flight
+    and a token bucket keeps the call rate within the API quota. A site that
+    still fails after its retries does not fail the others.
+
+    Returns:
+        tuple[dict[str, OpenWeatherResponse], dict[str, Exception]]: The
+            responses and the errors, both keyed by site name.
+    """
+    max_concurrency = max_concurrency or settings.OPENWEATHER_MAX_CONCURRENCY
+    calls_per_minute = calls_per_minute or settings.OPENWEATHER_CALLS_PER_MINUTE
+    max_retries = settings.OPENWEATHER_MAX_RETRIES if max_retries is None else max_retries
+
+    expected_s = len(sites) / calls_per_minute * 60
+    if expected_s > settings.WEATHER_UPDATE_INTERVAL_MINUTES * 60:
+        logger.warning(
+            f"{len(sites)} sites at {calls_per_minute:g} calls/min need {expected_s:.0f}s, "
+            "longer than the update interval"
+        )
+
+    http_client = http_client or client.async_http_client
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # capacity 1: no initial burst, calls are spread evenly over the minute
+    rate_limiter = TokenBucket(calls_per_minute / 60, capacity=1)
+    results = await asyncio.gather(
+        *(
+            fetch_site_weather(
+                client, site, http_client, semaphore, rate_limiter, max_retries, backoff_s
+            )
+            for site in sites
+        ),
+        return_exceptions=True,
+    )
+
+    responses, errors = {}, {}
+    for site, result in zip(sites, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result  # cancellation, interrupts
+            errors[site.name] = result
+        else:
+            responses[site.name] = result
+    return responses, errors
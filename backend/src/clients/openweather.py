@@ -1,15 +1,40 @@
 """Client for OpenWeather API."""
 
-from datetime import datetime
-from hishel.httpx import AsyncCacheClient, SyncCacheClient
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from hishel.httpx import AsyncCacheTransport, SyncCacheTransport
 from pydantic import BaseModel, Field
 
+from clients.cache import (
+    BoundedAsyncSqliteStorage,
+    BoundedSyncSqliteStorage,
+    CacheStats,
+    ttl_cache_policy,
+)
 from config import settings
+from metrics import OPENWEATHER_REQUEST_SECONDS, OPENWEATHER_REQUESTS, span
+
+if TYPE_CHECKING:
+    import pandas as pd
 
-OPENWEATHER_API_URI = settings.OPENWEATHER_API_URI
-OPENWEATHER_API_KEY = settings.OPENWEATHER_API_KEY
 LATITUDE, LONGITUDE = 52.5200, 13.4050
-TTL_SECONDS = settings.WEATHER_UPDATE_INTERVAL_MINUTES * 60
+
+# forecast column -> key of the entries of the one-call `hourly` and `daily` arrays
+FORECAST_FIELDS = {
+    "temperature_k": "temp",
+    "pressure_pa": "pressure",
+    "humidity_percent": "humidity",
+    "dew_point_k": "dew_point",
+    "wind_speed_m_s": "wind_speed",
+    "wind_deg": "wind_deg",
+    "wind_gust_m_s": "wind_gust",
+}
 
 
 class OpenWeatherResponse(BaseModel):
@@ -27,40 +52,193 @@ class OpenWeatherResponse(BaseModel):
     wind_gust_m_s: float | None = Field(
         None, alias="wind_gust", description="Wind gust in m/s"
     )
+    # the forecast arrays of the same payload, left raw for `parse_forecast`
+    hourly: list[dict[str, Any]] = Field(default_factory=list, exclude=True, repr=False)
+    daily: list[dict[str, Any]] = Field(default_factory=list, exclude=True, repr=False)
+
+
+def parse_forecast(response: OpenWeatherResponse) -> "pd.DataFrame":
+    """The hourly and daily forecasts of a response as one frame.
+
+    Each array is parsed column by column, not entry by entry. Rows have the
+    FORECAST_COLUMNS of `db_models.forecast` but the site; times are naive
+    UTC like the stored weather, pressure is converted to Pascal and the
+    daily temperature is the day temperature.
+    """
+    import pandas as pd  # not at import: the client is imported by every flow
+
+    issued_at = response.dt.astimezone(timezone.utc).replace(tzinfo=None)
+    frames = []
+    for resolution, entries in (("hourly", response.hourly), ("daily", response.daily)):
+        raw = pd.DataFrame.from_records(entries, columns=["dt", *FORECAST_FIELDS.values()])
+        frame = pd.DataFrame(
+            {column: raw[key] for column, key in FORECAST_FIELDS.items()}
+        )
+        if resolution == "daily":
+            frame["temperature_k"] = raw["temp"].map(
+                lambda temp: temp.get("day") if isinstance(temp, dict) else temp
+            )
+        frame["pressure_pa"] = frame["pressure_pa"].astype(float) * 100
+        frame.insert(0, "target_time", pd.to_datetime(raw["dt"], unit="s"))
+        frame.insert(0, "resolution", resolution)
+        frame.insert(0, "issued_at", pd.Timestamp(issued_at))
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+async def _close_with_loop(client: httpx.AsyncClient) -> AsyncIterator[None]:
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+def close_at_shutdown(client: httpx.AsyncClient) -> AsyncIterator[None]:
+    """Close `client` when the running loop finalizes its async generators.
+
+    The loop holds the returned generator weakly and closes it early when it
+    is collected, so the caller must keep it.
+    """
+    closer = _close_with_loop(client)
+    try:
+        # run it to its `yield`; the loop tracks it from its first iteration
+        closer.__anext__().send(None)  # type: ignore[attr-defined]
+    except StopIteration:
+        pass
+    return closer
 
 
 class OpenWeatherClient:
+    """Client for the OpenWeather one-call API.
+
+    The client owns one sync and one async HTTP client, created on first use
+    and reused by every call, so connections stay alive between requests.
+    Both sit on a persistent SQLite cache (see `clients.cache`) shared by all
+    processes; `cache_stats` counts the calls served from it. Every call is
+    also counted and timed in the Prometheus metrics.
+    """
+
     def __init__(
         self,
-        api_key: str = OPENWEATHER_API_KEY.get_secret_value(),
-        api_uri: str = OPENWEATHER_API_URI,
+        api_key: str | None = None,
+        api_uri: str | None = None,
+        cache_path: str | None = None,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
     ):
-        self.api_key = api_key
-        self.api_uri = api_uri
+        # settings are read here, not at import, so they can change until first use
+        self.api_key = api_key or settings.OPENWEATHER_API_KEY.get_secret_value()
+        self.api_uri = api_uri or settings.OPENWEATHER_API_URI
+        self.cache_path = cache_path or settings.HTTP_CACHE_PATH
+        self.ttl_s = settings.WEATHER_UPDATE_INTERVAL_MINUTES * 60
+        self.cache_stats = CacheStats()
+        self._limits = httpx.Limits(
+            max_connections=settings.OPENWEATHER_MAX_CONCURRENCY,
+            max_keepalive_connections=settings.OPENWEATHER_MAX_CONCURRENCY,
+        )
+        self._transport = transport
+        self._async_transport = async_transport
+        self._sync_client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+        self._async_loop: asyncio.AbstractEventLoop | None = None
+        self._async_closer: AsyncIterator[None] | None = None
+
+    @property
+    def http_client(self) -> httpx.Client:
+        if self._sync_client is None:
+            storage = BoundedSyncSqliteStorage(
+                database_path=self.cache_path,
+                default_ttl=self.ttl_s,
+                max_entries=settings.HTTP_CACHE_MAX_ENTRIES,
+            )
+            transport = SyncCacheTransport(
+                next_transport=self._transport or httpx.HTTPTransport(limits=self._limits),
+                storage=storage,
+                policy=ttl_cache_policy(),
+            )
+            self._sync_client = httpx.Client(transport=transport)
+        return self._sync_client
+
+    @property
+    def async_http_client(self) -> httpx.AsyncClient:
+        """Async client of the running event loop, closed when the loop shuts down.
+
+        Its connections are bound to the loop and cannot be closed once the
+        loop is closed, so the client is scoped to the loop: it is closed
+        with the loop's async generators, which `asyncio.run` finalizes
+        before closing the loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            storage = BoundedAsyncSqliteStorage(
+                database_path=self.cache_path,
+                default_ttl=self.ttl_s,
+                max_entries=settings.HTTP_CACHE_MAX_ENTRIES,
+            )
+            transport = AsyncCacheTransport(
+                next_transport=self._async_transport
+                or httpx.AsyncHTTPTransport(limits=self._limits),
+                storage=storage,
+                policy=ttl_cache_policy(),
+            )
+            self._async_client = httpx.AsyncClient(transport=transport)
+            self._async_loop = loop
+            self._async_closer = close_at_shutdown(self._async_client)
+        return self._async_client
 
     async def fetch_current_weather(
-        self, lat: float = LATITUDE, lon: float = LONGITUDE
+        self,
+        lat: float = LATITUDE,
+        lon: float = LONGITUDE,
+        http_client: httpx.AsyncClient | None = None,
     ) -> OpenWeatherResponse:
+        http_client = http_client or self.async_http_client
         params = self._get_api_params(lat, lon)
-        async with AsyncCacheClient() as client:
-            response = await client.get(
-                self.api_uri, params=params, extensions={"hishel_ttl": TTL_SECONDS}
+        with span("openweather.fetch", lat=lat, lon=lon) as attributes:
+            start = time.perf_counter()
+            response = await http_client.get(
+                self.api_uri, params=params, extensions={"hishel_ttl": self.ttl_s}
             )
-            response.raise_for_status()
-            data = response.json()
-            return OpenWeatherResponse(**data["current"])
+            self._record(response, time.perf_counter() - start, attributes)
+        return self._parse_current(response)
 
     def fetch_current_weather_sync(
         self, lat: float = LATITUDE, lon: float = LONGITUDE
     ) -> OpenWeatherResponse:
         params = self._get_api_params(lat, lon)
-        with SyncCacheClient() as client:
-            response = client.get(
-                self.api_uri, params=params, extensions={"hishel_ttl": TTL_SECONDS}
+        with span("openweather.fetch", lat=lat, lon=lon) as attributes:
+            start = time.perf_counter()
+            response = self.http_client.get(
+                self.api_uri, params=params, extensions={"hishel_ttl": self.ttl_s}
             )
-            response.raise_for_status()
-            data = response.json()
-            return OpenWeatherResponse(**data["current"])
+            self._record(response, time.perf_counter() - start, attributes)
+        return self._parse_current(response)
+
+    def close(self) -> None:
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+    async def aclose(self) -> None:
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def _record(self, response: httpx.Response, elapsed_s: float, attributes: dict) -> None:
+        from_cache = bool(response.extensions.get("hishel_from_cache"))
+        self.cache_stats.record(from_cache)
+        cache = "hit" if from_cache else "miss"
+        OPENWEATHER_REQUEST_SECONDS.labels(cache=cache).observe(elapsed_s)
+        OPENWEATHER_REQUESTS.labels(status=response.status_code, cache=cache).inc()
+        attributes.update(status=response.status_code, cache=cache)
+
+    def _parse_current(self, response: httpx.Response) -> OpenWeatherResponse:
+        response.raise_for_status()
+        data = response.json()
+        return OpenWeatherResponse(
+            **data["current"], hourly=data.get("hourly", []), daily=data.get("daily", [])
+        )
 
     def _get_api_params(self, lat: float, lon: float) -> dict:
         return {
@@ -69,3 +247,9 @@ class OpenWeatherClient:
             "appid": self.api_key,
             "units": "standard",
         }
+
+
+@cache
+def get_openweather_client() -> OpenWeatherClient:
+    """Client shared by all flow and task runs of the process."""
+    return OpenWeatherClient()
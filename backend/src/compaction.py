@@ -0,0 +1,100 @@
+"""Compaction flow moving old weather rows to the Parquet archive (see `archive`).
+
+The ETL process serves it on ARCHIVE_CRON, next to the ETL flow; `main`
+runs it once.
+"""
+
+import argparse
+from datetime import date, datetime, timedelta, timezone
+
+import pandas as pd
+import sqlalchemy as sa
+from loguru import logger
+from prefect import flow, task
+from prefect.cache_policies import NONE
+from sqlalchemy import Engine
+
+from archive import (
+    SIMULATION_TABLE,
+    WEATHER_TABLE,
+    archive_root,
+    day_bounds,
+    partition_path,
+    write_partition,
+)
+from config import settings
+from database import get_block_engine
+from simulation import SIMULATION_COLUMNS
+
+
+@task(cache_policy=NONE)
+def archive_day(engine: Engine, day: date, archive_dir: str | None = None) -> int:
+    """Move the weather and simulation rows of one UTC day to the archive."""
+    w, s = WEATHER_TABLE, SIMULATION_TABLE
+    start, end = day_bounds(day)
+    in_day = (w.c.timestamp >= start) & (w.c.timestamp < end)
+    query = (
+        sa.select(w, *(s.c[name] for name in SIMULATION_COLUMNS))
+        .select_from(w.outerjoin(s, (s.c.site == w.c.site) & (s.c.timestamp == w.c.timestamp)))
+        .where(in_day)
+    )
+    with engine.begin() as conn:
+        rows = pd.DataFrame(conn.execute(query).mappings().all())
+        if rows.empty:
+            return 0
+        for site, site_rows in rows.groupby("site"):
+            write_partition(partition_path(archive_root(archive_dir), day, str(site)), site_rows)
+        conn.execute(
+            s.delete().where((s.c.timestamp >= start) & (s.c.timestamp < end))
+        )
+        conn.execute(w.delete().where(in_day))
+    return len(rows)
+
+
+def oldest_day(engine: Engine, since: datetime | None = None) -> date | None:
+    """UTC day of the oldest weather row, from `since` on if given."""
+    query = sa.select(sa.func.min(WEATHER_TABLE.c.timestamp))
+    if since is not None:
+        query = query.where(WEATHER_TABLE.c.timestamp >= since)
+    with engine.connect() as conn:
+        oldest = conn.execute(query).scalar()
+    return None if oldest is None else oldest.date()
+
+
+@flow
+def compact_weather_data(
+    retention_days: int | None = None,
+    block_name: str = "database-connector",
+    archive_dir: str | None = None,
+) -> int:
+    """Archive every whole UTC day older than the retention horizon.
+
+    Returns:
+        int: Number of weather rows moved to the archive.
+    """
+    retention = timedelta(days=retention_days or settings.ARCHIVE_RETENTION_DAYS)
+    horizon = (datetime.now(timezone.utc) - retention).date()
+    engine = get_block_engine(block_name)
+
+    archived = 0
+    day = oldest_day(engine)
+    while day is not None and day < horizon:
+        rows = archive_day(engine, day, archive_dir)
+        logger.info(f"Archived {rows:,} weather rows of {day}")
+        archived += rows
+        day = oldest_day(engine, since=day_bounds(day)[1])
+
+    logger.info(f"Compaction complete: {archived:,} rows archived before {horizon}")
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old weather rows to Parquet")
+    parser.add_argument("--retention-days", type=int, default=None)
+    parser.add_argument("--archive-dir", default=None)
+    args = parser.parse_args()
+    compact_weather_data(args.retention_days, archive_dir=args.archive_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,26 @@ class Settings(BaseSettings):
     OPENWEATHER_API_KEY: SecretStr = Field("")
     WEATHER_UPDATE_INTERVAL_MINUTES: int = Field(5, ge=2)
     DATABASE_URL: str = Field("")
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(10_000, ge=0)  # wait for a lock before "database is locked"
+    SQLITE_MMAP_SIZE: int = Field(256 * 2**20, ge=0)  # bytes of the file read through mmap
+    SQLITE_READ_POOL_SIZE: int = Field(5, ge=1)
+    LUT_CACHE_DIR: str = Field("data/lut")
+    TURBINE_ROTOR_DIAMETER_M: float = Field(40.0, ge=0)
+    TURBINE_POWER_COEFFICIENT: float = Field(0.4, ge=0)
+    SITES_FILE: str | None = Field(None)
+    OPENWEATHER_MAX_CONCURRENCY: int = Field(20, ge=1)
+    OPENWEATHER_CALLS_PER_MINUTE: float = Field(600, gt=0)
+    OPENWEATHER_MAX_RETRIES: int = Field(3, ge=0)
+    HTTP_CACHE_PATH: str = Field("data/http_cache.db")
+    HTTP_CACHE_MAX_ENTRIES: int = Field(10_000, ge=1)
+    ARCHIVE_DIR: str = Field("data/archive")
+    ARCHIVE_RETENTION_DAYS: int = Field(90, ge=1)
+    ARCHIVE_CRON: str = Field("0 3 * * *")  # schedule of the compaction to the archive
+    FORECAST_RETENTION_DAYS: int = Field(7, ge=1)  # forecasts issued earlier are deleted
+    API_CACHE_MAX_BYTES: int = Field(64 * 2**20, ge=0)  # response bodies kept by the API
+    METRICS_PORT: int | None = Field(None)  # Prometheus exporter of the ETL process
+    METRICS_MULTIPROC_DIR: str = Field("data/metrics")  # samples of the ETL flow run processes
+    TRACE_FILE: str | None = Field(None)  # opt-in: spans appended as JSON lines
 
     model_config = SettingsConfigDict(
         env_file="../../.env", env_file_encoding="utf-8", extra="ignore"
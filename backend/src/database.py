@@ -1,18 +1,204 @@
+from collections import defaultdict
+from collections.abc import Sequence
+from contextlib import nullcontext
+from functools import cache
+
+import pandas as pd
+from pydantic import BaseModel
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ColumnElement, Connection, Engine, Table, and_, event, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlmodel import SQLModel, create_engine
-from prefect_sqlalchemy import SqlAlchemyConnector
 
 from config import settings
+from db_models import forecast, rollup, simulation, weather  # noqa: F401  tables of create_all
+
+if TYPE_CHECKING:
+    from prefect_sqlalchemy import SqlAlchemyConnector
+
+UPSERT_KEY_BATCH_SIZE = 500  # keys per IN (...) lookup, below SQLite's variable limit
+
+
+# Nothing here connects or imports Prefect at import time: the engine, the
+# schema and the connector block are set up on first use, or explicitly by
+# the entry points (API startup, ETL main).
+@cache
+def get_engine() -> Engine:
+    """Engine of DATABASE_URL, created on first use and shared by the process."""
+    return configure_sqlite(create_engine(settings.DATABASE_URL))
+
+
+@cache
+def get_read_engine() -> Engine:
+    """Pooled read-only engine of DATABASE_URL, for the API and other readers.
+
+    An in-memory database exists only within its engine, so there the
+    read-write engine is shared instead.
+    """
+    engine = get_engine()
+    if engine.dialect.name != "sqlite" or engine.url.database in (None, "", ":memory:"):
+        return engine
+    read_engine = create_engine(settings.DATABASE_URL, pool_size=settings.SQLITE_READ_POOL_SIZE)
+    return configure_sqlite(read_engine, read_only=True)
+
+
+def configure_sqlite(engine: Engine, read_only: bool = False) -> Engine:
+    """Set up the connections of a SQLite engine for concurrent processes.
+
+    The ETL writes the database file while the API and the dashboard read
+    it. In WAL mode readers never block the writer nor wait for it;
+    synchronous=NORMAL is durable across application crashes in that mode
+    and saves an fsync per commit. busy_timeout makes a connection wait for
+    a lock instead of failing with "database is locked", and mmap_size reads
+    the file without copying it through the page cache. Writers begin their
+    transactions IMMEDIATE: a deferred transaction that reads first cannot
+    wait for the write lock, as upserts do, and would fail instead. Readers
+    are `query_only`. Other dialects are returned unchanged.
+    """
+    if engine.dialect.name != "sqlite":
+        return engine
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA query_only = ON" if read_only else "PRAGMA journal_mode = WAL",
+    ]
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        if not read_only:
+            # transactions are begun below rather than by the driver
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    if not read_only:
+
+        @event.listens_for(engine, "begin")
+        def begin_immediate(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+def create_db_and_tables(engine: Engine | None = None) -> None:
+    SQLModel.metadata.create_all(engine or get_engine())
+
+
+def frame_to_records(frame: pd.DataFrame) -> list[dict]:
+    """Convert a DataFrame to insert parameters, with NaN/NaT as NULL."""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+class UpsertResult(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+
+    def __add__(self, other: "UpsertResult") -> "UpsertResult":
+        return UpsertResult(
+            inserted=self.inserted + other.inserted,
+            updated=self.updated + other.updated,
+        )
+
+
+def upsert_records(
+    bind: Engine | Connection,
+    table: Table,
+    records: Sequence[dict],
+    index_elements: Sequence[str] = ("timestamp",),
+) -> UpsertResult:
+    """Insert records, updating the rows whose key already exists.
+
+    Runs one `INSERT ... ON CONFLICT (key) DO UPDATE` executemany in a single
+    transaction, on SQLite and PostgreSQL. Given a connection, the statements
+    join its current transaction instead. Records repeating a key within the
+    batch are collapsed to the last one. A conflicting row is only rewritten
+    when one of its values changed, so re-polling an unchanged observation
+    leaves `updated_at` alone.
+
+    Returns:
+        UpsertResult: Number of new keys inserted, and of keys that already
+            existed and were updated (or left as they were if unchanged).
+    """
+    if not records:
+        return UpsertResult()
+
+    unique = {tuple(record[key] for key in index_elements): record for record in records}
+    rows = list(unique.values())
+
+    dialect = bind.dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite.insert(table)
+    elif dialect == "postgresql":
+        stmt = postgresql.insert(table)
+    else:
+        raise NotImplementedError(f"Upsert is not supported for {dialect}")
+
+    value_columns = [column for column in rows[0] if column not in index_elements]
+    set_ = {column: stmt.excluded[column] for column in value_columns}
+    if "updated_at" in table.c and "updated_at" not in set_:
+        # not now(): Prefect compiles it for SQLite to a form executemany rejects
+        set_["updated_at"] = func.current_timestamp()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_=set_,
+        where=or_(*(table.c[c].is_distinct_from(stmt.excluded[c]) for c in value_columns)),
+    )
+
+    keys = list(unique)
+    transaction = nullcontext(bind) if isinstance(bind, Connection) else bind.begin()
+    with transaction as conn:
+        existing = 0
+        for i in range(0, len(keys), UPSERT_KEY_BATCH_SIZE):
+            batch = keys[i : i + UPSERT_KEY_BATCH_SIZE]
+            query = select(func.count()).select_from(table).where(
+                keys_in(table, index_elements, batch)
+            )
+            existing += conn.execute(query).scalar_one()
+        conn.execute(stmt, rows)
+
+    return UpsertResult(inserted=len(rows) - existing, updated=existing)
+
+
+def keys_in(
+    table: Table, index_elements: Sequence[str], keys: Sequence[tuple]
+) -> ColumnElement[bool]:
+    """Whether a row's key is one of `keys`, searchable through the key's index.
+
+    SQLite scans the whole index for a row-value `(site, timestamp) IN (...)`;
+    grouped by the leading columns, `site = ? AND timestamp IN (...)` is one
+    index search per key.
+    """
+    *leading, last = (table.c[key] for key in index_elements)
+    groups: defaultdict[tuple, list] = defaultdict(list)
+    for key in keys:
+        groups[key[:-1]].append(key[-1])
+    return or_(
+        *(
+            and_(*(column == value for column, value in zip(leading, prefix)), last.in_(values))
+            for prefix, values in groups.items()
+        )
+    )
+
 
-DATABASE_URL = settings.DATABASE_URL
+def get_connector() -> "SqlAlchemyConnector":
+    """Connector block of DATABASE_URL, to be saved for the flows."""
+    from prefect_sqlalchemy import SqlAlchemyConnector
 
-engine = create_engine(DATABASE_URL)
+    return SqlAlchemyConnector(connection_info=settings.DATABASE_URL)
 
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+@cache
+def get_block_engine(block_name: str) -> Engine:
+    """Pooled engine of a SqlAlchemyConnector block, shared by all task runs of the process."""
+    from prefect_sqlalchemy import SqlAlchemyConnector
 
+    connector = SqlAlchemyConnector.load(block_name)
+    return configure_sqlite(connector.get_engine())  # type: ignore[arg-type]
 
-connector = SqlAlchemyConnector(connection_info=DATABASE_URL)
 
 if __name__ == "__main__":
-    connector.save("database-connector", overwrite=True)
+    get_connector().save("database-connector", overwrite=True)
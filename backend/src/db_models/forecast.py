@@ -0,0 +1,54 @@
+"""Database models for weather forecasts."""
+
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import UniqueConstraint, func
+
+
+class WeatherForecast(SQLModel, table=True):
+    """One forecast value of the one-call `hourly` or `daily` arrays.
+
+    Rows are keyed by the time the forecast was issued (the `current.dt` of
+    the response) and the time it is for, so successive forecasts of the same
+    hour are kept side by side.
+    """
+
+    __tablename__ = "weather_forecast"
+    __table_args__ = (
+        UniqueConstraint(
+            "site", "issued_at", "resolution", "target_time",
+            name="weather_forecast_key_is_unique",
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    site: str = Field(..., description="Name of the site the forecast is for")
+    issued_at: datetime = Field(..., description="Time the forecast was issued (UTC)")
+    resolution: str = Field(..., description="hourly or daily")
+    target_time: datetime = Field(..., description="Time the forecast is for (UTC)")
+    temperature_k: float = Field(..., description="Temperature in Kelvin")
+    pressure_pa: float = Field(..., description="Pressure in Pascal")
+    humidity_percent: float = Field(..., description="Humidity as a percentage (0 to 100)")
+    dew_point_k: float = Field(..., description="Dew point in Kelvin")
+    wind_speed_m_s: float = Field(..., description="Wind speed in m/s")
+    wind_deg: int = Field(..., description="Wind direction in degrees")
+    wind_gust_m_s: float | None = Field(None, description="Wind gust in m/s")
+
+    created_at: datetime = Field(
+        default_factory=datetime.now,
+        description="Record creation timestamp",
+        sa_column_kwargs={"server_default": func.now()},
+    )
+
+
+FORECAST_KEY = ("site", "issued_at", "resolution", "target_time")
+FORECAST_COLUMNS = [
+    *FORECAST_KEY,
+    "temperature_k",
+    "pressure_pa",
+    "humidity_percent",
+    "dew_point_k",
+    "wind_speed_m_s",
+    "wind_deg",
+    "wind_gust_m_s",
+]
@@ -0,0 +1,81 @@
+"""Database models for hourly and daily weather and plant output rollups."""
+
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import UniqueConstraint, func
+
+
+class WeatherRollupBase(SQLModel):
+    """Statistics of the weather rows of one site in one time bucket.
+
+    Energy and yield integrate the power and production rate over the time
+    each row stands for, up to the next row and at most MAX_SAMPLE_S of
+    `rollups`, so they do not depend on the sampling interval. A bucket with
+    missing rows reports less: `covered_hours` tells how much it holds.
+    """
+
+    id: int | None = Field(default=None, primary_key=True)
+    site: str = Field(..., description="Name of the site")
+    bucket: datetime = Field(..., description="Start of the bucket (UTC)")
+    count: int = Field(..., description="Number of weather rows in the bucket")
+    covered_hours: float | None = Field(None, description="Hours the rows of the bucket stand for")
+
+    temperature_k_min: float = Field(..., description="Minimum temperature in Kelvin")
+    temperature_k_mean: float = Field(..., description="Mean temperature in Kelvin")
+    temperature_k_max: float = Field(..., description="Maximum temperature in Kelvin")
+    pressure_pa_min: float = Field(..., description="Minimum pressure in Pascal")
+    pressure_pa_mean: float = Field(..., description="Mean pressure in Pascal")
+    pressure_pa_max: float = Field(..., description="Maximum pressure in Pascal")
+    humidity_percent_min: float = Field(..., description="Minimum humidity in %")
+    humidity_percent_mean: float = Field(..., description="Mean humidity in %")
+    humidity_percent_max: float = Field(..., description="Maximum humidity in %")
+    dew_point_k_min: float = Field(..., description="Minimum dew point in Kelvin")
+    dew_point_k_mean: float = Field(..., description="Mean dew point in Kelvin")
+    dew_point_k_max: float = Field(..., description="Maximum dew point in Kelvin")
+    wind_speed_m_s_min: float = Field(..., description="Minimum wind speed in m/s")
+    wind_speed_m_s_mean: float = Field(..., description="Mean wind speed in m/s")
+    wind_speed_m_s_max: float = Field(..., description="Maximum wind speed in m/s")
+    wind_deg_min: float = Field(..., description="Minimum wind direction in degrees")
+    wind_deg_mean: float = Field(..., description="Mean wind direction in degrees")
+    wind_deg_max: float = Field(..., description="Maximum wind direction in degrees")
+    wind_gust_m_s_min: float | None = Field(None, description="Minimum wind gust in m/s")
+    wind_gust_m_s_mean: float | None = Field(None, description="Mean wind gust in m/s")
+    wind_gust_m_s_max: float | None = Field(None, description="Maximum wind gust in m/s")
+
+    turbine_power_w_min: float | None = Field(None, description="Minimum turbine power in W")
+    turbine_power_w_mean: float | None = Field(None, description="Mean turbine power in W")
+    turbine_power_w_max: float | None = Field(None, description="Maximum turbine power in W")
+    turbine_energy_wh: float | None = Field(None, description="Turbine energy in Wh")
+    h2_kg: float | None = Field(None, description="Hydrogen produced in kg")
+
+    updated_at: datetime = Field(
+        default_factory=datetime.now,
+        description="Record last update timestamp",
+        sa_column_kwargs={"server_default": func.now()},
+    )
+
+
+class HourlyWeatherRollup(WeatherRollupBase, table=True):
+    __tablename__ = "weather_rollup_hourly"
+    __table_args__ = (
+        UniqueConstraint("site", "bucket", name="weather_rollup_hourly_site_bucket_is_unique"),
+    )
+
+
+class DailyWeatherRollup(WeatherRollupBase, table=True):
+    __tablename__ = "weather_rollup_daily"
+    __table_args__ = (
+        UniqueConstraint("site", "bucket", name="weather_rollup_daily_site_bucket_is_unique"),
+    )
+
+
+ROLLUP_KEY = ("site", "bucket")
+ROLLUP_WEATHER_FIELDS = [
+    "temperature_k",
+    "pressure_pa",
+    "humidity_percent",
+    "dew_point_k",
+    "wind_speed_m_s",
+    "wind_deg",
+    "wind_gust_m_s",
+]
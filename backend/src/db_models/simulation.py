@@ -0,0 +1,51 @@
+"""Database models for simulated plant output."""
+
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import ForeignKeyConstraint, UniqueConstraint, func
+
+
+class Simulation(SQLModel, table=True):
+    """Plant output simulated for one weather observation.
+
+    Rows share the (site, timestamp) key of the weather row they were computed
+    from, and are deleted with it.
+    """
+
+    __tablename__ = "simulation"
+    __table_args__ = (
+        UniqueConstraint("site", "timestamp", name="simulation_site_timestamp_is_unique"),
+        ForeignKeyConstraint(
+            ["site", "timestamp"],
+            ["weather.site", "weather.timestamp"],
+            name="simulation_weather_fk",
+            ondelete="CASCADE",
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    site: str = Field(..., description="Name of the site of the weather row")
+    timestamp: datetime = Field(..., description="Timestamp of the weather row")
+    air_density_kg_m3: float = Field(..., description="Humid air density in kg/m³")
+    turbine_power_w: float = Field(..., description="Turbine power output in W")
+    stack_power_w: float = Field(..., description="Power drawn by the stack in W")
+    stack_current_a: float = Field(..., description="Stack current in A")
+    cell_voltage_v: float = Field(..., description="Cell voltage in V")
+    h2_kg_h: float = Field(..., description="Hydrogen production in kg/h")
+    efficiency: float = Field(..., description="LHV efficiency (0 to 1)")
+    heat_w: float = Field(..., description="Waste heat in W")
+
+    created_at: datetime = Field(
+        default_factory=datetime.now,
+        description="Record creation timestamp",
+        sa_column_kwargs={"server_default": func.now()},
+    )
+
+    updated_at: datetime = Field(
+        default_factory=datetime.now,
+        description="Record last update timestamp",
+        sa_column_kwargs={"server_default": func.now()},
+    )
+
+
+SIMULATION_KEY = ("site", "timestamp")
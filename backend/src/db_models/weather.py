@@ -2,18 +2,26 @@
 
 from datetime import datetime
 from sqlmodel import SQLModel, Field
-from sqlalchemy import func, event, DDL
+from sqlalchemy import func, event, DDL, Index, UniqueConstraint
 from sqlalchemy.schema import FetchedValue
-from database import engine
 
 
 class Weather(SQLModel, table=True):
     __tablename__ = "weather"
+    __table_args__ = (
+        UniqueConstraint("site", "timestamp", name="site_timestamp_is_unique"),
+        Index("ix_weather_timestamp_id", "timestamp", "id"),  # keyset pagination
+        Index("ix_weather_site_updated_at_id", "site", "updated_at", "id"),  # change feed
+    )
 
     id: int | None = Field(default=None, primary_key=True)
-    timestamp: datetime = Field(
-        ..., unique=True, description="Unix timestamp of the weather data"
+    site: str = Field(
+        "default",
+        index=True,
+        description="Name of the site the weather was observed at",
+        sa_column_kwargs={"server_default": "default"},
     )
+    timestamp: datetime = Field(..., description="Unix timestamp of the weather data")
     temperature_k: float = Field(..., description="Temperature in Kelvin")
     pressure_pa: float = Field(..., description="Pressure in Pascal")
     humidity_percent: float = Field(
@@ -40,37 +48,44 @@ class Weather(SQLModel, table=True):
     )
 
 
-# Create triggers based on database type
-dialect = engine.dialect.name
-
-if dialect == "sqlite":
-    sqlite_trigger = DDL("""
-        CREATE TRIGGER IF NOT EXISTS weather_update_timestamp 
-        AFTER UPDATE ON weather
-        FOR EACH ROW
-        BEGIN
-            UPDATE weather SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
-    """)
-    event.listen(Weather.__table__, "after_create", sqlite_trigger)
+WEATHER_KEY = ("site", "timestamp")
+WEATHER_COLUMNS = [
+    "site",
+    "timestamp",
+    "temperature_k",
+    "pressure_pa",
+    "humidity_percent",
+    "dew_point_k",
+    "wind_speed_m_s",
+    "wind_deg",
+    "wind_gust_m_s",
+]
 
-elif dialect == "postgresql":
-    pg_trigger = DDL("""
-        CREATE OR REPLACE FUNCTION update_weather_timestamp()
-        RETURNS TRIGGER AS $$
-        BEGIN
-            NEW.updated_at = CURRENT_TIMESTAMP;
-            RETURN NEW;
-        END;
-        $$ LANGUAGE plpgsql;
-        
-        DROP TRIGGER IF EXISTS weather_update_timestamp ON weather;
-        CREATE TRIGGER weather_update_timestamp
-        BEFORE UPDATE ON weather
-        FOR EACH ROW
-        EXECUTE FUNCTION update_weather_timestamp();
-    """)
-    event.listen(Weather.__table__, "after_create", pg_trigger)
 
+# Triggers keeping updated_at current, created with the table on each dialect
+sqlite_trigger = DDL("""
+    CREATE TRIGGER IF NOT EXISTS weather_update_timestamp 
+    AFTER UPDATE ON weather
+    FOR EACH ROW
+    BEGIN
+        UPDATE weather SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+    END;
+""")
+event.listen(Weather.__table__, "after_create", sqlite_trigger.execute_if(dialect="sqlite"))
 
-SQLModel.metadata.create_all(engine)
+pg_trigger = DDL("""
+    CREATE OR REPLACE FUNCTION update_weather_timestamp()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        NEW.updated_at = CURRENT_TIMESTAMP;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+    
+    DROP TRIGGER IF EXISTS weather_update_timestamp ON weather;
+    CREATE TRIGGER weather_update_timestamp
+    BEFORE UPDATE ON weather
+    FOR EACH ROW
+    EXECUTE FUNCTION update_weather_timestamp();
+""")
+event.listen(Weather.__table__, "after_create", pg_trigger.execute_if(dialect="postgresql"))
@@ -0,0 +1,97 @@
+"""Dispatch of a fluctuating power supply over a plant of several stacks.
+
+The cell voltage rises with the current, so a watt makes more hydrogen in a
+lightly loaded stack: for a given supply it pays to run as many stacks as can
+all stay above their minimum load, at the same fraction of their rated load.
+That is the H2-optimal split for identical stacks and a close one otherwise.
+Power beyond the rated load of the plant, or below the minimum load of a
+single stack, is curtailed.
+
+Stacks are started in priority order, and the order rotates by one position
+every `rotation_hours`, so the partial-load hours are spread over the plant.
+Everything is computed as (steps, stacks) arrays over the whole series; the
+only Python loop runs over the stacks to evaluate their LUTs.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from main import StackParameters, generate_lut
+from models.electrolyser import ElectrolyserModel
+
+MIN_LOAD_FRACTION = 0.1  # of the rated stack power
+ROTATION_HOURS = 24.0
+
+
+def dispatch_stacks(
+    power_w: ArrayLike,
+    hours: ArrayLike,
+    stacks: Sequence[StackParameters],
+    min_load_fraction: float | ArrayLike = MIN_LOAD_FRACTION,
+    rotation_hours: float = ROTATION_HOURS,
+) -> dict[str, np.ndarray]:
+    """Allocate a power series to M stacks.
+
+    Args:
+        power_w (ArrayLike): Available power per step in Watts, (steps,),
+            e.g. from `WindTurbineModel.power_output_watts`.
+        hours (ArrayLike): Length of each step in hours, (steps,).
+        stacks (Sequence[StackParameters]): The M stacks of the plant.
+        min_load_fraction (float | ArrayLike): Minimum load of each stack as
+            a fraction of its rated power, scalar or (M,).
+        rotation_hours (float): Period after which the priority order of the
+            stacks shifts by one position.
+
+    Returns:
+        dict[str, np.ndarray]: (steps, M) arrays power_w, current_a and
+            h2_kg_h per stack, and the (steps,) curtailed_w.
+    """
+    power = np.asarray(power_w, dtype=float)
+    hours = np.asarray(hours, dtype=float)
+    n_stacks = len(stacks)
+
+    # identical stacks share one LUT
+    luts = {}
+    for params in stacks:
+        luts.setdefault(params.model_dump_json(), generate_lut(params))
+    rated = np.array([luts[params.model_dump_json()]["P"].max() for params in stacks])
+    min_fraction = np.broadcast_to(np.asarray(min_load_fraction, dtype=float), (n_stacks,))
+    models = [
+        ElectrolyserModel(luts[params.model_dump_json()], min_power_w=fraction * rated_w)
+        for params, fraction, rated_w in zip(stacks, min_fraction, rated)
+    ]
+    min_fraction = np.array([model.min_power_w for model in models]) / rated
+
+    # order[t, j]: the stack at priority position j during step t
+    elapsed_h = np.cumsum(hours) - hours
+    shift = (elapsed_h // rotation_hours).astype(int) % n_stacks
+    order = (np.arange(n_stacks)[np.newaxis, :] + shift[:, np.newaxis]) % n_stacks
+
+    # load[t, k]: common load fraction when the first k + 1 stacks share the
+    # supply; feasible while it is above the minimum load of all of them.
+    # The load falls and the minimum rises with k, so the feasible k are a prefix
+    load = np.minimum(power[:, np.newaxis] / np.cumsum(rated[order], axis=1), 1.0)
+    feasible = load >= np.maximum.accumulate(min_fraction[order], axis=1)
+    n_active = feasible.sum(axis=1)
+
+    active_load = np.take_along_axis(load, np.maximum(n_active - 1, 0)[:, np.newaxis], axis=1)
+    position_power = np.where(
+        np.arange(n_stacks) < n_active[:, np.newaxis], active_load * rated[order], 0.0
+    )
+    allocated = np.empty_like(position_power)
+    np.put_along_axis(allocated, order, position_power, axis=1)
+
+    current = np.empty_like(allocated)
+    h2 = np.empty_like(allocated)
+    for i, model in enumerate(models):
+        point = model.interpolate(allocated[:, i])
+        current[:, i], h2[:, i] = point["I"], point["H2"]
+
+    return {
+        "power_w": allocated,
+        "current_a": current,
+        "h2_kg_h": h2,
+        "curtailed_w": power - allocated.sum(axis=1),
+    }
@@ -1,39 +1,102 @@
+import pandas as pd
 from loguru import logger
-from prefect import flow, task
-from clients.openweather import OpenWeatherClient
-
-from db_models.weather import Weather
-from database import create_db_and_tables
-
-from sqlmodel import Session
-from prefect_sqlalchemy import SqlAlchemyConnector
-
+from prefect import flow, serve, task
+from prefect.cache_policies import NONE
+from prefect.deployments.runner import RunnerDeployment
+from clients.fleet import fetch_fleet_weather
+from clients.openweather import (
+    OpenWeatherClient,
+    OpenWeatherResponse,
+    get_openweather_client,
+)
+
+from db_models.simulation import SIMULATION_KEY, Simulation
+from db_models.weather import WEATHER_COLUMNS, WEATHER_KEY, Weather
+from database import (
+    UpsertResult,
+    create_db_and_tables,
+    frame_to_records,
+    get_block_engine,
+    upsert_records,
+)
+
+from sqlalchemy import Engine
+
+from compaction import compact_weather_data
 from config import settings
+from forecast import forecast_frame, load_forecast_frame, prune_forecasts
+import metrics
+from metrics import span, start_exporter, timed
+from rollups import update_rollups
+from simulation import simulate_weather_frame
+from sites import Site, load_sites
 
 
 def main():
     create_db_and_tables()
+    start_exporter()
     # etl_weather_data()
-    etl_weather_data.serve(
-        name="etl-weather-data",
-        cron=f"*/{settings.WEATHER_UPDATE_INTERVAL_MINUTES} * * * *",  # every N minutes
-        # cron=f"*/1 * * * *",  # every 1 minute for testing
-    )
-
-
+    serve(*deployments())
+
+
+def deployments() -> list[RunnerDeployment]:
+    """The ETL every N minutes, and the compaction of old rows to the archive daily."""
+    return [
+        etl_weather_data.to_deployment(
+            name="etl-weather-data",
+            cron=f"*/{settings.WEATHER_UPDATE_INTERVAL_MINUTES} * * * *",  # every N minutes
+            # cron=f"*/1 * * * *",  # every 1 minute for testing
+        ),
+        compact_weather_data.to_deployment(
+            name="compact-weather-data",
+            cron=settings.ARCHIVE_CRON,
+        ),
+    ]
+
+
+# The runner pickles the flow and its tasks by value into each flow run's
+# subprocess; the metrics hold locks, so the tasks reach them through the
+# module, which is pickled by reference.
 @flow
-def etl_weather_data() -> None:
+async def etl_weather_data() -> None:
     block_name = "database-connector"
-    client = OpenWeatherClient()
-    weather_data = extract_weather_data(client)  # type: ignore[no-matching-overload]
-    transformed_data = transform_weather_data(weather_data)
-    load_weather_data(block_name, transformed_data)  # type: ignore[no-matching-overload]
+    client = get_openweather_client()
+    sites = load_sites()
+    with span("etl.run"):
+        weather_data, forecast = await extract_weather_data(client, sites)  # type: ignore[no-matching-overload]
+        weather, simulation = transform_weather_data(weather_data)
+        load_weather_data(block_name, weather, simulation)  # type: ignore[no-matching-overload]
+        load_forecast_data(block_name, forecast)  # type: ignore[no-matching-overload]
 
 
 @task
-def extract_weather_data(client: OpenWeatherClient) -> Weather:
-    api_response = client.fetch_current_weather_sync()
+async def extract_weather_data(
+    client: OpenWeatherClient, sites: list[Site]
+) -> tuple[list[Weather], pd.DataFrame]:
+    """Fetch the current weather and the forecasts of every site concurrently."""
+    with timed(metrics.ETL_TASK_SECONDS, "etl.extract", task="extract") as attributes:
+        responses, errors = await fetch_fleet_weather(client, sites)
+        attributes.update(sites=len(sites), errors=len(errors))
+    for site_name, error in errors.items():
+        logger.error(f"Weather extraction failed for site {site_name}: {error!r}")
+    if errors and not responses:
+        raise RuntimeError(f"Weather extraction failed for all {len(errors)} sites")
+    stats = client.cache_stats
+    logger.info(
+        f"Extracted weather for {len(responses)} of {len(sites)} sites "
+        f"(cache hits {stats.hits}, misses {stats.misses} since start)"
+    )
+    with timed(metrics.ETL_TASK_SECONDS, "etl.validate", task="validate"):
+        weather = [
+            weather_from_response(site_name, response)
+            for site_name, response in responses.items()
+        ]
+        return weather, forecast_frame(responses)
+
+
+def weather_from_response(site_name: str, api_response: OpenWeatherResponse) -> Weather:
     weather_dict = {
+        "site": site_name,
         "timestamp": api_response.dt,
         "temperature_k": api_response.temp_k,
         "pressure_pa": api_response.pressure_hpa * 100,
@@ -43,24 +106,85 @@ def extract_weather_data(client: OpenWeatherClient) -> Weather:
         "wind_deg": api_response.wind_deg,
         "wind_gust_m_s": api_response.wind_gust_m_s,
     }
-    weather_data = Weather.model_validate(weather_dict)
-    return weather_data
-
-
-@task
-def transform_weather_data(weather_data: Weather) -> Weather:
-    # Placeholder for any transformation logic if needed
-    return weather_data
-
-
-@task
-def load_weather_data(block_name: str, weather_data: Weather) -> None:
-    logger.info("Loading weather data into the database")
-    with SqlAlchemyConnector.load(block_name) as connector:  # type: ignore[invalid-context-manager]
-        with Session(connector.get_engine()) as session:
-            session.add(weather_data)
-            session.commit()
-
+    return Weather.model_validate(weather_dict)
+
+
+def simulate_weather_rows(weather: pd.DataFrame) -> pd.DataFrame:
+    """Simulated plant output of each weather row, keyed like the row."""
+    return weather[list(SIMULATION_KEY)].join(simulate_weather_frame(weather))
+
+
+def load_weather_frames(
+    engine: Engine, weather: pd.DataFrame, simulation: pd.DataFrame
+) -> tuple[UpsertResult, UpsertResult]:
+    """Upsert weather rows and their simulation rows in one transaction.
+
+    The hourly and daily rollup buckets touched by the rows are recomputed in
+    the same transaction. The rows inserted and updated are counted in
+    ETL_ROWS.
+    """
+    with engine.begin() as conn:
+        weather_result = upsert_records(
+            conn, Weather.__table__, frame_to_records(weather[WEATHER_COLUMNS]), WEATHER_KEY  # type: ignore[arg-type]
+        )
+        simulation_result = upsert_records(
+            conn, Simulation.__table__, frame_to_records(simulation), SIMULATION_KEY  # type: ignore[arg-type]
+        )
+        update_rollups(conn, weather)
+    for table, result in (("weather", weather_result), ("simulation", simulation_result)):
+        metrics.ETL_ROWS.labels(table=table, result="inserted").inc(result.inserted)
+        metrics.ETL_ROWS.labels(table=table, result="updated").inc(result.updated)
+    return weather_result, simulation_result
+
+
+@task(cache_policy=NONE)
+def transform_weather_data(weather_data: list[Weather]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Tabulate the weather records and simulate the plant for all of them at once."""
+    with timed(metrics.ETL_TASK_SECONDS, "etl.transform", task="transform"):
+        weather = pd.DataFrame(
+            [record.model_dump(include=set(WEATHER_COLUMNS)) for record in weather_data],
+            columns=WEATHER_COLUMNS,
+        )
+        timestamp = pd.to_datetime(weather["timestamp"], utc=True)
+        weather["timestamp"] = timestamp.dt.tz_localize(None)  # stored as UTC
+        return weather, simulate_weather_rows(weather)
+
+
+@task(cache_policy=NONE)
+def load_weather_data(
+    block_name: str, weather: pd.DataFrame, simulation: pd.DataFrame
+) -> tuple[UpsertResult, UpsertResult]:
+    logger.info(f"Loading {len(weather)} weather records into the database")
+    with timed(metrics.ETL_TASK_SECONDS, "etl.load", task="load") as attributes:
+        weather_result, simulation_result = load_weather_frames(
+            get_block_engine(block_name), weather, simulation
+        )
+        attributes.update(rows=len(weather))
+    logger.info(
+        f"Inserted {weather_result.inserted}, updated {weather_result.updated} weather records; "
+        f"inserted {simulation_result.inserted}, updated {simulation_result.updated} simulation records"
+    )
+    return weather_result, simulation_result
+
+
+@task(cache_policy=NONE)
+def load_forecast_data(block_name: str, forecast: pd.DataFrame) -> UpsertResult:
+    """Store the forecasts of all sites with one batched upsert, and prune the old ones."""
+    with timed(metrics.ETL_TASK_SECONDS, "etl.load_forecast", task="load_forecast") as attributes:
+        engine = get_block_engine(block_name)
+        result = load_forecast_frame(engine, forecast)
+        pruned = 0
+        if not forecast.empty:
+            sites = forecast["site"].unique().tolist()
+            pruned = prune_forecasts(engine, sites=sites, since=forecast["issued_at"].min())
+        attributes.update(rows=len(forecast), pruned=pruned)
+    metrics.ETL_ROWS.labels(table="weather_forecast", result="inserted").inc(result.inserted)
+    metrics.ETL_ROWS.labels(table="weather_forecast", result="updated").inc(result.updated)
+    logger.info(
+        f"Inserted {result.inserted}, updated {result.updated}, "
+        f"pruned {pruned} weather forecast records"
+    )
+    return result
 
 
 if __name__ == "__main__":
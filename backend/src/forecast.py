@@ -0,0 +1,167 @@
+"""Weather forecasts: batched loading and projection to plant output.
+
+Every fetch of the one-call API carries 48 hourly and 8 daily forecast
+values per site. `forecast_frame` tabulates them for all sites at once and
+`load_forecast_frame` stores them with one batched upsert, and
+`prune_forecasts` deletes the issues no longer needed. `project_forecast`
+runs the plant physics over any number of forecasts in one vectorized call,
+giving the expected turbine power and H2 production of the next hours.
+"""
+
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import sqlalchemy as sa
+from sqlalchemy import Connection, Engine
+
+from clients.openweather import OpenWeatherResponse, parse_forecast
+from config import settings
+from database import (
+    UPSERT_KEY_BATCH_SIZE,
+    UpsertResult,
+    frame_to_records,
+    keys_in,
+    upsert_records,
+)
+from db_models.forecast import FORECAST_COLUMNS, FORECAST_KEY, WeatherForecast
+from models.electrolyser import ElectrolyserModel
+from models.wind import WindTurbineModel
+from simulation import simulate_weather_frame
+
+PROJECTION_HOURS = 48
+
+FORECAST_TABLE: sa.Table = WeatherForecast.__table__  # type: ignore[assignment]
+
+
+def forecast_frame(responses: dict[str, OpenWeatherResponse]) -> pd.DataFrame:
+    """FORECAST_COLUMNS of the forecasts in the responses, keyed by site name."""
+    frames = [parse_forecast(response).assign(site=site) for site, response in responses.items()]
+    if not frames:
+        return pd.DataFrame(columns=FORECAST_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[FORECAST_COLUMNS]
+
+
+def load_forecast_frame(bind: Engine | Connection, forecast: pd.DataFrame) -> UpsertResult:
+    """Store the forecast rows with one batched upsert.
+
+    A forecast fetched twice (e.g. served from the HTTP cache) has the same
+    issue time, so its rows are updated rather than duplicated.
+    """
+    return upsert_records(
+        bind, FORECAST_TABLE, frame_to_records(forecast[FORECAST_COLUMNS]), FORECAST_KEY
+    )
+
+
+def prune_forecasts(
+    engine: Engine,
+    now: datetime | None = None,
+    sites: Sequence[str] | None = None,
+    since: datetime | None = None,
+) -> int:
+    """Delete the superseded and the expired forecasts.
+
+    Polled every few minutes, each site gains 56 rows per poll, some 16 000
+    a day. Of the issues of one site within a clock hour only the latest is
+    kept, and issues older than FORECAST_RETENTION_DAYS are deleted. Both
+    deletes are range scans of the (site, issued_at, ...) key.
+
+    Args:
+        sites (Sequence[str] | None): Sites to prune, default all.
+        since (datetime | None): Only issues from the clock hour of `since`
+            on are checked for being superseded. A new issue only supersedes
+            the earlier ones of its hour, so after a load its earliest issue
+            is enough; default all issues.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    table = FORECAST_TABLE
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)  # stored as naive UTC
+    horizon = now - timedelta(days=settings.FORECAST_RETENTION_DAYS)
+    of_sites = sa.true() if sites is None else table.c.site.in_(sites)
+    query = sa.select(table.c.site, table.c.issued_at).where(of_sites).distinct()
+    if since is not None:
+        query = query.where(table.c.issued_at >= pd.Timestamp(since).floor("h").to_pydatetime())
+    with engine.begin() as conn:
+        deleted = conn.execute(table.delete().where(of_sites & (table.c.issued_at < horizon))).rowcount
+        issues = pd.DataFrame(conn.execute(query).all(), columns=["site", "issued_at"])
+        if issues.empty:
+            return deleted
+        hour = pd.to_datetime(issues["issued_at"]).dt.floor("h")
+        latest = issues.groupby([issues["site"], hour])["issued_at"].transform("max")
+        superseded = list(issues[issues["issued_at"] < latest].itertuples(index=False, name=None))
+        for i in range(0, len(superseded), UPSERT_KEY_BATCH_SIZE):
+            batch = superseded[i : i + UPSERT_KEY_BATCH_SIZE]
+            deleted += conn.execute(
+                table.delete().where(keys_in(table, ("site", "issued_at"), batch))
+            ).rowcount
+    return deleted
+
+
+def latest_forecast(engine: Engine, site: str) -> pd.DataFrame:
+    """Hourly rows of the most recent forecast of a site."""
+    table = FORECAST_TABLE
+    latest = (
+        sa.select(sa.func.max(table.c.issued_at))
+        .where(table.c.site == site)
+        .scalar_subquery()
+    )
+    query = (
+        sa.select(*(table.c[name] for name in FORECAST_COLUMNS))
+        .where(
+            (table.c.site == site)
+            & (table.c.issued_at == latest)
+            & (table.c.resolution == "hourly")
+        )
+        .order_by(table.c.target_time)
+    )
+    with engine.connect() as conn:
+        forecast = pd.read_sql_query(query, conn)
+    for column in ("issued_at", "target_time"):
+        forecast[column] = pd.to_datetime(forecast[column], format="ISO8601")
+    return forecast
+
+
+def project_forecast(
+    forecast: pd.DataFrame,
+    horizon_hours: float = PROJECTION_HOURS,
+    turbine: WindTurbineModel | None = None,
+    electrolyser: ElectrolyserModel | None = None,
+) -> pd.DataFrame:
+    """Expected plant output of each hourly forecast value within the horizon.
+
+    Any number of sites and issue times are projected in one call. Each
+    forecast keeps `horizon_hours` values, starting with the hour in
+    progress at its issue time.
+
+    Returns:
+        pd.DataFrame: site, issued_at, target_time, wind_speed_m_s,
+            turbine_power_w, stack_power_w and h2_kg_h.
+    """
+    lead = forecast["target_time"] - forecast["issued_at"].dt.floor("h")
+    hourly = forecast[
+        (forecast["resolution"] == "hourly")
+        & (lead >= timedelta(0))
+        & (lead < timedelta(hours=horizon_hours))
+    ]
+    simulation = simulate_weather_frame(hourly, turbine, electrolyser)
+    return hourly[["site", "issued_at", "target_time", "wind_speed_m_s"]].join(
+        simulation[["turbine_power_w", "stack_power_w", "h2_kg_h"]]
+    ).reset_index(drop=True)
+
+
+def projection_totals(projection: pd.DataFrame) -> pd.DataFrame:
+    """Turbine energy and H2 over the horizon, per site and issue time.
+
+    Hourly values each stand for one hour, so energy in kWh is the sum of the
+    power in kW and H2 in kg the sum of the rate in kg/h.
+    """
+    grouped = projection.groupby(["site", "issued_at"], sort=True)
+    return pd.DataFrame(
+        {
+            "hours": grouped.size(),
+            "turbine_energy_kwh": grouped["turbine_power_w"].sum() / 1000,
+            "h2_kg": grouped["h2_kg_h"].sum(),
+        }
+    ).reset_index()
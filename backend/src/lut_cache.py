@@ -0,0 +1,90 @@
+"""On-disk cache of the temperature-aware electrolyser lookup table.
+
+The 2-D LUT is built once per set of stack parameters and stored as one `.npy`
+file per array under `LUT_CACHE_DIR/<parameter hash>/`. Every process (ETL,
+API, dashboard) then opens the same files with `np.load(mmap_mode="r")`, so the
+operating system keeps a single copy of the pages in memory.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+from numpy.typing import ArrayLike
+
+from config import settings
+from main import TEMPERATURES, CURRENTS, StackParameters, generate_lut_2d
+
+LUT_CACHE_VERSION = 1  # bump when the physics in main.py changes
+LUT_ARRAYS = ("I", "T", "V_stack", "P", "H2", "Heat")
+
+
+def lut_cache_key(params: StackParameters, temperatures_k: ArrayLike) -> str:
+    """Hash of everything the content of the LUT depends on."""
+    payload = {
+        "version": LUT_CACHE_VERSION,
+        "params": params.model_dump(),
+        "currents": np.asarray(CURRENTS, dtype=float).tolist(),
+        "temperatures": np.asarray(temperatures_k, dtype=float).tolist(),
+        "arrays": list(LUT_ARRAYS),
+    }
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_lut_2d(
+    params: StackParameters | None = None,
+    temperatures_k: ArrayLike | None = None,
+    cache_dir: str | os.PathLike | None = None,
+) -> dict[str, np.ndarray]:
+    """Return the 2-D LUT as read-only memory-mapped arrays, building it if needed."""
+    params = params or StackParameters()
+    temperatures = TEMPERATURES if temperatures_k is None else temperatures_k
+    cache_root = Path(cache_dir or settings.LUT_CACHE_DIR)
+    lut_dir = cache_root / lut_cache_key(params, temperatures)
+
+    if not _is_complete(lut_dir):
+        _build_lut_dir(lut_dir, params, temperatures)
+
+    return {
+        name: np.load(lut_dir / f"{name}.npy", mmap_mode="r") for name in LUT_ARRAYS
+    }
+
+
+def _is_complete(lut_dir: Path) -> bool:
+    return all((lut_dir / f"{name}.npy").exists() for name in LUT_ARRAYS)
+
+
+def _build_lut_dir(
+    lut_dir: Path, params: StackParameters, temperatures_k: ArrayLike
+) -> None:
+    logger.info(f"Building electrolyser LUT cache in {lut_dir}")
+    lut_dir.parent.mkdir(parents=True, exist_ok=True)
+    lut = generate_lut_2d(params, temperatures_k)
+
+    # write into a scratch directory and rename it into place, so concurrent
+    # processes never see a half-written cache entry
+    tmp_dir = Path(tempfile.mkdtemp(dir=lut_dir.parent, prefix=".tmp-"))
+    try:
+        for name in LUT_ARRAYS:
+            np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(lut[name]))
+        try:
+            os.replace(tmp_dir, lut_dir)
+        except OSError:
+            # another process finished first: its entry is identical, keep it
+            if _is_complete(lut_dir):
+                return
+            # an entry left incomplete (e.g. written by hand or cut short): replace it
+            logger.warning(f"Replacing incomplete electrolyser LUT cache in {lut_dir}")
+            shutil.rmtree(lut_dir, ignore_errors=True)
+            os.replace(tmp_dir, lut_dir)
+    except OSError:
+        if not _is_complete(lut_dir):
+            raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -1,23 +1,23 @@
 # generate a lookup table (LUT) for V_cell (cell voltage) vs I (cell current).
 # assume
-# V_cell(I) = V_rev + eta_act + eta_ohm + eta_con
+# V_cell(I, T) = V_rev(T) + eta_act + eta_ohm + eta_con
 # where:
-# V_rev = reversible voltage (constant)
+# V_rev = reversible voltage (temperature correlation at standard pressure)
 # eta_act = A * ln(I / (Area * j0))  (activation overpotential)
 # eta_ohm = I * R_cell  (ohmic overpotential)
 # eta_con = R*T/(n*F) * ln(jL/(jL - j))  (concentration overpotential)
-# V_cell(I) = V_rev + A*ln(I/Area/j0) + I*R_cell + R*T/(n*F) * ln(jL/(jL - j))
+# V_cell(I, T) = V_rev(T) + A*ln(I/Area/j0) + I*R_cell + R*T/(n*F) * ln(jL/(jL - j))
 
 
 import numpy as np
 import pandas as pd
+from numpy.typing import ArrayLike
+from pydantic import BaseModel, Field
 
 # --- 1. Simulation Setup (Lookup Table) ---
 # Parameters for a 10-cell PEM stack at 80°C
 N_CELLS = 10
 AREA = 250  # cm^2
-# V_REV = 1.23
-V_REV = 1.18  # adjusted for 80°C (353K) operation
 V_TN = 1.48
 R_CELL = 0.05  # Ohm (constant for now)
 J_LIMIT = 6.0  # A/cm^2
@@ -26,12 +26,29 @@ J0 = 1e-4
 
 R = 8.314  # J/(mol·K)
 T_spec = 353  # K
+T_COLD = 278  # K, cold start
 n = 2  # number of electrons
 F = 96485  # C/mol
 
-MM_H2 = 2016  # kg/mol
+MM_H2 = 2.016e-3  # kg/mol
 SECONDS_PER_HOUR = 3600
 
+CURRENTS = np.linspace(1, 5000, 5000) / 10  # 0.1A to 500A
+TEMPERATURES = np.arange(T_COLD, T_spec + 1, 1.0)  # 1 K steps
+
+
+class StackParameters(BaseModel):
+    """Electrochemical parameters of a PEM stack."""
+
+    n_cells: int = Field(N_CELLS, ge=1, description="Number of cells in the stack")
+    area_cm2: float = Field(AREA, gt=0, description="Active cell area in cm^2")
+    r_cell_ohm: float = Field(R_CELL, ge=0, description="Cell resistance in Ohm")
+    j_limit_a_cm2: float = Field(
+        J_LIMIT, gt=0, description="Limiting current density in A/cm^2"
+    )
+    a_tafel_v: float = Field(A_TAFEL, ge=0, description="Tafel slope in V")
+    j0_a_cm2: float = Field(J0, gt=0, description="Exchange current density in A/cm^2")
+
 
 def main():
     lut = generate_lut()
@@ -40,23 +57,47 @@ def main():
     lut.plot(x="I", y=["V_stack", "P", "H2", "Heat"], subplots=True, layout=(2, 2))
 
 
-def generate_lut():
-    currents = np.linspace(1, 5000, 5000) / 10  # 0.1A to 500A
-    data = []
-    j = currents / AREA
-    eta_act = A_TAFEL * np.log(j / J0)
-    eta_ohm = currents * R_CELL
+def reversible_voltage(temperature_k: ArrayLike) -> np.ndarray:
+    """Reversible cell voltage of water electrolysis at standard pressure.
+
+    Uses the empirical temperature correlation of LeRoy et al., which gives
+    1.229 V at 25°C and about 1.18 V at 80°C.
+    """
+    T = np.asarray(temperature_k, dtype=float)
+    return 1.5184 - 1.5421e-3 * T + 9.523e-5 * T * np.log(T) + 9.84e-8 * T**2
+
+
+def cell_voltage(
+    currents: ArrayLike, temperature_k: ArrayLike, params: StackParameters
+) -> np.ndarray:
+    """Cell voltage for the given currents and temperatures (broadcast)."""
+    currents = np.asarray(currents, dtype=float)
+    T = np.asarray(temperature_k, dtype=float)
+    j = currents / params.area_cm2
+    j_limit = params.j_limit_a_cm2
+    eta_act = params.a_tafel_v * np.log(j / params.j0_a_cm2)
+    eta_ohm = currents * params.r_cell_ohm
     eta_con = np.where(
-        j < J_LIMIT, (R * T_spec) / (n * F) * np.log(J_LIMIT / (J_LIMIT - j)), 5.0
+        j < j_limit,
+        (R * T) / (n * F) * np.log(j_limit / np.maximum(j_limit - j, 1e-12)),
+        5.0,
     )  # cap eta_con to avoid infinity
-    v_cell = V_REV + eta_act + eta_ohm + eta_con
-    p_stack = currents * v_cell * N_CELLS
-    h2_kg_h = (currents * N_CELLS / (n * F)) * MM_H2 * SECONDS_PER_HOUR
-    heat_w = currents * (v_cell - V_TN) * N_CELLS
+    return reversible_voltage(T) + eta_act + eta_ohm + eta_con
+
+
+def generate_lut(
+    params: StackParameters | None = None, temperature_k: float = T_spec
+) -> pd.DataFrame:
+    params = params or StackParameters()
+    currents = CURRENTS
+    v_cell = cell_voltage(currents, temperature_k, params)
+    p_stack = currents * v_cell * params.n_cells
+    h2_kg_h = (currents * params.n_cells / (n * F)) * MM_H2 * SECONDS_PER_HOUR
+    heat_w = currents * (v_cell - V_TN) * params.n_cells
 
     data = {
         "I": currents,
-        "V_stack": v_cell * N_CELLS,
+        "V_stack": v_cell * params.n_cells,
         "P": p_stack,
         "H2": h2_kg_h,
         "Heat": heat_w,
@@ -65,5 +106,32 @@ def generate_lut():
     return pd.DataFrame(data)
 
 
+def generate_lut_2d(
+    params: StackParameters | None = None, temperatures_k: ArrayLike | None = None
+) -> dict[str, np.ndarray]:
+    """Generate the LUT over a current x temperature grid.
+
+    Returns:
+        dict[str, np.ndarray]: the grid axes "I" (n_I,) and "T" (n_T,), and
+            the tables "V_stack", "P", "H2" and "Heat" of shape (n_T, n_I).
+    """
+    params = params or StackParameters()
+    temperatures = TEMPERATURES if temperatures_k is None else temperatures_k
+    temperatures = np.asarray(temperatures, dtype=float)
+    currents = CURRENTS
+
+    v_cell = cell_voltage(currents[np.newaxis, :], temperatures[:, np.newaxis], params)
+    h2_kg_h = (currents * params.n_cells / (n * F)) * MM_H2 * SECONDS_PER_HOUR
+
+    return {
+        "I": currents,
+        "T": temperatures,
+        "V_stack": v_cell * params.n_cells,
+        "P": currents * v_cell * params.n_cells,
+        "H2": np.broadcast_to(h2_kg_h, v_cell.shape).copy(),
+        "Heat": currents * (v_cell - V_TN) * params.n_cells,
+    }
+
+
 if __name__ == "__main__":
     main()
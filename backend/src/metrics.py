@@ -0,0 +1,211 @@
+"""Prometheus metrics of the hot paths, and opt-in tracing to a local file.
+
+The API serves the metrics on /metrics, the ETL process on METRICS_PORT
+through the prometheus_client exporter. The Prefect runner executes each
+flow run of the ETL in a spawned subprocess, so the ETL metrics use the
+multiprocess mode of prometheus_client: every process writes its samples to
+files in METRICS_MULTIPROC_DIR, and the exporter sums them. Before each
+scrape, the files of the processes that have exited are folded into one file
+per metric type, so the directory does not grow with every flow run.
+
+When TRACE_FILE is set, every timed block is also appended to that file as
+a span, one JSON object per line, with the trace and parent span ids needed
+to rebuild the call tree.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess, start_http_server
+from prometheus_client.mmap_dict import MmapedDict
+
+from config import settings
+
+ROW_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+# metric types whose samples add up across processes; the files of the others are not merged
+ADDITIVE_TYPES = ("counter", "histogram")
+
+ETL_TASK_SECONDS = Histogram(
+    "etl_task_duration_seconds", "Duration of the ETL tasks", ["task"]
+)
+ETL_ROWS = Counter(
+    "etl_rows_total", "Rows upserted; updated rows are key conflicts", ["table", "result"]
+)
+OPENWEATHER_REQUEST_SECONDS = Histogram(
+    "openweather_request_duration_seconds", "Latency of the OpenWeather API calls", ["cache"]
+)
+OPENWEATHER_REQUESTS = Counter(
+    "openweather_requests_total", "OpenWeather API calls", ["status", "cache"]
+)
+API_REQUEST_SECONDS = Histogram(
+    "api_request_duration_seconds",
+    "API latency, up to the first byte of streamed responses",
+    ["route", "method", "status"],
+)
+API_ROWS = Histogram(
+    "api_response_rows", "Rows returned per API response", ["route", "format"], buckets=ROW_BUCKETS
+)
+API_CACHE_REQUESTS = Counter(
+    "api_cache_requests_total",
+    "Cacheable API requests, by outcome: not_modified (304), hit or miss",
+    ["route", "result"],
+)
+
+_current_span: ContextVar[dict | None] = ContextVar("current_span", default=None)
+_trace_lock = threading.Lock()
+
+
+def write_span(record: dict) -> None:
+    line = json.dumps(record, default=str) + "\n"
+    with _trace_lock, open(settings.TRACE_FILE, "a") as file:  # type: ignore[arg-type]
+        file.write(line)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[dict]:
+    """Record the block as a span in TRACE_FILE, if tracing is on.
+
+    Yields the span attributes, so the block can add to them (e.g. a row
+    count). Spans opened inside the block, in the same thread or task,
+    become its children.
+    """
+    if not settings.TRACE_FILE:
+        yield attributes
+        return
+
+    parent = _current_span.get()
+    record = {
+        "name": name,
+        "trace_id": parent["trace_id"] if parent else uuid.uuid4().hex,
+        "span_id": uuid.uuid4().hex[:16],
+        "parent_id": parent["span_id"] if parent else None,
+        "start": time.time(),
+        "attributes": attributes,
+    }
+    token = _current_span.set(record)
+    start = time.perf_counter()
+    try:
+        yield attributes
+    except BaseException as exc:
+        record["error"] = repr(exc)
+        raise
+    finally:
+        record["duration_s"] = time.perf_counter() - start
+        _current_span.reset(token)
+        write_span(record)
+
+
+@contextmanager
+def timed(histogram: Histogram, name: str, **labels) -> Iterator[dict]:
+    """Observe the duration of the block in `histogram`, and trace it as `name`."""
+    start = time.perf_counter()
+    with span(name, **labels) as attributes:
+        try:
+            yield attributes
+        finally:
+            histogram.labels(**labels).observe(time.perf_counter() - start)
+
+
+def has_exited(path: Path) -> bool:
+    """Whether the process that wrote a `<type>_<pid>.db` file has exited."""
+    pid = path.stem.rpartition("_")[2]
+    if not pid.isdigit():
+        return False  # a merged file
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+def merge_exited_processes(directory: str) -> int:
+    """Fold the metric files of exited processes into `<type>_merged.db`.
+
+    Counter and histogram samples are summed into the merged file, which is
+    replaced atomically before the files are removed. Returns the number of
+    files removed.
+    """
+    removed = 0
+    paths = list(Path(directory).glob("*.db"))
+    exited_pids = {path.stem.rpartition("_")[2] for path in paths if has_exited(path)}
+    for pid in exited_pids:
+        multiprocess.mark_process_dead(pid, directory)  # removes their live gauges
+    for typ in ADDITIVE_TYPES:
+        exited = [path for path in Path(directory).glob(f"{typ}_*.db") if has_exited(path)]
+        if not exited:
+            continue
+        merged = Path(directory) / f"{typ}_merged.db"
+        totals: dict[str, float] = {}
+        for path in [merged, *exited] if merged.exists() else exited:
+            for key, value, _, _ in MmapedDict.read_all_values_from_file(str(path)):
+                totals[key] = totals.get(key, 0.0) + value
+        tmp_path = merged.with_suffix(".tmp")
+        tmp_path.unlink(missing_ok=True)
+        values = MmapedDict(str(tmp_path))
+        try:
+            for key, value in totals.items():
+                values.write_value(key, value, 0.0)
+        finally:
+            values.close()
+        os.replace(tmp_path, merged)
+        for path in exited:
+            path.unlink()
+        removed += len(exited)
+    return removed
+
+
+class MergingCollector(multiprocess.MultiProcessCollector):
+    """Multiprocess collector that merges the files of exited processes first.
+
+    Scrapes are served from several threads; the lock keeps one from reading
+    files another is merging.
+    """
+
+    def __init__(self, registry: CollectorRegistry, path: str):
+        self._lock = threading.Lock()
+        super().__init__(registry, path=path)
+
+    def collect(self):
+        with self._lock:
+            merge_exited_processes(self._path)
+            return super().collect()
+
+
+def multiprocess_registry(directory: str) -> CollectorRegistry:
+    """Registry of the samples all processes wrote to `directory`."""
+    registry = CollectorRegistry()
+    MergingCollector(registry, directory)
+    return registry
+
+
+def share_metrics_with_children() -> str:
+    """Make this process and the processes it starts write their metrics to files.
+
+    The children inherit PROMETHEUS_MULTIPROC_DIR, which prometheus_client
+    reads when it is imported, so this must run before the flow runs are
+    started. The files of earlier runs are removed, as a restarted exporter
+    starts its counters from zero. Returns the directory of the files.
+    """
+    directory = Path(settings.METRICS_MULTIPROC_DIR).resolve()
+    directory.mkdir(parents=True, exist_ok=True)
+    for stale in directory.glob("*.db"):
+        stale.unlink()
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(directory)
+    return str(directory)
+
+
+def start_exporter() -> None:
+    """Serve the metrics of this process and its flow runs on METRICS_PORT, if set."""
+    if not settings.METRICS_PORT:
+        return
+    directory = share_metrics_with_children()
+    start_http_server(settings.METRICS_PORT, registry=multiprocess_registry(directory))
@@ -1,6 +1,7 @@
 """Model air properties"""
 
 import numpy as np
+from numpy.typing import ArrayLike
 from pydantic import BaseModel, Field
 
 
@@ -22,18 +23,26 @@ class AirState(BaseModel):
 
 
 def calc_humid_air_density(
-    temperature_c: float, pressure_pa: float, relative_humidity: float
-) -> float:
+    temperature_c: ArrayLike, pressure_pa: ArrayLike, relative_humidity: ArrayLike
+) -> float | np.ndarray:
     """Calculate the density of humid air using the ideal gas law.
 
+    Works element-wise on scalars, NumPy arrays or pandas Series; the inputs
+    are broadcast against each other.
+
     Args:
-        temperature_c (float): Temperature in degrees Celsius.
-        pressure_pa (float): Atmospheric pressure in Pascals.
-        relative_humidity (float): Relative humidity as a fraction (0 to 1).
+        temperature_c (ArrayLike): Temperature in degrees Celsius.
+        pressure_pa (ArrayLike): Atmospheric pressure in Pascals.
+        relative_humidity (ArrayLike): Relative humidity as a fraction (0 to 1).
 
     Returns:
-        float: Density of humid air in kg/m^3.
+        float | np.ndarray: Density of humid air in kg/m^3, a float for
+            scalar inputs and an array of the broadcast shape otherwise.
     """
+    temperature_c = np.asarray(temperature_c, dtype=float)
+    pressure_pa = np.asarray(pressure_pa, dtype=float)
+    relative_humidity = np.asarray(relative_humidity, dtype=float)
+
     # Constants
     R_dry_air = 287.05  # J/(kg·K)
     R_water_vapor = 461.495  # J/(kg·K)
@@ -56,4 +65,27 @@ def calc_humid_air_density(
     density_dry_air = pd / (R_dry_air * temperature_k)
     density_water_vapor = e / (R_water_vapor * temperature_k)
 
-    return density_dry_air + density_water_vapor
+    density = density_dry_air + density_water_vapor
+    return float(density) if density.ndim == 0 else density
+
+
+def weather_air_density(
+    temperature_k: ArrayLike, pressure_pa: ArrayLike, humidity_percent: ArrayLike
+) -> np.ndarray:
+    """Density of humid air from the units stored in the weather table.
+
+    Args:
+        temperature_k (ArrayLike): Temperature in Kelvin.
+        pressure_pa (ArrayLike): Atmospheric pressure in Pascals.
+        humidity_percent (ArrayLike): Relative humidity in percent (0 to 100).
+
+    Returns:
+        np.ndarray: Density of humid air in kg/m^3.
+    """
+    return np.asarray(
+        calc_humid_air_density(
+            temperature_c=np.asarray(temperature_k, dtype=float) - 273.15,
+            pressure_pa=pressure_pa,
+            relative_humidity=np.asarray(humidity_percent, dtype=float) / 100,
+        )
+    )
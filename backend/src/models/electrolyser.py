@@ -0,0 +1,188 @@
+"""Model for the electrolyser stack operating point"""
+
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike
+
+LUT_COLUMNS = ("I", "V_stack", "P", "H2", "Heat")
+
+
+def _grid_index(grid: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Lower grid index and linear weight of each value, clipped to the grid."""
+    clipped = np.clip(values, grid[0], grid[-1])
+    idx = np.searchsorted(grid, clipped, side="right") - 1
+    idx = np.clip(idx, 0, len(grid) - 2)
+    weight = (clipped - grid[idx]) / (grid[idx + 1] - grid[idx])
+    return idx, weight
+
+
+class ElectrolyserModel:
+    """Invert the electrolyser lookup table: stack power -> operating point.
+
+    The LUT built by `main.generate_lut` is indexed by current. Stack power
+    grows monotonically with current, so the table is re-indexed once by power
+    and any number of power samples is then evaluated with one
+    `np.searchsorted` and a linear interpolation of every LUT column.
+
+    Power below the minimum load leaves the stack idle (all outputs are zero),
+    power above the rated load is clipped to the rated operating point.
+    """
+
+    def __init__(self, lut: pd.DataFrame, min_power_w: float | None = None):
+        missing = set(LUT_COLUMNS) - set(lut.columns)
+        if missing:
+            raise ValueError(f"LUT is missing columns: {sorted(missing)}")
+
+        lut = lut.sort_values("I")
+        power = lut["P"].to_numpy(dtype=float)
+        table = lut.loc[:, list(LUT_COLUMNS)].to_numpy(dtype=float)
+
+        # keep only the rows that extend the running maximum of P, so the
+        # power index is strictly increasing and searchsorted is well defined
+        running_max = np.maximum.accumulate(np.concatenate(([-np.inf], power[:-1])))
+        keep = power > running_max
+        if keep.sum() < 2:
+            raise ValueError("LUT must contain at least two distinct power levels")
+
+        self._power = power[keep]
+        self._table = table[keep]
+
+        self.max_power_w = float(self._power[-1])
+        self.min_power_w = float(self._power[0])
+        if min_power_w is not None:
+            self.min_power_w = float(np.clip(min_power_w, self._power[0], self.max_power_w))
+
+    def interpolate(self, power_w: ArrayLike) -> dict[str, np.ndarray]:
+        """Evaluate the operating point for an array of stack power values.
+
+        Args:
+            power_w (ArrayLike): Available power in Watts, any shape.
+
+        Returns:
+            dict[str, np.ndarray]: One array per LUT column, same shape as
+                `power_w`. NaN inputs propagate to NaN outputs.
+        """
+        power = np.asarray(power_w, dtype=float)
+        idx, weight = _grid_index(self._power, power)
+        weight = weight[..., np.newaxis]
+
+        rows = self._table[idx] + weight * (self._table[idx + 1] - self._table[idx])
+        rows[power < self.min_power_w] = 0.0
+
+        return {name: rows[..., k] for k, name in enumerate(LUT_COLUMNS)}
+
+    def evaluate(self, power_w: ArrayLike | pd.Series) -> pd.DataFrame:
+        """Evaluate the operating point and return it as a DataFrame.
+
+        A pandas Series keeps its index, so the result can be joined back to
+        the frame the power column came from.
+        """
+        index = power_w.index if isinstance(power_w, pd.Series) else None
+        values = self.interpolate(np.ravel(np.asarray(power_w, dtype=float)))
+        return pd.DataFrame(values, index=index)
+
+
+class ThermalElectrolyserModel:
+    """Temperature-aware operating point from a current x temperature LUT.
+
+    Takes the arrays of `main.generate_lut_2d` (or the memory-mapped copies
+    returned by `lut_cache.load_lut_2d`). `interpolate` evaluates the tables
+    bilinearly at given currents and temperatures; `operating_point` inverts
+    them for given power and temperature, interpolating between the two
+    neighbouring temperature rows. Temperatures are clipped to the grid.
+    """
+
+    def __init__(self, lut: Mapping[str, np.ndarray], min_power_w: float | None = None):
+        self.current_a = np.asarray(lut["I"], dtype=float)
+        self.temperature_k = np.asarray(lut["T"], dtype=float)
+        self._tables = {name: lut[name] for name in LUT_COLUMNS if name != "I"}
+
+        shape = (len(self.temperature_k), len(self.current_a))
+        for name, table in self._tables.items():
+            if table.shape != shape:
+                raise ValueError(f"LUT table {name} has shape {table.shape}, expected {shape}")
+
+        power = np.asarray(lut["P"], dtype=float)
+        if np.any(np.diff(power, axis=1) <= 0):
+            raise ValueError("LUT power must increase strictly with current")
+
+        # stack the rows on one strictly increasing axis: row k is shifted by
+        # k * offset, so a single searchsorted inverts any row per sample
+        self._row_offset = float(power.max() - power.min()) + 1.0
+        rows = np.arange(shape[0])[:, np.newaxis]
+        self._flat_power = (power + rows * self._row_offset).ravel()
+        self._min_power = power[:, 0].copy()
+        self._max_power = power[:, -1].copy()
+        self.min_power_w = min_power_w
+
+    def interpolate(
+        self, current_a: ArrayLike, temperature_k: ArrayLike
+    ) -> dict[str, np.ndarray]:
+        """Bilinear interpolation of the LUT at the given currents and temperatures."""
+        current, temperature = np.broadcast_arrays(
+            np.asarray(current_a, dtype=float), np.asarray(temperature_k, dtype=float)
+        )
+        i, wi = _grid_index(self.current_a, current)
+        k, wk = _grid_index(self.temperature_k, temperature)
+
+        result = {"I": self.current_a[i] + wi * (self.current_a[i + 1] - self.current_a[i])}
+        for name, table in self._tables.items():
+            low = table[k, i] + wi * (table[k, i + 1] - table[k, i])
+            high = table[k + 1, i] + wi * (table[k + 1, i + 1] - table[k + 1, i])
+            result[name] = low + wk * (high - low)
+        return result
+
+    def operating_point(
+        self, power_w: ArrayLike, temperature_k: ArrayLike
+    ) -> dict[str, np.ndarray]:
+        """Operating point for the given stack power and temperature (broadcast).
+
+        Below the minimum load of the stack at that temperature (or
+        `min_power_w` if set) the stack is idle and all outputs are zero.
+        """
+        power, temperature = np.broadcast_arrays(
+            np.asarray(power_w, dtype=float), np.asarray(temperature_k, dtype=float)
+        )
+        k, wk = _grid_index(self.temperature_k, temperature)
+
+        result = {name: np.zeros(power.shape) for name in LUT_COLUMNS}
+        for row, row_weight in ((k, 1.0 - wk), (k + 1, wk)):
+            j, wj = self._invert_row(row, power)
+            result["I"] += row_weight * (
+                self.current_a[j] + wj * (self.current_a[j + 1] - self.current_a[j])
+            )
+            for name, table in self._tables.items():
+                result[name] += row_weight * (
+                    table[row, j] + wj * (table[row, j + 1] - table[row, j])
+                )
+
+        min_power = self._min_power[k] + wk * (self._min_power[k + 1] - self._min_power[k])
+        if self.min_power_w is not None:
+            min_power = np.maximum(min_power, self.min_power_w)
+        idle = power < min_power
+        for values in result.values():
+            values[idle] = 0.0
+        return result
+
+    def evaluate(
+        self, power_w: ArrayLike | pd.Series, temperature_k: ArrayLike | pd.Series
+    ) -> pd.DataFrame:
+        """Evaluate the operating point and return it as a DataFrame."""
+        index = power_w.index if isinstance(power_w, pd.Series) else None
+        power = np.ravel(np.asarray(power_w, dtype=float))
+        temperature = np.asarray(temperature_k, dtype=float)
+        return pd.DataFrame(self.operating_point(power, temperature), index=index)
+
+    def _invert_row(self, row: np.ndarray, power: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Current index and weight at which LUT row `row` reaches `power`."""
+        n_currents = len(self.current_a)
+        clipped = np.clip(power, self._min_power[row], self._max_power[row])
+        shift = row * self._row_offset
+        pos = np.searchsorted(self._flat_power, clipped + shift, side="right") - 1
+        j = np.clip(pos - row * n_currents, 0, n_currents - 2)
+        flat = row * n_currents + j
+        p0 = self._flat_power[flat] - shift
+        p1 = self._flat_power[flat + 1] - shift
+        return j, (clipped - p0) / (p1 - p0)
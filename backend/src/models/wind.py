@@ -1,6 +1,9 @@
 """Model for wind turbine power"""
 
+from collections.abc import Sequence
+
 import numpy as np
+from numpy.typing import ArrayLike
 from pydantic import BaseModel, Field
 
 BETZ_LIMIT = 16 / 27  # Maximum theoretical efficiency of a wind turbine
@@ -25,11 +28,63 @@ class WindTurbineModel(BaseModel):
         return np.pi * (self.rotor_diameter_m / 2) ** 2
 
     def power_output_watts(
-        self, wind_speed_m_s: float, air_density_kg_m3: float = 1.225
-    ) -> float:
-        """Calculate the power output of the wind turbine."""
+        self, wind_speed_m_s: ArrayLike, air_density_kg_m3: ArrayLike = 1.225
+    ) -> float | np.ndarray:
+        """Calculate the power output of the wind turbine.
+
+        Accepts scalars or arrays; wind speed and air density are broadcast.
+        """
         pho = air_density_kg_m3
         A = self.rotor_area_m2
         Cp = self.power_coefficient
         v = wind_speed_m_s
         return (pho * A * Cp * v**3) / 2
+
+
+def fleet_power_output_watts(
+    turbines: Sequence[WindTurbineModel],
+    wind_speed_m_s: ArrayLike,
+    air_density_kg_m3: ArrayLike = 1.225,
+) -> np.ndarray:
+    """Calculate the power output of many turbines over many samples at once.
+
+    The turbine parameters become one axis and the samples the other, so no
+    per-row or per-turbine Python objects are created.
+
+    Args:
+        turbines (Sequence[WindTurbineModel]): M turbine definitions.
+        wind_speed_m_s (ArrayLike): N wind speed samples in m/s.
+        air_density_kg_m3 (ArrayLike): Air density in kg/m^3, scalar or N samples.
+
+    Returns:
+        np.ndarray: Power output in Watts, shape (N, M), or (M,) for a single
+            scalar sample.
+    """
+    wind_speed = np.asarray(wind_speed_m_s, dtype=float)
+    air_density = np.asarray(air_density_kg_m3, dtype=float)
+    rotor_area_m2 = np.array([turbine.rotor_area_m2 for turbine in turbines])
+    power_coefficient = np.array([turbine.power_coefficient for turbine in turbines])
+    power = rotor_power_watts(
+        wind_speed_m_s=np.atleast_1d(wind_speed)[:, np.newaxis],
+        air_density_kg_m3=air_density[..., np.newaxis],
+        rotor_area_m2=rotor_area_m2,
+        power_coefficient=power_coefficient,
+    )
+    return power[0] if wind_speed.ndim == air_density.ndim == 0 else power
+
+
+def rotor_power_watts(
+    wind_speed_m_s: ArrayLike,
+    air_density_kg_m3: ArrayLike,
+    rotor_area_m2: ArrayLike,
+    power_coefficient: ArrayLike,
+) -> np.ndarray:
+    """Element-wise turbine power P = rho * A * Cp * v^3 / 2 (broadcast)."""
+    v = np.asarray(wind_speed_m_s, dtype=float)
+    return (
+        np.asarray(air_density_kg_m3, dtype=float)
+        * np.asarray(rotor_area_m2, dtype=float)
+        * np.asarray(power_coefficient, dtype=float)
+        * (v * v * v)
+        / 2
+    )
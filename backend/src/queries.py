@@ -0,0 +1,50 @@
+"""Dialect-aware SQL expressions shared by the API queries (SQLite, PostgreSQL).
+
+Timestamps are stored as naive UTC, so epoch conversions treat them as UTC.
+"""
+
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from sqlalchemy.sql import ColumnElement
+
+BUCKET_SECONDS = {"5m": 300, "1h": 3600, "1d": 86400}
+
+
+def epoch_seconds(column: ColumnElement, dialect: str) -> ColumnElement[int]:
+    """Whole epoch seconds of a timestamp."""
+    if dialect == "sqlite":
+        return sa.cast(sa.func.strftime("%s", column), sa.BigInteger)
+    if dialect == "postgresql":
+        return sa.cast(sa.func.floor(sa.extract("epoch", column)), sa.BigInteger)
+    raise NotImplementedError(f"Time buckets are not supported for {dialect}")
+
+
+def time_bucket(column: ColumnElement, width_s: int, dialect: str) -> ColumnElement[int]:
+    """Epoch second at which the `width_s` wide bucket of a timestamp starts."""
+    return epoch_seconds(column, dialect) // width_s * width_s
+
+
+def from_epoch(seconds: float) -> datetime:
+    """Naive UTC datetime of an epoch second, as timestamps are stored."""
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+
+
+def to_epoch(timestamp: datetime) -> float:
+    return timestamp.replace(tzinfo=timezone.utc).timestamp()
+
+
+def bucket_bounds(start: datetime, end: datetime, width_s: int) -> tuple[datetime, datetime]:
+    """Start of the bucket of `start` and end of the bucket of `end`."""
+    first = int(to_epoch(start)) // width_s * width_s
+    last = int(to_epoch(end)) // width_s * width_s + width_s
+    return from_epoch(first), from_epoch(last)
+
+
+def numeric_columns(table: sa.Table) -> list[str]:
+    """Names of the numeric value columns of a table, without the primary key."""
+    return [
+        column.name
+        for column in table.columns
+        if not column.primary_key and isinstance(column.type, (sa.Integer, sa.Float))
+    ]
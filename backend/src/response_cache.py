@@ -0,0 +1,142 @@
+"""Conditional GET and result caching of the API responses.
+
+The data behind a response changes only when the ETL writes, every few
+minutes. The version of the data is the latest `updated_at` and the row
+count, read with one indexed query: inserts and updates move the former,
+deletes (compaction to the archive) the latter. The ETag of a response
+derives from that version and the query, so a client that repeats a request
+with `If-None-Match` gets a 304 without any rows being read.
+
+Other clients asking for the same query share a response body kept in a
+`ResponseCache`, an LRU bounded in bytes. The ETL runs in another process,
+so the cache cannot be told when rows are committed; instead each body is
+stored with the version it was computed from, and is dropped when a request
+for it sees a newer one. Versions are per site, so the ETL writing one site
+leaves the cached bodies of the others valid.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import NamedTuple
+
+import sqlalchemy as sa
+from sqlalchemy import Connection
+from starlette.datastructures import QueryParams
+
+
+class DataVersion(NamedTuple):
+    updated_at: datetime | None
+    rows: int
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: dict[str, str]
+
+
+class _Entry(NamedTuple):
+    version: DataVersion
+    response: CachedResponse
+
+
+def data_version(conn: Connection, table: sa.Table, site: str | None = None) -> DataVersion:
+    """Latest `updated_at` and row count of a table, or of one site's rows.
+
+    Each aggregate is its own subquery: SQLite reads a lone max() of the
+    (site, updated_at) index from its last entry, but scans the index when
+    the max() shares a SELECT with count(). Over all sites, the latest is the
+    latest of each site's.
+    """
+    updated_at = table.c.updated_at
+    count = sa.select(sa.func.count()).select_from(table)
+    if site is not None:
+        count = count.where(table.c.site == site)
+        latest = sa.select(sa.func.max(updated_at)).where(table.c.site == site)
+    else:
+        sites = sa.select(table.c.site).distinct().subquery()
+        site_latest = (
+            sa.select(sa.func.max(updated_at)).where(table.c.site == sites.c.site).scalar_subquery()
+        )
+        latest = sa.select(sa.func.max(site_latest, type_=updated_at.type)).select_from(sites)
+    query = sa.select(latest.scalar_subquery(), count.scalar_subquery())
+    return DataVersion(*conn.execute(query).one())
+
+
+def query_key(params: QueryParams) -> str:
+    """The query parameters in a canonical order, so equal queries share a key."""
+    return "&".join(f"{name}={value}" for name, value in sorted(params.multi_items()))
+
+
+def validators(version: DataVersion, key: str) -> dict[str, str]:
+    """ETag and Last-Modified headers of a response to `key` at `version`."""
+    digest = hashlib.sha1(f"{version.updated_at}|{version.rows}|{key}".encode()).hexdigest()
+    headers = {"ETag": f'"{digest[:20]}"', "Cache-Control": "no-cache"}
+    if version.updated_at is not None:
+        # updated_at is stored as naive UTC
+        modified = version.updated_at.replace(tzinfo=timezone.utc, microsecond=0)
+        headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison).
+
+    If-Modified-Since is not honoured: a deletion leaves the latest
+    `updated_at` as it was.
+    """
+    if if_none_match is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+class ResponseCache:
+    """Response bodies by query and data version, evicting the least recently used.
+
+    Args:
+        max_bytes (int): Bound on the sum of the body sizes. Larger bodies
+            are not cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()  # sync routes run in a thread pool
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, version: DataVersion) -> CachedResponse | None:
+        """The body cached for `key`, if it was computed at `version`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version:  # the data changed since
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.response
+
+    def put(self, key: str, version: DataVersion, response: CachedResponse) -> None:
+        if len(response.body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(version, response)
+            self.size += len(response.body)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key: str) -> None:
+        self.size -= len(self._entries.pop(key).response.body)
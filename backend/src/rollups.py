@@ -0,0 +1,214 @@
+"""Hourly and daily rollups of the weather and simulation tables.
+
+The load step recomputes the buckets touched by the rows it writes, in the
+same transaction, so the rollups follow the raw tables incrementally. Energy
+and yield integrate over the time each row actually stands for, up to the
+next row of its site and at most MAX_SAMPLE_S, so a partly filled bucket
+reports what it holds and its `covered_hours` say how much that is. After a
+migration, or to repair them, rebuild the rollups of a range with
+
+    uv run src/rollups.py --site default --start 2026-01-01
+"""
+
+import argparse
+from collections.abc import Iterable
+from datetime import datetime
+
+import pandas as pd
+import sqlalchemy as sa
+from loguru import logger
+from sqlalchemy import Connection, Engine
+
+from config import settings
+from database import frame_to_records, get_block_engine, upsert_records
+from db_models.rollup import (
+    ROLLUP_KEY,
+    ROLLUP_WEATHER_FIELDS,
+    DailyWeatherRollup,
+    HourlyWeatherRollup,
+)
+from db_models.simulation import Simulation
+from db_models.weather import Weather
+from queries import bucket_bounds, epoch_seconds, from_epoch, time_bucket
+
+WEATHER_TABLE: sa.Table = Weather.__table__  # type: ignore[assignment]
+SIMULATION_TABLE: sa.Table = Simulation.__table__  # type: ignore[assignment]
+
+MAX_SAMPLE_S = 900  # longest time one row stands for; beyond it is a gap
+
+# granularity -> (table, bucket width in seconds)
+ROLLUPS: dict[str, tuple[sa.Table, int]] = {
+    "hourly": (HourlyWeatherRollup.__table__, 3600),  # type: ignore[dict-item]
+    "daily": (DailyWeatherRollup.__table__, 86400),  # type: ignore[dict-item]
+}
+
+
+def sample_hours(dialect: str) -> sa.ColumnElement[float]:
+    """Hours a weather row stands for: up to the next row of its site, capped.
+
+    The latest row of a site stands for one polling interval.
+    """
+    w, later = WEATHER_TABLE, WEATHER_TABLE.alias("later")
+    next_timestamp = (
+        sa.select(sa.func.min(later.c.timestamp))
+        .where((later.c.site == w.c.site) & (later.c.timestamp > w.c.timestamp))
+        .scalar_subquery()
+    )
+    interval_s = sa.func.coalesce(
+        epoch_seconds(next_timestamp, dialect) - epoch_seconds(w.c.timestamp, dialect),
+        settings.WEATHER_UPDATE_INTERVAL_MINUTES * 60,
+    )
+    capped_s = sa.case((interval_s > MAX_SAMPLE_S, MAX_SAMPLE_S), else_=interval_s)
+    return sa.cast(capped_s, sa.Float) / 3600
+
+
+def rollup_query(width_s: int, dialect: str, where: sa.ColumnElement[bool]) -> sa.Select:
+    """Rollup rows of the weather rows matching `where`, grouped by site and bucket."""
+    w, s = WEATHER_TABLE, SIMULATION_TABLE
+    rows = (
+        sa.select(
+            w.c.site,
+            w.c.timestamp,
+            *(w.c[name] for name in ROLLUP_WEATHER_FIELDS),
+            s.c.turbine_power_w,
+            s.c.h2_kg_h,
+            sample_hours(dialect).label("sample_h"),
+        )
+        .select_from(
+            w.outerjoin(s, (s.c.site == w.c.site) & (s.c.timestamp == w.c.timestamp))
+        )
+        .where(where)
+        .subquery()
+    )
+    bucket = time_bucket(rows.c.timestamp, width_s, dialect).label("bucket")
+    stats = [
+        aggregate(rows.c[name]).label(f"{name}_{stat}")
+        for name in [*ROLLUP_WEATHER_FIELDS, "turbine_power_w"]
+        for stat, aggregate in (("min", sa.func.min), ("mean", sa.func.avg), ("max", sa.func.max))
+    ]
+    return sa.select(
+        rows.c.site,
+        bucket,
+        sa.func.count().label("count"),
+        sa.func.sum(rows.c.sample_h).label("covered_hours"),
+        *stats,
+        sa.func.sum(rows.c.turbine_power_w * rows.c.sample_h).label("turbine_energy_wh"),
+        sa.func.sum(rows.c.h2_kg_h * rows.c.sample_h).label("h2_kg"),
+    ).group_by(rows.c.site, bucket)
+
+
+def refresh_rollups(
+    conn: Connection, spans: Iterable[tuple[str, datetime, datetime]]
+) -> dict[str, int]:
+    """Recompute the rollup buckets of the given (site, start, end) spans.
+
+    Buckets of the spans left without weather rows are deleted. Compaction
+    does not come through here, so the rollups of archived days stay.
+
+    Returns:
+        dict[str, int]: Number of buckets written per granularity.
+    """
+    spans = list(spans)
+    written = {}
+    for granularity, (table, width_s) in ROLLUPS.items():
+        if not spans:
+            written[granularity] = 0
+            continue
+        bounds = [(site, *bucket_bounds(start, end, width_s)) for site, start, end in spans]
+        conditions = [
+            (WEATHER_TABLE.c.site == site)
+            & (WEATHER_TABLE.c.timestamp >= bucket_start)
+            & (WEATHER_TABLE.c.timestamp < bucket_end)
+            for site, bucket_start, bucket_end in bounds
+        ]
+        query = rollup_query(width_s, conn.dialect.name, sa.or_(*conditions))
+        rows = pd.DataFrame(conn.execute(query).mappings().all())
+        if not rows.empty:
+            rows["bucket"] = rows["bucket"].map(from_epoch)
+            upsert_records(conn, table, frame_to_records(rows), ROLLUP_KEY)
+
+        for site, bucket_start, bucket_end in bounds:
+            kept = rows.loc[rows["site"] == site, "bucket"].tolist() if not rows.empty else []
+            conn.execute(
+                table.delete().where(
+                    (table.c.site == site)
+                    & (table.c.bucket >= bucket_start)
+                    & (table.c.bucket < bucket_end)
+                    & table.c.bucket.not_in(kept)
+                )
+            )
+        written[granularity] = len(rows)
+    return written
+
+
+def update_rollups(conn: Connection, weather: pd.DataFrame) -> dict[str, int]:
+    """Recompute the buckets touched by freshly loaded weather rows.
+
+    The span of each site starts at its stored row before the new ones: the
+    time that row stands for ends at the first new row, so its bucket
+    changes too. Call after the rows are written, in the same transaction.
+    """
+    if weather.empty:
+        return {granularity: 0 for granularity in ROLLUPS}
+    w = WEATHER_TABLE
+    spans = []
+    for site, timestamps in weather.groupby("site")["timestamp"]:
+        start, end = timestamps.min().to_pydatetime(), timestamps.max().to_pydatetime()
+        previous = conn.execute(
+            sa.select(sa.func.max(w.c.timestamp)).where(
+                (w.c.site == site) & (w.c.timestamp < start)
+            )
+        ).scalar()
+        spans.append((site, start if previous is None else previous, end))
+    return refresh_rollups(conn, spans)
+
+
+def rebuild_rollups(
+    engine: Engine,
+    site: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> dict[str, int]:
+    """Delete and recompute the rollups of a range, e.g. after a backfill.
+
+    Without a site or a bound, covers all sites or the whole history.
+    """
+    w = WEATHER_TABLE
+    with engine.begin() as conn:
+        query = sa.select(
+            w.c.site, sa.func.min(w.c.timestamp), sa.func.max(w.c.timestamp)
+        ).group_by(w.c.site)
+        if site is not None:
+            query = query.where(w.c.site == site)
+        if start is not None:
+            query = query.where(w.c.timestamp >= start)
+        if end is not None:
+            query = query.where(w.c.timestamp < end)
+        spans = [tuple(row) for row in conn.execute(query)]
+
+        for table, width_s in ROLLUPS.values():
+            for span_site, span_start, span_end in spans:
+                bucket_start, bucket_end = bucket_bounds(span_start, span_end, width_s)
+                conn.execute(
+                    table.delete().where(
+                        (table.c.site == span_site)
+                        & (table.c.bucket >= bucket_start)
+                        & (table.c.bucket < bucket_end)
+                    )
+                )
+        return refresh_rollups(conn, spans)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the weather rollups")
+    parser.add_argument("--site", default=None, help="default: all sites")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--block-name", default="database-connector")
+    args = parser.parse_args()
+    written = rebuild_rollups(get_block_engine(args.block_name), args.site, args.start, args.end)
+    logger.info(f"Rebuilt rollups: {written}")
+
+
+if __name__ == "__main__":
+    main()
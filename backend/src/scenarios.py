@@ -0,0 +1,259 @@
+"""Monte Carlo scenarios of the annual hydrogen yield.
+
+Turbine and stack parameters are sampled around their configured values and
+every scenario runs the whole physics chain over the stored weather history.
+The weather enters the chain only through the wind power density
+1/2 rho v^3, so it is computed once and shared with the spawned worker
+processes through shared memory instead of being pickled to each of them;
+each worker evaluates chunks of scenarios and sends back three numbers per
+scenario. Run from the backend folder:
+
+    uv run src/scenarios.py --scenarios 5000 --workers 8
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context, shared_memory
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from config import settings
+from main import StackParameters, generate_lut
+from models.air import weather_air_density
+from models.electrolyser import ElectrolyserModel
+from models.wind import BETZ_LIMIT
+from sites import DEFAULT_SITE_NAME
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+HOURS_PER_YEAR = 8760
+MAX_SAMPLE_HOURS = 1.0  # longer gaps between observations count as missing data
+CHUNK_SIZE = 64  # scenarios per task sent to a worker
+PERCENTILES = (5, 50, 95)
+
+PARAMETERS = [
+    "rotor_diameter_m",
+    "power_coefficient",
+    "n_cells",
+    "area_cm2",
+    "r_cell_ohm",
+    "a_tafel_v",
+    "j0_a_cm2",
+]
+METRICS = ["h2_kg_per_year", "capacity_factor", "specific_energy_kwh_kg"]
+
+
+class ParameterSpread(BaseModel):
+    """Relative standard deviation of each sampled parameter."""
+
+    rotor_diameter_m: float = Field(0.0, ge=0)
+    power_coefficient: float = Field(0.05, ge=0)
+    n_cells: float = Field(0.0, ge=0)
+    area_cm2: float = Field(0.0, ge=0)
+    r_cell_ohm: float = Field(0.2, ge=0)
+    a_tafel_v: float = Field(0.1, ge=0)
+    j0_a_cm2: float = Field(0.5, ge=0)
+
+
+def sample_scenarios(
+    n: int,
+    spread: ParameterSpread | None = None,
+    stack: StackParameters | None = None,
+    seed: int | None = None,
+) -> pd.DataFrame:
+    """`n` parameter sets, normally distributed around the configured ones.
+
+    Samples are kept positive, the power coefficient below the Betz limit
+    and the number of cells integer.
+    """
+    spread = spread or ParameterSpread()
+    stack = stack or StackParameters()
+    base = {
+        "rotor_diameter_m": settings.TURBINE_ROTOR_DIAMETER_M,
+        "power_coefficient": settings.TURBINE_POWER_COEFFICIENT,
+        "n_cells": stack.n_cells,
+        "area_cm2": stack.area_cm2,
+        "r_cell_ohm": stack.r_cell_ohm,
+        "a_tafel_v": stack.a_tafel_v,
+        "j0_a_cm2": stack.j0_a_cm2,
+    }
+    rng = np.random.default_rng(seed)
+    scenarios = pd.DataFrame(
+        {
+            name: base[name] * rng.normal(1.0, getattr(spread, name), n).clip(min=0.01)
+            for name in PARAMETERS
+        }
+    )
+    scenarios["power_coefficient"] = scenarios["power_coefficient"].clip(upper=BETZ_LIMIT)
+    scenarios["n_cells"] = scenarios["n_cells"].round().clip(lower=1)
+    return scenarios
+
+
+def sample_hours(timestamps: pd.Series) -> np.ndarray:
+    """Hours each observation stands for: up to the next one, capped."""
+    hours = timestamps.diff().shift(-1).dt.total_seconds().to_numpy() / 3600
+    if len(hours):
+        hours[-1] = np.nanmedian(hours) if len(hours) > 1 else 0.0
+    return np.clip(hours, 0.0, MAX_SAMPLE_HOURS)
+
+
+def wind_power_density(weather: pd.DataFrame) -> np.ndarray:
+    """1/2 rho v^3 of each observation in W/m^2; the turbine power per m^2 at Cp = 1."""
+    density = weather_air_density(
+        weather["temperature_k"], weather["pressure_pa"], weather["humidity_percent"]
+    )
+    return 0.5 * density * weather["wind_speed_m_s"].to_numpy(dtype=float) ** 3
+
+
+def evaluate_scenarios(
+    power_density: np.ndarray, hours: np.ndarray, parameters: np.ndarray
+) -> np.ndarray:
+    """METRICS of each row of `parameters` (columns as PARAMETERS).
+
+    The turbine power of the whole chunk is one (scenarios, samples) array;
+    the stack is then interpolated per scenario, since each has its own LUT.
+    """
+    diameter, cp = parameters[:, 0], parameters[:, 1]
+    area_m2 = np.pi * (diameter / 2) ** 2
+    turbine_power = (area_m2 * cp)[:, np.newaxis] * power_density[np.newaxis, :]
+
+    covered_hours = hours.sum()
+    metrics = np.full((len(parameters), len(METRICS)), np.nan)
+    for k, row in enumerate(parameters):
+        stack = StackParameters(
+            n_cells=int(row[2]), area_cm2=row[3], r_cell_ohm=row[4], a_tafel_v=row[5], j0_a_cm2=row[6]
+        )
+        electrolyser = ElectrolyserModel(generate_lut(stack))
+        operating_point = electrolyser.interpolate(turbine_power[k])
+        h2_kg = operating_point["H2"] @ hours
+        energy_wh = operating_point["P"] @ hours
+        if covered_hours > 0:
+            metrics[k, 0] = h2_kg * HOURS_PER_YEAR / covered_hours
+            metrics[k, 1] = energy_wh / (electrolyser.max_power_w * covered_hours)
+        if h2_kg > 0:
+            metrics[k, 2] = energy_wh / 1000 / h2_kg
+    return metrics
+
+
+# --- worker processes ---
+
+_shared: dict = {}
+
+
+def _attach(name: str, samples: int) -> None:
+    kwargs = {"track": False} if sys.version_info >= (3, 13) else {}
+    memory = shared_memory.SharedMemory(name=name, **kwargs)
+    series = np.ndarray((2, samples), dtype=np.float64, buffer=memory.buf)
+    _shared.update(memory=memory, power_density=series[0], hours=series[1])
+
+
+def _evaluate_chunk(parameters: np.ndarray) -> np.ndarray:
+    return evaluate_scenarios(_shared["power_density"], _shared["hours"], parameters)
+
+
+def run_scenarios(
+    weather: pd.DataFrame,
+    scenarios: pd.DataFrame,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> pd.DataFrame:
+    """Evaluate every scenario over the weather history, on `workers` processes.
+
+    Args:
+        weather (pd.DataFrame): timestamp, temperature_k, pressure_pa,
+            humidity_percent and wind_speed_m_s, sorted by timestamp.
+        scenarios (pd.DataFrame): PARAMETERS, e.g. from `sample_scenarios`.
+        workers (int | None): Processes, by default one per core; 1 runs
+            in this process.
+
+    Returns:
+        pd.DataFrame: The scenarios with their METRICS appended.
+    """
+    power_density = wind_power_density(weather)
+    hours = sample_hours(weather["timestamp"])
+    parameters = scenarios[PARAMETERS].to_numpy(dtype=float)
+    chunks = [parameters[i : i + chunk_size] for i in range(0, len(parameters), chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, max(len(chunks), 1))
+
+    if workers == 1:
+        results = [evaluate_scenarios(power_density, hours, chunk) for chunk in chunks]
+    else:
+        memory = shared_memory.SharedMemory(create=True, size=max(2 * len(hours), 1) * 8)
+        try:
+            series = np.ndarray((2, len(hours)), dtype=np.float64, buffer=memory.buf)
+            series[0], series[1] = power_density, hours
+            with ProcessPoolExecutor(
+                workers,
+                mp_context=get_context("spawn"),  # forking a threaded parent may deadlock
+                initializer=_attach,
+                initargs=(memory.name, len(hours)),
+            ) as pool:
+                results = list(pool.map(_evaluate_chunk, chunks))
+            del series
+        finally:
+            memory.close()
+            memory.unlink()
+
+    metrics = np.concatenate(results) if results else np.empty((0, len(METRICS)))
+    return scenarios.assign(**dict(zip(METRICS, metrics.T)))
+
+
+def summarize(results: pd.DataFrame, percentiles=PERCENTILES) -> pd.DataFrame:
+    """Percentiles of each metric over the scenarios, one row per percentile."""
+    summary = results[METRICS].quantile([p / 100 for p in percentiles])
+    summary.index = [f"p{p}" for p in percentiles]
+    return summary
+
+
+def load_weather_history(
+    engine: "Engine",
+    site: str = DEFAULT_SITE_NAME,
+    start_timestamp: datetime | None = None,
+    end_timestamp: datetime | None = None,
+) -> pd.DataFrame:
+    # imported here, the spawned workers never touch the database
+    import sqlalchemy as sa
+
+    from db_models.weather import Weather
+
+    table: sa.Table = Weather.__table__  # type: ignore[assignment]
+    columns = ["timestamp", "temperature_k", "pressure_pa", "humidity_percent", "wind_speed_m_s"]
+    query = sa.select(*(table.c[name] for name in columns)).where(table.c.site == site)
+    if start_timestamp is not None:
+        query = query.where(table.c.timestamp >= start_timestamp)
+    if end_timestamp is not None:
+        query = query.where(table.c.timestamp <= end_timestamp)
+    with engine.connect() as conn:
+        weather = pd.read_sql_query(query.order_by(table.c.timestamp), conn)
+    weather["timestamp"] = pd.to_datetime(weather["timestamp"], format="ISO8601")
+    return weather
+
+
+def main():
+    from database import get_engine
+
+    parser = argparse.ArgumentParser(description="Monte Carlo annual H2 yield")
+    parser.add_argument("--site", default=DEFAULT_SITE_NAME)
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--end", type=datetime.fromisoformat)
+    parser.add_argument("--scenarios", type=int, default=1000)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    weather = load_weather_history(get_engine(), args.site, args.start, args.end)
+    scenarios = sample_scenarios(args.scenarios, seed=args.seed)
+    results = run_scenarios(weather, scenarios, args.workers)
+    print(f"{len(results)} scenarios over {len(weather)} weather rows of {args.site}")
+    print(summarize(results).to_string())
+
+
+if __name__ == "__main__":
+    main()
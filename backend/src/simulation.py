@@ -0,0 +1,83 @@
+"""Vectorized physics chain: weather -> air density -> turbine power -> stack."""
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+from main import N_CELLS, generate_lut
+from models.air import weather_air_density
+from models.electrolyser import ElectrolyserModel
+from models.wind import WindTurbineModel
+
+LHV_H2_KWH_KG = 33.33  # lower heating value of hydrogen
+
+SIMULATION_COLUMNS = [
+    "air_density_kg_m3",
+    "turbine_power_w",
+    "stack_power_w",
+    "stack_current_a",
+    "cell_voltage_v",
+    "h2_kg_h",
+    "efficiency",
+    "heat_w",
+]
+
+
+def default_turbine() -> WindTurbineModel:
+    return WindTurbineModel(
+        rotor_diameter_m=settings.TURBINE_ROTOR_DIAMETER_M,
+        power_coefficient=settings.TURBINE_POWER_COEFFICIENT,
+    )
+
+
+def default_electrolyser() -> ElectrolyserModel:
+    return ElectrolyserModel(generate_lut())
+
+
+def simulate_weather_frame(
+    weather: pd.DataFrame,
+    turbine: WindTurbineModel | None = None,
+    electrolyser: ElectrolyserModel | None = None,
+    n_cells: int = N_CELLS,
+) -> pd.DataFrame:
+    """Run the whole physics chain over a frame of weather rows at once.
+
+    Args:
+        weather (pd.DataFrame): Columns temperature_k, pressure_pa,
+            humidity_percent and wind_speed_m_s, as in the weather table.
+        turbine (WindTurbineModel | None): Defaults to the configured turbine.
+        electrolyser (ElectrolyserModel | None): Defaults to the 80°C stack.
+        n_cells (int): Number of cells of the stack, to report cell voltage.
+
+    Returns:
+        pd.DataFrame: SIMULATION_COLUMNS, indexed like `weather`.
+    """
+    turbine = turbine or default_turbine()
+    electrolyser = electrolyser or default_electrolyser()
+
+    density = weather_air_density(
+        weather["temperature_k"], weather["pressure_pa"], weather["humidity_percent"]
+    )
+    turbine_power = turbine.power_output_watts(
+        weather["wind_speed_m_s"].to_numpy(dtype=float), density
+    )
+    stack = electrolyser.interpolate(turbine_power)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        efficiency = np.where(
+            stack["P"] > 0, stack["H2"] * LHV_H2_KWH_KG * 1000 / stack["P"], 0.0
+        )
+
+    return pd.DataFrame(
+        {
+            "air_density_kg_m3": density,
+            "turbine_power_w": turbine_power,
+            "stack_power_w": stack["P"],
+            "stack_current_a": stack["I"],
+            "cell_voltage_v": stack["V_stack"] / n_cells,
+            "h2_kg_h": stack["H2"],
+            "efficiency": efficiency,
+            "heat_w": stack["Heat"],
+        },
+        index=weather.index,
+    )
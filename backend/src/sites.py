@@ -0,0 +1,44 @@
+"""Registry of the wind sites the ETL collects weather for."""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from config import settings
+
+DEFAULT_SITE_NAME = "default"
+
+
+class Site(BaseModel):
+    name: str = Field(..., min_length=1, description="Unique name of the site")
+    latitude: float = Field(..., ge=-90, le=90, description="Latitude in degrees")
+    longitude: float = Field(..., ge=-180, le=180, description="Longitude in degrees")
+
+
+DEFAULT_SITE = Site(name=DEFAULT_SITE_NAME, latitude=52.5200, longitude=13.4050)
+
+
+def load_sites(path: str | None = None) -> list[Site]:
+    """Load the site registry from a JSON or CSV file.
+
+    JSON files hold a list of objects, CSV files a header row, both with the
+    fields name, latitude and longitude. Without a file (`SITES_FILE` unset)
+    the registry is the single default site.
+    """
+    path = path or settings.SITES_FILE
+    if path is None:
+        return [DEFAULT_SITE]
+
+    file = Path(path)
+    if file.suffix.lower() == ".csv":
+        records = pd.read_csv(file).to_dict("records")
+    else:
+        records = json.loads(file.read_text())
+
+    sites = [Site.model_validate(record) for record in records]
+    names = [site.name for site in sites]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate site names in {file}")
+    return sites
@@ -0,0 +1,242 @@
+"""Sizing of the rotor and the stack over a weather history.
+
+A grid search over rotor diameter, number of cells and cell area, plus a
+local pattern search around the best grid point. The intermediate series are
+memoized on the `SizingProblem`: the air density of the history is computed
+once, the turbine power once per diameter and the stack model once per
+(cells, area), so sweeping the stack never recomputes the turbine side.
+The Pareto front of the grid is written out as a CSV table. Run from the
+backend folder:
+
+    uv run src/sizing.py --objective h2_kg_per_year --output data/pareto.csv
+"""
+
+import argparse
+import itertools
+from collections.abc import Iterable
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from config import settings
+from main import StackParameters, generate_lut
+from models.air import weather_air_density
+from models.electrolyser import ElectrolyserModel
+from models.wind import rotor_power_watts
+from scenarios import HOURS_PER_YEAR, load_weather_history, sample_hours
+from sites import DEFAULT_SITE_NAME
+
+# metric -> "max" or "min"; the Pareto front is taken over all three
+OBJECTIVES = {
+    "h2_kg_per_year": "max",
+    "curtailed_fraction": "min",  # turbine energy the stack cannot take
+    "capacity_factor": "max",  # the complement of the unused stack power
+}
+DESIGN_COLUMNS = ["rotor_diameter_m", "n_cells", "area_cm2"]
+
+DIAMETERS_M = np.arange(20.0, 81.0, 5.0)
+N_CELLS = np.arange(5, 41, 5)
+AREAS_CM2 = np.arange(100.0, 501.0, 50.0)
+
+
+class Design(BaseModel):
+    rotor_diameter_m: float = Field(..., gt=0, description="Rotor diameter in meters")
+    n_cells: int = Field(..., ge=1, description="Number of cells in the stack")
+    area_cm2: float = Field(..., gt=0, description="Active cell area in cm^2")
+
+
+class SizingProblem:
+    """A weather history and the memoized series derived from it.
+
+    Args:
+        weather (pd.DataFrame): timestamp, temperature_k, pressure_pa,
+            humidity_percent and wind_speed_m_s, sorted by timestamp.
+        stack (StackParameters | None): Electrochemistry of the cells; its
+            n_cells and area_cm2 are replaced by those of each design.
+    """
+
+    def __init__(self, weather: pd.DataFrame, stack: StackParameters | None = None):
+        self.weather = weather
+        self.stack = stack or StackParameters()
+        self.power_coefficient = settings.TURBINE_POWER_COEFFICIENT
+        self.hours = sample_hours(weather["timestamp"])
+        self.covered_hours = float(self.hours.sum())
+        self._turbine_power: dict[float, np.ndarray] = {}
+        self._electrolysers: dict[tuple[int, float], ElectrolyserModel] = {}
+
+    @cached_property
+    def air_density(self) -> np.ndarray:
+        return np.asarray(
+            weather_air_density(
+                self.weather["temperature_k"],
+                self.weather["pressure_pa"],
+                self.weather["humidity_percent"],
+            ),
+            dtype=float,
+        )
+
+    @cached_property
+    def wind_speed(self) -> np.ndarray:
+        return self.weather["wind_speed_m_s"].to_numpy(dtype=float)
+
+    def turbine_power(self, rotor_diameter_m: float) -> np.ndarray:
+        """Turbine power series in Watts, computed once per diameter."""
+        key = round(float(rotor_diameter_m), 6)
+        if key not in self._turbine_power:
+            self._turbine_power[key] = rotor_power_watts(
+                self.wind_speed,
+                self.air_density,
+                np.pi * (key / 2) ** 2,
+                self.power_coefficient,
+            )
+        return self._turbine_power[key]
+
+    def electrolyser(self, n_cells: int, area_cm2: float) -> ElectrolyserModel:
+        """Stack model, built once per number of cells and cell area."""
+        key = (int(n_cells), round(float(area_cm2), 6))
+        if key not in self._electrolysers:
+            params = self.stack.model_copy(update={"n_cells": key[0], "area_cm2": key[1]})
+            self._electrolysers[key] = ElectrolyserModel(generate_lut(params))
+        return self._electrolysers[key]
+
+    def evaluate(self, design: Design) -> dict[str, float]:
+        """OBJECTIVES of one design over the history."""
+        turbine_power = self.turbine_power(design.rotor_diameter_m)
+        electrolyser = self.electrolyser(design.n_cells, design.area_cm2)
+        stack = electrolyser.interpolate(turbine_power)
+
+        turbine_wh = turbine_power @ self.hours
+        stack_wh = stack["P"] @ self.hours
+        h2_kg = stack["H2"] @ self.hours
+        metrics = dict.fromkeys(OBJECTIVES, np.nan)
+        if self.covered_hours > 0:
+            metrics["h2_kg_per_year"] = h2_kg * HOURS_PER_YEAR / self.covered_hours
+            metrics["capacity_factor"] = stack_wh / (electrolyser.max_power_w * self.covered_hours)
+        if turbine_wh > 0:
+            metrics["curtailed_fraction"] = 1 - stack_wh / turbine_wh
+        return metrics
+
+
+def grid_search(
+    problem: SizingProblem,
+    diameters_m: Iterable[float] = DIAMETERS_M,
+    n_cells: Iterable[int] = N_CELLS,
+    areas_cm2: Iterable[float] = AREAS_CM2,
+) -> pd.DataFrame:
+    """DESIGN_COLUMNS and OBJECTIVES of every combination of the given values."""
+    rows = []
+    for diameter, cells, area in itertools.product(diameters_m, n_cells, areas_cm2):
+        design = Design(rotor_diameter_m=diameter, n_cells=cells, area_cm2=area)
+        rows.append(design.model_dump() | problem.evaluate(design))
+    return pd.DataFrame(rows, columns=DESIGN_COLUMNS + list(OBJECTIVES))
+
+
+def refine(
+    problem: SizingProblem,
+    start: Design,
+    objective: str = "h2_kg_per_year",
+    bounds: dict[str, tuple[float, float]] | None = None,
+    steps: dict[str, float] | None = None,
+    min_step_fraction: float = 0.01,
+) -> tuple[Design, dict[str, float]]:
+    """Pattern search around `start` that improves one objective.
+
+    Each parameter is moved by +-step while that improves the objective;
+    when no move does, the steps are halved. The search stops when every
+    step is below `min_step_fraction` of its start value (one cell for
+    n_cells) and returns the best design and its metrics.
+    """
+    sign = 1.0 if OBJECTIVES[objective] == "max" else -1.0
+    bounds = bounds or {
+        "rotor_diameter_m": (DIAMETERS_M[0], DIAMETERS_M[-1]),
+        "n_cells": (N_CELLS[0], N_CELLS[-1]),
+        "area_cm2": (AREAS_CM2[0], AREAS_CM2[-1]),
+    }
+    values = start.model_dump()
+    steps = steps or {name: values[name] / 4 for name in DESIGN_COLUMNS}
+    min_steps = {name: values[name] * min_step_fraction for name in DESIGN_COLUMNS}
+    min_steps["n_cells"] = 1
+
+    def score(metrics: dict[str, float]) -> float:
+        value = metrics[objective]
+        return -np.inf if np.isnan(value) else sign * value
+
+    best, best_metrics = start, problem.evaluate(start)
+    while any(steps[name] >= min_steps[name] for name in DESIGN_COLUMNS):
+        improved = False
+        for name, direction in itertools.product(DESIGN_COLUMNS, (1, -1)):
+            low, high = bounds[name]
+            value = float(np.clip(getattr(best, name) + direction * steps[name], low, high))
+            if name == "n_cells":
+                value = round(value)
+            if value == getattr(best, name):
+                continue
+            candidate = best.model_copy(update={name: value})
+            metrics = problem.evaluate(candidate)
+            if score(metrics) > score(best_metrics):
+                best, best_metrics, improved = candidate, metrics, True
+        if not improved:
+            steps = {name: step / 2 for name, step in steps.items()}
+    return best, best_metrics
+
+
+def pareto_front(designs: pd.DataFrame, objectives: dict[str, str] = OBJECTIVES) -> pd.DataFrame:
+    """The designs no other design beats in every objective, best first."""
+    designs = designs.dropna(subset=list(objectives))
+    # as costs every objective is minimized
+    costs = np.column_stack(
+        [
+            designs[name].to_numpy() * (-1 if sense == "max" else 1)
+            for name, sense in objectives.items()
+        ]
+    )
+    dominated = np.zeros(len(costs), dtype=bool)
+    for i, cost in enumerate(costs):
+        if not dominated[i]:
+            dominated |= np.all(cost <= costs, axis=1) & np.any(cost < costs, axis=1)
+
+    first, sense = next(iter(objectives.items()))
+    return designs[~dominated].sort_values(first, ascending=sense == "min").reset_index(drop=True)
+
+
+def main():
+    from database import get_engine
+
+    parser = argparse.ArgumentParser(description="Size the rotor and the stack")
+    parser.add_argument("--site", default=DEFAULT_SITE_NAME)
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--end", type=datetime.fromisoformat)
+    parser.add_argument("--objective", choices=list(OBJECTIVES), default="h2_kg_per_year")
+    parser.add_argument(
+        "--pareto",
+        nargs="+",
+        choices=list(OBJECTIVES),
+        default=list(OBJECTIVES),
+        help="objectives the Pareto front is taken over",
+    )
+    parser.add_argument("--output", type=Path, default=Path("data/pareto.csv"))
+    args = parser.parse_args()
+
+    weather = load_weather_history(get_engine(), args.site, args.start, args.end)
+    problem = SizingProblem(weather)
+    designs = grid_search(problem)
+
+    front = pareto_front(designs, {name: OBJECTIVES[name] for name in args.pareto})
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    front.to_csv(args.output, index=False)
+    print(f"Pareto front of {len(front)} / {len(designs)} designs written to {args.output}")
+
+    ranked = designs.dropna(subset=[args.objective]).sort_values(
+        args.objective, ascending=OBJECTIVES[args.objective] == "min"
+    )
+    start = Design.model_validate(ranked.iloc[0][DESIGN_COLUMNS].to_dict())
+    best, metrics = refine(problem, start, args.objective)
+    print(f"Best {args.objective}: {best.model_dump()} -> {metrics}")
+
+
+if __name__ == "__main__":
+    main()
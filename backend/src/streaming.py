@@ -0,0 +1,89 @@
+"""Incremental serializers for streaming query results.
+
+Each serializer takes the selected columns and an iterator of row batches
+(e.g. `Result.partitions()` of a server-side cursor) and yields encoded
+chunks, so a response never holds more than one batch in memory.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+
+import pyarrow as pa
+import sqlalchemy as sa
+
+Rows = Iterable[Sequence[Sequence]]
+
+ARROW_TYPES = [
+    (sa.DateTime, pa.timestamp("us")),
+    (sa.Float, pa.float64()),
+    (sa.Integer, pa.int64()),
+    (sa.Boolean, pa.bool_()),
+]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def _to_text(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_ndjson(columns: Sequence[sa.Column], batches: Rows) -> Iterator[bytes]:
+    names = [column.name for column in columns]
+    for batch in batches:
+        lines = (
+            json.dumps(dict(zip(names, map(_to_text, row)))) + "\n" for row in batch
+        )
+        yield "".join(lines).encode()
+
+
+def iter_csv(columns: Sequence[sa.Column], batches: Rows) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(column.name for column in columns)
+    for batch in batches:
+        writer.writerows(map(_to_text, row) for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()  # header of an empty result
+
+
+def arrow_type(column: sa.Column) -> pa.DataType:
+    for sql_type, pa_type in ARROW_TYPES:
+        if isinstance(column.type, sql_type):
+            return pa_type
+    return pa.string()
+
+
+def arrow_schema(columns: Sequence[sa.Column]) -> pa.Schema:
+    return pa.schema(
+        [pa.field(column.name, arrow_type(column), column.nullable) for column in columns]
+    )
+
+
+def iter_arrow(columns: Sequence[sa.Column], batches: Rows) -> Iterator[bytes]:
+    """Arrow IPC stream: the schema, then one record batch per row batch."""
+    schema = arrow_schema(columns)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            arrays = [
+                pa.array([row[i] for row in batch], type=field.type)
+                for i, field in enumerate(schema)
+            ]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()  # end-of-stream marker
+
+
+SERIALIZERS = {"ndjson": iter_ndjson, "csv": iter_csv, "arrow": iter_arrow}
@@ -0,0 +1,236 @@
+"""Time-stepped stack temperature and voltage degradation.
+
+The stack is a lumped heat capacity C that gains the electrochemical `Heat`
+of its operating point and loses UA * (T - T_ambient) to the surroundings;
+the cooling loop keeps it at or below its operating temperature. Each cell
+voltage rises linearly with the operating hours, so at a given power the
+current and the H2 output fall and the heat grows.
+
+Over a step with constant heat, the temperature relaxes exactly towards
+T_ambient + Heat / UA, so a step is the map T -> min(a * T + b, T_max). Maps
+of that form compose into maps of that form, which lets
+`_affine_min_scan` integrate a whole block of steps with a parallel prefix
+scan instead of a Python loop per step. Heat depends (weakly) on the
+temperature it is integrated into, so each block is solved by fixed-point
+passes: operating points at the temperatures of the previous pass, then the
+temperatures from those heats, until they agree within `tolerance_k`. All
+arrays are (steps, stacks), so many independent stacks advance together.
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike
+from pydantic import BaseModel, Field
+
+from main import T_spec, V_TN, StackParameters, generate_lut_2d
+from models.air import weather_air_density
+from models.electrolyser import ThermalElectrolyserModel
+from models.wind import WindTurbineModel
+from scenarios import sample_hours
+from simulation import default_turbine
+
+BLOCK_STEPS = 2**16  # steps per scan; bounds the memory of one block
+MAX_PASSES = 20
+
+
+class ThermalParameters(BaseModel):
+    """Lumped thermal and ageing parameters of a stack."""
+
+    heat_capacity_j_k: float = Field(
+        40_000.0, gt=0, description="Heat capacity of stack and water in J/K"
+    )
+    heat_loss_w_k: float = Field(
+        5.0, gt=0, description="Heat transfer coefficient to ambient (UA) in W/K"
+    )
+    max_temperature_k: float = Field(
+        T_spec, gt=0, description="Operating temperature held by the cooling loop in K"
+    )
+    degradation_v_h: float = Field(
+        4e-6, ge=0, description="Cell voltage rise per operating hour in V/h"
+    )
+
+
+def _affine_min_scan(
+    a: np.ndarray, b: np.ndarray, c: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Prefix compositions of the maps x -> min(a[k] * x + b[k], c[k]) along axis 0.
+
+    Returns (A, B, C) such that applying maps 0..k to x gives
+    min(A[k] * x + B[k], C[k]). Requires a >= 0. Hillis-Steele scan: log2(steps)
+    vectorized passes.
+    """
+    a, b, c = (np.array(x, dtype=float) for x in (a, b, c))
+    shift = 1
+    while shift < len(a):
+        # compose map k (later) after the prefix ending at k - shift (earlier)
+        a_late, b_late, c_late = a[shift:], b[shift:], c[shift:]
+        new_a = a_late * a[:-shift]
+        new_b = a_late * b[:-shift] + b_late
+        new_c = np.minimum(a_late * c[:-shift] + b_late, c_late)
+        a[shift:], b[shift:], c[shift:] = new_a, new_b, new_c
+        shift *= 2
+    return a, b, c
+
+
+def simulate_stacks(
+    model: ThermalElectrolyserModel,
+    power_w: ArrayLike,
+    ambient_k: ArrayLike,
+    hours: ArrayLike,
+    n_cells: int,
+    params: ThermalParameters | None = None,
+    initial_temperature_k: ArrayLike | None = None,
+    initial_operating_hours: ArrayLike = 0.0,
+    tolerance_k: float = 0.01,
+) -> dict[str, np.ndarray]:
+    """Advance independent stacks through a series of steps.
+
+    Args:
+        model (ThermalElectrolyserModel): Operating point over current and
+            temperature, shared by all stacks.
+        power_w (ArrayLike): Available power per step, shape (steps,) or
+            (steps, stacks).
+        ambient_k (ArrayLike): Ambient temperature, a scalar, (steps,) or
+            (steps, stacks).
+        hours (ArrayLike): Length of each step in hours, (steps,).
+        n_cells (int): Cells per stack, for the degradation of the voltage.
+        params (ThermalParameters | None): Defaults to ThermalParameters().
+        initial_temperature_k (ArrayLike | None): Per stack; defaults to the
+            first ambient temperature.
+        initial_operating_hours (ArrayLike): Per stack, the age at the start.
+
+    Returns:
+        dict[str, np.ndarray]: (steps, stacks) arrays temperature_k (at the
+            start of each step), operating_hours, stack_power_w,
+            stack_current_a, cell_voltage_v, h2_kg_h and heat_w.
+    """
+    params = params or ThermalParameters()
+    hours = np.asarray(hours, dtype=float)
+    power = np.asarray(power_w, dtype=float).reshape(len(hours), -1)
+    ambient = np.asarray(ambient_k, dtype=float)
+    if ambient.ndim == 1:
+        ambient = ambient[:, np.newaxis]
+    ambient = np.broadcast_to(ambient, power.shape)
+    n_stacks = power.shape[1]
+
+    if initial_temperature_k is None:
+        initial_temperature_k = ambient[0]
+    temperature = np.broadcast_to(
+        np.asarray(initial_temperature_k, dtype=float), (n_stacks,)
+    ).astype(float)
+    operating_hours = np.broadcast_to(
+        np.asarray(initial_operating_hours, dtype=float), (n_stacks,)
+    ).astype(float)
+
+    blocks = []
+    for start in range(0, len(hours), BLOCK_STEPS):
+        block = slice(start, start + BLOCK_STEPS)
+        result = _simulate_block(
+            model,
+            power[block],
+            ambient[block],
+            hours[block],
+            n_cells,
+            params,
+            temperature,
+            operating_hours,
+            tolerance_k,
+        )
+        temperature = result.pop("final_temperature_k")
+        operating_hours = result.pop("final_operating_hours")
+        blocks.append(result)
+
+    if not blocks:
+        return {}
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+def _simulate_block(
+    model: ThermalElectrolyserModel,
+    power: np.ndarray,
+    ambient: np.ndarray,
+    hours: np.ndarray,
+    n_cells: int,
+    params: ThermalParameters,
+    temperature_0: np.ndarray,
+    operating_hours_0: np.ndarray,
+    tolerance_k: float,
+) -> dict[str, np.ndarray]:
+    dt_h = hours[:, np.newaxis]
+    # relaxation factor of a step: exp(-dt / tau), tau = C / UA
+    decay = np.exp(-dt_h * 3600 * params.heat_loss_w_k / params.heat_capacity_j_k)
+    ceiling = np.full(power.shape, params.max_temperature_k, dtype=float)
+
+    temperature = np.broadcast_to(temperature_0, power.shape).copy()
+    for _ in range(MAX_PASSES):
+        point = model.operating_point(power, temperature)
+        running = point["I"] > 0
+        # age at the start of each step
+        run_h = running * dt_h
+        operating_hours = operating_hours_0 + np.cumsum(run_h, axis=0) - run_h
+        degradation_v = n_cells * params.degradation_v_h * operating_hours
+        stack_voltage = np.where(running, point["V_stack"] + degradation_v, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            current = np.where(running, point["P"] / stack_voltage, 0.0)
+            h2 = np.where(running, point["H2"] * current / point["I"], 0.0)
+        heat = np.where(running, point["P"] - current * n_cells * V_TN, 0.0)
+
+        equilibrium = ambient + heat / params.heat_loss_w_k
+        scan_a, scan_b, scan_c = _affine_min_scan(
+            decay, (1 - decay) * equilibrium, ceiling
+        )
+        after = np.minimum(scan_a * temperature_0 + scan_b, scan_c)
+        updated = np.concatenate([temperature_0[np.newaxis, :], after[:-1]])
+
+        converged = np.max(np.abs(updated - temperature), initial=0.0) < tolerance_k
+        temperature = updated
+        if converged:
+            break
+
+    return {
+        "temperature_k": temperature,
+        "operating_hours": operating_hours,
+        "stack_power_w": point["P"],
+        "stack_current_a": current,
+        "cell_voltage_v": stack_voltage / n_cells,
+        "h2_kg_h": h2,
+        "heat_w": heat,
+        "final_temperature_k": after[-1],
+        "final_operating_hours": operating_hours[-1] + run_h[-1],
+    }
+
+
+def simulate_weather_thermal(
+    weather: pd.DataFrame,
+    turbine: WindTurbineModel | None = None,
+    stack: StackParameters | None = None,
+    params: ThermalParameters | None = None,
+) -> pd.DataFrame:
+    """Run one stack with its thermal state over a frame of weather rows.
+
+    Args:
+        weather (pd.DataFrame): timestamp, temperature_k, pressure_pa,
+            humidity_percent and wind_speed_m_s, sorted by timestamp.
+
+    Returns:
+        pd.DataFrame: The columns of `simulate_stacks`, indexed like `weather`.
+    """
+    turbine = turbine or default_turbine()
+    stack = stack or StackParameters()
+    density = weather_air_density(
+        weather["temperature_k"], weather["pressure_pa"], weather["humidity_percent"]
+    )
+    turbine_power = turbine.power_output_watts(
+        weather["wind_speed_m_s"].to_numpy(dtype=float), density
+    )
+    result = simulate_stacks(
+        ThermalElectrolyserModel(generate_lut_2d(stack)),
+        turbine_power,
+        weather["temperature_k"].to_numpy(dtype=float),
+        sample_hours(weather["timestamp"]),
+        stack.n_cells,
+        params,
+    )
+    return pd.DataFrame(
+        {name: values[:, 0] for name, values in result.items()}, index=weather.index
+    )
@@ -0,0 +1,219 @@
+"""Time series utilities for serving long histories to charts.
+
+Weather is stored at the irregular `dt` of the API, with gaps where a poll
+failed. `Resampler` puts a series onto a uniform grid aligned to the epoch
+and `TrapezoidIntegrator` turns rates into cumulative amounts. Both consume
+the series in chunks and carry the last sample over to the next chunk, so an
+arbitrarily long range is processed in one pass with bounded memory and the
+result does not depend on where the chunks are cut.
+"""
+
+from typing import Literal
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+InterpolationMethod = Literal["linear", "previous", "nearest"]
+
+
+def lttb(x: ArrayLike, y: ArrayLike, n_out: int) -> np.ndarray:
+    """Downsample a series with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points, and from each of `n_out - 2` equal-count
+    buckets in between the point forming the largest triangle with the point
+    kept from the previous bucket and the mean of the next bucket. Peaks and
+    troughs survive, unlike with averaging or decimation.
+
+    Args:
+        x (ArrayLike): Sorted x values, e.g. epoch seconds.
+        y (ArrayLike): y values, without NaN.
+        n_out (int): Maximum number of points to keep, at least 3.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out < 3:
+        raise ValueError("LTTB needs at least 3 output points")
+    if n <= n_out:
+        return np.arange(n)
+
+    # n_out - 2 buckets over the points 1 .. n - 2, each at least one point wide
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i < n_out - 3 else (n - 1, n)
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        # twice the triangle areas; the factor does not change the argmax
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def _sorted_unique(t: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sort by time and keep the last of the samples sharing a timestamp."""
+    order = np.argsort(t, kind="stable")
+    t, values = t[order], values[order]
+    last = np.append(t[1:] != t[:-1], True)
+    return t[last], values[last]
+
+
+class Resampler:
+    """Resample chunks of a series onto the grid of multiples of `step_s`.
+
+    Each grid point takes the value interpolated between the samples around
+    it. A grid point inside an interval longer than `max_gap_s` without
+    samples is a gap: its values are NaN and its gap flag is set. Shorter
+    intervals are filled by the interpolation. Samples sharing a timestamp,
+    also across chunks, count once with the value of the last one.
+
+    Args:
+        step_s (float): Grid spacing in seconds.
+        method (InterpolationMethod): "linear", "previous" (hold the last
+            sample) or "nearest".
+        max_gap_s (float): Longest interval between samples that is filled.
+    """
+
+    def __init__(
+        self, step_s: float, method: InterpolationMethod = "linear", max_gap_s: float = np.inf
+    ):
+        if step_s <= 0:
+            raise ValueError("The grid step must be positive")
+        if method not in ("linear", "previous", "nearest"):
+            raise ValueError(f"Unknown interpolation method {method!r}")
+        self.step_s = float(step_s)
+        self.method = method
+        self.max_gap_s = float(max_gap_s)
+        self._last_t = np.empty(0)
+        self._last_values: np.ndarray | None = None
+        self._next_k: int | None = None  # index of the next grid point to emit
+
+    def push(self, t_s: ArrayLike, values: ArrayLike) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Grid points up to, but excluding, the last sample so far.
+
+        Args:
+            t_s (ArrayLike): Sample times in seconds, (n,), e.g. epoch seconds.
+            values (ArrayLike): Sample values, (n,) or (n, columns).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Grid times (m,), values
+                (m, columns) and gap flags (m,).
+        """
+        t = np.asarray(t_s, dtype=float)
+        values = np.asarray(values, dtype=float).reshape(len(t), -1)
+        if self._last_values is not None:
+            t = np.concatenate([self._last_t, t])
+            values = np.concatenate([self._last_values, values])
+        if len(t) == 0:
+            return np.empty(0), np.empty((0, 0)), np.empty(0, dtype=bool)
+        t, values = _sorted_unique(t, values)
+        self._last_t, self._last_values = t[-1:], values[-1:]
+
+        if self._next_k is None:
+            self._next_k = int(np.ceil(t[0] / self.step_s))
+        # the point at the last sample waits: a later duplicate may replace it
+        end_k = int(np.ceil(t[-1] / self.step_s))
+        grid = np.arange(self._next_k, max(end_k, self._next_k)) * self.step_s
+        self._next_k = max(end_k, self._next_k)
+        return (grid, *self._interpolate(t, values, grid))
+
+    def finish(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The grid point at the last sample, if the last sample is on the grid."""
+        if self._last_values is None or self._next_k is None:
+            return np.empty(0), np.empty((0, 0)), np.empty(0, dtype=bool)
+        grid = np.arange(self._next_k, self._last_t[0] / self.step_s + 1) * self.step_s
+        grid = grid[grid == self._last_t[0]]
+        self._next_k += len(grid)
+        return (grid, *self._interpolate(self._last_t, self._last_values, grid))
+
+    def _interpolate(
+        self, t: np.ndarray, values: np.ndarray, grid: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # t[left] <= grid < t[right], or grid == t[left] == t[right] at the end
+        right = np.minimum(np.searchsorted(t, grid, side="right"), len(t) - 1)
+        left = np.maximum(right - 1, 0)
+        left = np.where(t[right] == grid, right, left)
+        t_left, t_right = t[left], t[right]
+        on_sample = t_left == grid
+
+        if self.method == "previous":
+            result = values[left]
+        elif self.method == "nearest":
+            nearer_left = grid - t_left <= t_right - grid
+            result = np.where(nearer_left[:, np.newaxis], values[left], values[right])
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                weight = np.where(on_sample, 0.0, (grid - t_left) / (t_right - t_left))
+            weight = weight[:, np.newaxis]
+            result = values[left] + weight * (values[right] - values[left])
+            result = np.where(on_sample[:, np.newaxis], values[left], result)
+
+        gap = ~on_sample & (t_right - t_left > self.max_gap_s)
+        result = np.where(gap[:, np.newaxis], np.nan, result)
+        return result, gap
+
+
+class TrapezoidIntegrator:
+    """Cumulative trapezoidal integrals of rates over chunks of a series.
+
+    Rates per hour integrate to amounts (W to Wh, kg/h to kg). An interval
+    longer than `max_gap_s`, or ending at a sample whose values are all NaN
+    (a gap of `Resampler`), is a gap and adds nothing; the rest of the time
+    is covered. A NaN value in one column only drops that column's interval.
+
+    Args:
+        max_gap_s (float): Longest interval between samples that is integrated.
+    """
+
+    def __init__(self, max_gap_s: float = np.inf):
+        self.max_gap_s = float(max_gap_s)
+        self.totals: np.ndarray | None = None
+        self.covered_s = 0.0
+        self.gap_s = 0.0
+        self._last_t = np.empty(0)
+        self._last_values = np.empty((0, 0))
+
+    def push(self, t_s: ArrayLike, values: ArrayLike) -> np.ndarray:
+        """Integrals from the first sample so far to each sample of the chunk.
+
+        Args:
+            t_s (ArrayLike): Sorted sample times in seconds, (n,).
+            values (ArrayLike): Rates per hour, (n,) or (n, columns).
+
+        Returns:
+            np.ndarray: (n, columns) cumulative amounts.
+        """
+        t = np.asarray(t_s, dtype=float)
+        values = np.asarray(values, dtype=float).reshape(len(t), -1)
+        if self.totals is None:
+            self.totals = np.zeros(values.shape[1])
+            self._last_values = np.empty((0, values.shape[1]))
+        if len(t) == 0:
+            return np.empty((0, len(self.totals)))
+        t_all = np.concatenate([self._last_t, t])
+        values_all = np.concatenate([self._last_values, values])
+
+        dt = np.diff(t_all)
+        has_values = ~np.all(np.isnan(values_all), axis=1)
+        integrated = (dt <= self.max_gap_s) & has_values[1:] & has_values[:-1]
+        self.covered_s += float(dt[integrated].sum())
+        self.gap_s += float(dt[~integrated].sum())
+        area = dt[:, np.newaxis] / 3600 * (values_all[1:] + values_all[:-1]) / 2
+        area = np.where(integrated[:, np.newaxis] & ~np.isnan(area), area, 0.0)
+
+        cumulative = self.totals + np.cumsum(area, axis=0)
+        if len(self._last_t) == 0:  # the very first sample starts at zero
+            cumulative = np.concatenate([np.zeros((1, len(self.totals))), cumulative])
+        self.totals = cumulative[-1].copy()
+        self._last_t, self._last_values = t_all[-1:], values_all[-1:]
+        return cumulative
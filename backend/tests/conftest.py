@@ -0,0 +1,59 @@
+import os
+
+# the application modules read their settings at import time
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from collections.abc import Iterable, Sequence  # noqa: E402
+from datetime import datetime, timedelta  # noqa: E402
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from db_models.weather import WEATHER_COLUMNS  # noqa: E402
+
+START = datetime(2026, 1, 1)
+WEATHER_VALUES = {
+    "temperature_k": 280.0,
+    "pressure_pa": 101_300.0,
+    "humidity_percent": 80.0,
+    "dew_point_k": 276.0,
+    "wind_deg": 270,
+    "wind_gust_m_s": None,
+}
+
+
+def weather_frame(
+    minutes: Iterable[float],
+    wind_speed_m_s: float | Sequence[float] = 10.0,
+    site: str = "default",
+    start: datetime = START,
+    **values,
+) -> pd.DataFrame:
+    """Weather rows as `etl.transform_weather_data` gives them, `minutes` after `start`.
+
+    All values but the wind speed are constant, unless given in `values`.
+    """
+    timestamps = [start + timedelta(minutes=minute) for minute in minutes]
+    columns = {**WEATHER_VALUES, "wind_speed_m_s": wind_speed_m_s, **values}
+    return pd.DataFrame({"site": site, "timestamp": timestamps, **columns})[WEATHER_COLUMNS]
+
+
+def weibull_wind(rows: int, seed: int) -> np.ndarray:
+    """Wind speeds of a plausible site, mean about 7 m/s."""
+    return np.random.default_rng(seed).weibull(2.0, rows) * 8
+
+
+def half_hourly_weather(rows: int, seed: int) -> pd.DataFrame:
+    """`rows` weather rows 30 minutes apart, with `weibull_wind` speeds."""
+    return weather_frame(range(0, 30 * rows, 30), weibull_wind(rows, seed))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine of an empty SQLite database file with the application schema."""
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'test.db'}")
+    SQLModel.metadata.create_all(engine)
+    return engine
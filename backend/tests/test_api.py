@@ -0,0 +1,238 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+import api
+from config import settings
+from conftest import START, WEATHER_VALUES
+from database import upsert_records
+from db_models.simulation import SIMULATION_KEY, Simulation
+from db_models.weather import WEATHER_KEY, Weather
+from response_cache import ResponseCache
+from rollups import rebuild_rollups
+
+
+def weather_record(minute: int, site: str = "default") -> dict:
+    timestamp = START + timedelta(minutes=5 * minute)
+    return {"site": site, "timestamp": timestamp, **WEATHER_VALUES, "wind_speed_m_s": float(minute)}
+
+
+@pytest.fixture
+def engine(engine):
+    records = [weather_record(i) for i in range(25)] + [weather_record(0, site="north")]
+    upsert_records(engine, Weather.__table__, records, WEATHER_KEY)  # type: ignore[arg-type]
+    rebuild_rollups(engine)
+    return engine
+
+
+@pytest.fixture
+def client(engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "get_read_engine", lambda: engine)
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(2**20))
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    return TestClient(api.app)
+
+
+def test_pages_follow_the_keyset_cursor(client):
+    url, pages = "/weather/?site=default&limit=10", []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append(response.json())
+        url = response.links.get("next", {}).get("url")
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    speeds = [row["wind_speed_m_s"] for page in pages for row in page]
+    assert speeds == [float(i) for i in range(25)]
+
+
+def test_rows_sharing_a_timestamp_are_not_skipped(client):
+    first = client.get("/weather/?limit=1").json()
+    assert [row["site"] for row in first] == ["default"]
+    rest = client.get(
+        "/weather/",
+        params={"after_timestamp": first[0]["timestamp"], "after_id": first[0]["id"], "limit": 2},
+    ).json()
+    assert [row["site"] for row in rest] == ["north", "default"]
+
+
+def test_fields_project_the_columns(client):
+    rows = client.get("/weather/?fields=timestamp,wind_speed_m_s&limit=2").json()
+    assert rows == [
+        {"timestamp": "2026-01-01T00:00:00", "wind_speed_m_s": 0.0},
+        {"timestamp": "2026-01-01T00:00:00", "wind_speed_m_s": 0.0},
+    ]
+    assert client.get("/weather/?fields=wind,site").status_code == 422
+
+
+def test_ndjson_and_csv_stream_the_whole_range(client):
+    ndjson = client.get("/weather/?site=default&format=ndjson&fields=id,wind_speed_m_s")
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert len(rows) == 25
+
+    text = client.get("/weather/?site=default&format=csv&fields=timestamp,wind_speed_m_s").text
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert len(rows) == 25
+    assert rows[1] == {"timestamp": "2026-01-01T00:05:00", "wind_speed_m_s": "1.0"}
+
+    empty = client.get("/weather/?site=south&format=csv&fields=id").text
+    assert empty.splitlines() == ["id"]
+
+
+def test_arrow_stream_batches(client, monkeypatch):
+    monkeypatch.setattr(api, "STREAM_BATCH_SIZE", 10)
+    response = client.get("/weather/?format=arrow")
+    batches = list(pa.ipc.open_stream(response.content))
+    assert [batch.num_rows for batch in batches] == [10, 10, 6]
+    table = pa.Table.from_batches(batches)
+    assert table.schema.field("timestamp").type == pa.timestamp("us")
+    assert table.column("wind_gust_m_s").null_count == 26
+
+
+def test_aggregate_buckets_in_sql(client):
+    rows = client.get("/weather/aggregate?bucket=1h&fields=wind_speed_m_s").json()
+
+    assert [row["bucket"] for row in rows] == ["2026-01-01T00:00:00", "2026-01-01T01:00:00", "2026-01-01T02:00:00"]
+    assert [row["count"] for row in rows] == [12, 12, 1]
+    first = rows[0]
+    assert (first["wind_speed_m_s_min"], first["wind_speed_m_s_max"]) == (0.0, 11.0)
+    assert first["wind_speed_m_s_mean"] == pytest.approx(5.5)
+    assert set(first) == {"bucket", "count", "wind_speed_m_s_min", "wind_speed_m_s_mean", "wind_speed_m_s_max"}
+
+    assert client.get("/weather/aggregate?bucket=5m&fields=wind_speed_m_s").json()[1] == {
+        "bucket": "2026-01-01T00:05:00",
+        "count": 1,
+        "wind_speed_m_s_min": 1.0,
+        "wind_speed_m_s_mean": 1.0,
+        "wind_speed_m_s_max": 1.0,
+    }
+    assert client.get("/weather/aggregate?bucket=2h").status_code == 422
+    assert client.get("/weather/aggregate?bucket=1h&fields=site").status_code == 422
+
+
+def test_lttb_returns_at_most_the_requested_points(client):
+    rows = client.get("/weather/lttb?field=wind_speed_m_s&points=5").json()
+
+    assert len(rows) == 5
+    assert rows[0] == {"timestamp": "2026-01-01T00:00:00", "wind_speed_m_s": 0.0}
+    assert rows[-1] == {"timestamp": "2026-01-01T02:00:00", "wind_speed_m_s": 24.0}
+    assert client.get("/weather/lttb?field=wind_gust_m_s").json() == []
+
+
+def test_aggregate_bucket_follows_the_range(client):
+    day = client.get("/weather/aggregate?fields=wind_speed_m_s").json()
+    assert [row["count"] for row in day] == [25]
+
+    params = {"start_timestamp": "2026-01-01T00:30:00", "end_timestamp": "2026-01-01T02:00:00"}
+    five_minutes = client.get("/weather/aggregate?fields=wind_speed_m_s", params=params).json()
+    assert len(five_minutes) == 19
+
+
+def test_daily_rollups_are_served(client):
+    (row,) = client.get("/rollups/daily").json()
+    assert row["bucket"] == "2026-01-01T00:00:00"
+    assert row["count"] == 25
+    assert row["wind_speed_m_s_max"] == 24.0
+    assert row["h2_kg"] is None  # no simulation rows loaded
+
+
+def test_metrics_count_weather_requests_and_rows(client):
+    client.get("/weather/?limit=10")
+    client.get("/weather/?format=csv")
+
+    text = client.get("/metrics").text
+    assert 'api_request_duration_seconds_count{method="GET",route="/weather/",status="200"}' in text
+    assert 'api_response_rows_bucket{format="json",le="10.0",route="/weather/"}' in text
+    assert 'api_response_rows_sum{format="csv",route="/weather/"}' in text
+
+
+def test_resampled_weather_is_interpolated_and_gaps_are_null(client):
+    params = {"fields": "wind_speed_m_s", "end_timestamp": "2026-01-01T00:20:00"}
+    rows = client.get("/weather/resampled", params=params).json()
+    assert [row["wind_speed_m_s"] for row in rows] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    rows = client.get("/weather/resampled?step=1h&fields=wind_speed_m_s").json()
+    assert rows == [
+        {"timestamp": "2026-01-01T00:00:00", "gap": False, "wind_speed_m_s": 0.0},
+        {"timestamp": "2026-01-01T01:00:00", "gap": False, "wind_speed_m_s": 12.0},
+        {"timestamp": "2026-01-01T02:00:00", "gap": False, "wind_speed_m_s": 24.0},
+    ]
+    assert client.get("/weather/resampled?method=cubic").status_code == 422
+
+
+def test_energy_integrates_the_simulated_rates(client, engine):
+    records = [
+        {
+            "site": "default",
+            "timestamp": START + timedelta(minutes=5 * minute),
+            "air_density_kg_m3": 1.25,
+            "turbine_power_w": 6000.0,
+            "stack_power_w": 3000.0,
+            "stack_current_a": 100.0,
+            "cell_voltage_v": 1.8,
+            "h2_kg_h": 0.06,
+            "efficiency": 0.6,
+            "heat_w": 500.0,
+        }
+        for minute in [*range(13), 24]  # 01:05 to 02:00 missing
+    ]
+    upsert_records(engine, Simulation.__table__, records, SIMULATION_KEY)  # type: ignore[arg-type]
+
+    body = client.get("/energy/?series=true").json()
+
+    assert body["totals"] == {
+        "turbine_energy_kwh": pytest.approx(6.0),
+        "stack_energy_kwh": pytest.approx(3.0),
+        "h2_kg": pytest.approx(0.06),
+        "covered_hours": pytest.approx(1.0),
+        "gap_hours": pytest.approx(1.0),
+    }
+    assert body["series"][12]["turbine_energy_kwh"] == pytest.approx(6.0)
+    assert body["series"][13]["gap"] and body["series"][13]["h2_kg_h"] is None
+    assert client.get("/energy/").json()["series"] is None
+
+
+def test_unchanged_weather_is_not_modified_until_the_etl_writes(client, engine):
+    first = client.get("/weather/?limit=10")
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"].endswith(" GMT")
+
+    again = client.get("/weather/?limit=10", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert client.get("/weather/?limit=10").json() == first.json()  # from the cache
+    assert len(api.RESPONSE_CACHE) == 1
+    assert client.get("/weather/?limit=11", headers={"If-None-Match": etag}).status_code == 200
+
+    upsert_records(engine, Weather.__table__, [weather_record(25)], WEATHER_KEY)  # type: ignore[arg-type]
+
+    changed = client.get("/weather/?limit=10", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    # the page of the new version replaced the old one
+    assert len(api.RESPONSE_CACHE) == 2
+    text = client.get("/metrics").text
+    assert 'api_cache_requests_total{result="not_modified",route="/weather/"}' in text
+
+
+def cache_requests(result: str) -> float:
+    labels = {"route": "/weather/", "result": result}
+    return REGISTRY.get_sample_value("api_cache_requests_total", labels) or 0.0
+
+
+def test_sites_keep_their_cached_pages_while_the_other_changes(client, engine):
+    hits, misses = cache_requests("hit"), cache_requests("miss")
+    for _ in range(3):
+        client.get("/weather/?site=default&limit=5")
+        client.get("/weather/?site=north")
+    assert cache_requests("hit") - hits == 4 and cache_requests("miss") - misses == 2
+
+    upsert_records(engine, Weather.__table__, [weather_record(1, site="north")], WEATHER_KEY)  # type: ignore[arg-type]
+    assert len(client.get("/weather/?site=north").json()) == 2
+    assert client.get("/weather/?site=default&limit=5").json()[0]["site"] == "default"
+    assert cache_requests("hit") - hits == 5 and cache_requests("miss") - misses == 3
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+
+import json
+
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+import api
+from archive import archive_root, iter_archive, partition_path
+from compaction import archive_day, oldest_day
+from config import settings
+from conftest import weather_frame
+from db_models.simulation import Simulation
+from db_models.weather import Weather
+from etl import load_weather_frames, simulate_weather_rows
+from response_cache import ResponseCache
+
+START = datetime(2026, 1, 1, 22)
+MINUTES = range(0, 240, 30)  # 22:00 on Jan 1 to 01:30 on Jan 2
+WIND_SPEEDS = [float(i) for i in range(len(MINUTES))]
+
+
+@pytest.fixture
+def engine(engine):
+    for site in ("default", "north"):
+        weather = weather_frame(MINUTES, WIND_SPEEDS, site, start=START)
+        load_weather_frames(engine, weather, simulate_weather_rows(weather))
+    return engine
+
+
+def count(engine, model) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def test_days_move_to_partitioned_parquet(engine, tmp_path):
+    archive_dir = str(tmp_path / "archive")
+    assert archive_day.fn(engine, START.date(), archive_dir) == 8
+
+    assert count(engine, Weather) == count(engine, Simulation) == 8
+    path = partition_path(archive_root(archive_dir), START.date(), "north")
+    assert path.exists()
+    assert pq.read_metadata(path).row_group(0).column(0).compression == "ZSTD"
+
+    # archiving the same day again merges instead of duplicating
+    weather = weather_frame(MINUTES, WIND_SPEEDS, start=START)
+    load_weather_frames(engine, weather, simulate_weather_rows(weather))
+    archive_day.fn(engine, START.date(), archive_dir)
+    tables = list(iter_archive(["site", "timestamp", "h2_kg_h"], archive_dir=archive_dir))
+    assert sum(table.num_rows for table in tables) == 8
+
+
+def test_archive_reads_are_filtered_and_ordered(engine, tmp_path):
+    archive_dir = str(tmp_path / "archive")
+    archive_day.fn(engine, START.date(), archive_dir)
+
+    (table,) = iter_archive(
+        ["timestamp", "wind_speed_m_s"],
+        site="default",
+        start_timestamp=START + timedelta(minutes=30),
+        archive_dir=archive_dir,
+    )
+    assert table.column_names == ["timestamp", "wind_speed_m_s"]
+    assert table.column("wind_speed_m_s").to_pylist() == [1.0, 2.0, 3.0]
+
+    (table,) = iter_archive(["id", "site"], after=(START + timedelta(hours=1), None), archive_dir=archive_dir)
+    assert table.column("site").to_pylist() == ["default", "north"]
+    assert list(iter_archive(["id"], end_timestamp=START - timedelta(days=1), archive_dir=archive_dir)) == []
+
+
+def test_days_are_archived_oldest_first(engine, tmp_path):
+    assert oldest_day(engine) == START.date()
+    archive_day.fn(engine, oldest_day(engine), str(tmp_path / "archive"))
+
+    assert oldest_day(engine) == datetime(2026, 1, 2).date()
+    assert oldest_day(engine, since=datetime(2026, 1, 3)) is None
+
+
+def test_api_reads_span_the_archive_and_the_database(engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "get_read_engine", lambda: engine)
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(2**20))
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    archive_day.fn(engine, START.date(), settings.ARCHIVE_DIR)
+    client = TestClient(api.app)
+
+    url, rows = "/weather/?site=default&limit=3&fields=wind_speed_m_s", []
+    while url:
+        response = client.get(url)
+        rows += response.json()
+        url = response.links.get("next", {}).get("url")
+    assert [row["wind_speed_m_s"] for row in rows] == [float(i) for i in range(8)]
+
+    response = client.get("/weather/", params={"format": "ndjson", "limit": 5})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["site"] for line in lines] == ["default", "north"] * 2 + ["default"]
+
+    response = client.get("/weather/lttb", params={"field": "wind_speed_m_s", "points": 3})
+    speeds = [row["wind_speed_m_s"] for row in response.json()]
+    assert len(speeds) == 3 and speeds[0] == 0.0 and speeds[-1] == 7.0
+
+
+@pytest.fixture
+def archived_client(engine, tmp_path, monkeypatch):
+    """API client over the database, with the first day moved to the archive."""
+    monkeypatch.setattr(api, "get_read_engine", lambda: engine)
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    archive_day.fn(engine, START.date(), settings.ARCHIVE_DIR)
+    return TestClient(api.app)
+
+
+def test_simulation_rows_span_the_archive_and_the_database(archived_client):
+    rows = archived_client.get("/simulation/", params={"site": "north"}).json()
+    assert [row["timestamp"] for row in rows] == [
+        (START + timedelta(minutes=minute)).isoformat() for minute in MINUTES
+    ]
+    assert rows[0]["id"] is None and rows[-1]["id"] is not None  # archived rows have no id
+
+    params = {"start_timestamp": (START + timedelta(minutes=90)).isoformat()}
+    assert len(archived_client.get("/simulation/", params=params).json()) == 5
+
+
+def test_raw_aggregates_span_the_archive_and_the_database(archived_client):
+    params = {"bucket": "5m", "fields": "wind_speed_m_s"}
+    buckets = archived_client.get("/weather/aggregate", params=params).json()
+
+    assert [bucket["wind_speed_m_s_mean"] for bucket in buckets] == WIND_SPEEDS
+    assert buckets[0] == {
+        "bucket": START.isoformat(),
+        "count": 1,
+        "wind_speed_m_s_min": 0.0,
+        "wind_speed_m_s_mean": 0.0,
+        "wind_speed_m_s_max": 0.0,
+    }
@@ -0,0 +1,78 @@
+import json
+
+import pandas as pd
+import pytest
+
+from backfill import (
+    iter_source_chunks,
+    load_weather_chunk,
+    read_checkpoint,
+    simulate_weather_chunk,
+    transform_weather_chunk,
+    write_checkpoint,
+)
+
+
+def openweather_rows(n: int, start: int = 1_767_225_600) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "dt": [start + 300 * i for i in range(n)],
+            "temp": 280.0,
+            "pressure": 1013.0,
+            "humidity": 80.0,
+            "dew_point": 276.0,
+            "wind_speed": 6.5,
+            "wind_deg": 270,
+        }
+    )
+
+
+def test_chunks_are_bounded_and_resume_after_skipped_rows(tmp_path):
+    source = tmp_path / "history.csv"
+    openweather_rows(25).to_csv(source, index=False)
+
+    sizes = [len(chunk) for chunk in iter_source_chunks(source, chunk_size=10)]
+    assert sizes == [10, 10, 5]
+
+    resumed = list(iter_source_chunks(source, chunk_size=10, skip_rows=13))
+    assert [len(chunk) for chunk in resumed] == [7, 5]
+    assert resumed[0]["dt"].iloc[0] == openweather_rows(25)["dt"].iloc[13]
+
+
+def test_recorded_responses_are_read(tmp_path):
+    source = tmp_path / "responses.jsonl"
+    records = openweather_rows(3).to_dict("records")
+    source.write_text("\n".join(json.dumps({"current": r}) for r in records))
+
+    chunks = list(iter_source_chunks(source, chunk_size=2))
+    weather = transform_weather_chunk.fn(pd.concat(chunks))
+    assert len(weather) == 3
+    assert weather["pressure_pa"].iloc[0] == pytest.approx(101_300.0)
+
+
+def test_transform_drops_invalid_and_duplicate_rows():
+    rows = openweather_rows(4)
+    rows.loc[1, "dt"] = rows.loc[0, "dt"]
+    rows.loc[3, "humidity"] = 120.0
+    weather = transform_weather_chunk.fn(rows)
+    assert len(weather) == 2
+    assert weather["timestamp"].dt.tz is None
+
+
+def test_reloading_a_chunk_is_idempotent(engine):
+    weather = transform_weather_chunk.fn(openweather_rows(5))
+    simulation = simulate_weather_chunk.fn(weather)
+    first, _ = load_weather_chunk.fn(engine, weather.iloc[:3], simulation.iloc[:3])
+    assert first.inserted == 3
+    result, simulation_result = load_weather_chunk.fn(engine, weather, simulation)
+    assert (result.inserted, result.updated) == (2, 3)
+    assert (simulation_result.inserted, simulation_result.updated) == (2, 3)
+
+
+def test_checkpoint_round_trip(tmp_path):
+    source = tmp_path / "history.csv"
+    checkpoint = tmp_path / "checkpoint.json"
+    assert read_checkpoint(checkpoint, source) == 0
+    write_checkpoint(checkpoint, source, 1234)
+    assert read_checkpoint(checkpoint, source) == 1234
+    assert read_checkpoint(checkpoint, tmp_path / "other.csv") == 0
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel
+
+from conftest import START, WEATHER_VALUES
+from database import UpsertResult, configure_sqlite, keys_in, upsert_records
+from db_models.weather import WEATHER_KEY, Weather
+
+TABLE = Weather.__table__
+
+
+def weather_record(minute: int, wind_speed_m_s: float = 5.0, site: str = "default") -> dict:
+    timestamp = START + timedelta(minutes=minute)
+    return {"site": site, "timestamp": timestamp, **WEATHER_VALUES, "wind_speed_m_s": wind_speed_m_s}
+
+
+def upsert(engine, records: list[dict]) -> UpsertResult:
+    return upsert_records(engine, TABLE, records, WEATHER_KEY)
+
+
+def stored(engine) -> dict:
+    with engine.connect() as conn:
+        rows = conn.execute(select(TABLE.c.timestamp, TABLE.c.wind_speed_m_s, TABLE.c.updated_at))
+        return {row.timestamp: row for row in rows}
+
+
+def test_upsert_reports_inserted_and_updated(engine):
+    first = upsert(engine, [weather_record(0), weather_record(5)])
+    assert first == UpsertResult(inserted=2, updated=0)
+
+    second = upsert(engine, [weather_record(5, 7.0), weather_record(10)])
+    assert second == UpsertResult(inserted=1, updated=1)
+
+    rows = stored(engine)
+    assert len(rows) == 3
+    assert rows[datetime(2026, 1, 1, 0, 5)].wind_speed_m_s == 7.0
+
+
+def test_duplicate_keys_in_one_batch_keep_the_last_record(engine):
+    result = upsert(engine, [weather_record(0, 1.0), weather_record(0, 2.0)])
+    assert result == UpsertResult(inserted=1, updated=0)
+    assert stored(engine)[datetime(2026, 1, 1)].wind_speed_m_s == 2.0
+
+
+def test_unchanged_records_are_not_rewritten(engine):
+    upsert(engine, [weather_record(0)])
+    updated_at = stored(engine)[datetime(2026, 1, 1)].updated_at
+
+    result = upsert(engine, [weather_record(0)])
+
+    assert result == UpsertResult(inserted=0, updated=1)
+    assert stored(engine)[datetime(2026, 1, 1)].updated_at == updated_at
+
+
+def test_empty_batch_is_a_no_op(engine):
+    assert upsert(engine, []) == UpsertResult()
+
+
+def test_existing_keys_are_counted_per_site(engine):
+    upsert(engine, [weather_record(0, site="a"), weather_record(1, site="b")])
+
+    result = upsert(engine, [weather_record(minute, site=site) for site in "ab" for minute in (0, 1)])
+    assert result == UpsertResult(inserted=2, updated=2)
+
+
+def test_key_lookup_searches_the_unique_index(engine):
+    keys = [(site, datetime(2026, 1, 1, hour)) for site in ("a", "b") for hour in range(3)]
+    query = select(TABLE.c.id).where(keys_in(TABLE, WEATHER_KEY, keys))
+    sql = query.compile(engine, compile_kwargs={"literal_binds": True})
+
+    with engine.connect() as conn:
+        plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+    assert not [step for step in plan if step.startswith("SCAN")]
+    assert any("(site=? AND timestamp=?)" in step for step in plan)
+
+
+def test_sqlite_profile_lets_readers_run_during_a_write(tmp_path):
+    url = f"sqlite+pysqlite:///{tmp_path / 'wal.db'}"
+    writer = configure_sqlite(create_engine(url))
+    reader = configure_sqlite(create_engine(url), read_only=True)
+    SQLModel.metadata.create_all(writer)
+    upsert(writer, [weather_record(0)])
+
+    with writer.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+
+    with writer.begin() as write:
+        upsert_records(write, TABLE, [weather_record(1)], WEATHER_KEY)
+        # the open write transaction neither blocks nor leaks into the reader
+        assert len(stored(reader)) == 1
+    assert len(stored(reader)) == 2
+    with reader.connect() as conn:
+        with pytest.raises(OperationalError, match="readonly"):
+            conn.execute(text("DELETE FROM weather"))
@@ -0,0 +1,60 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from dispatch import dispatch_stacks
+from main import StackParameters, generate_lut
+from models.electrolyser import ElectrolyserModel
+
+STACK = StackParameters()
+RATED_W = generate_lut(STACK)["P"].max()
+
+
+def test_power_is_allocated_within_stack_limits():
+    rng = np.random.default_rng(0)
+    power = rng.uniform(0, 4.5 * RATED_W, 1_000)
+    stacks = [STACK, STACK, StackParameters(n_cells=20)]
+
+    result = dispatch_stacks(power, np.full(1_000, 1 / 12), stacks, min_load_fraction=0.2)
+
+    allocated = result["power_w"]
+    rated = np.array([RATED_W, RATED_W, generate_lut(stacks[2])["P"].max()])
+    running = allocated > 0
+    assert np.all(allocated <= rated * (1 + 1e-9))
+    assert np.all(allocated[running] >= (0.2 * rated * (1 - 1e-9) * running)[running])
+    np.testing.assert_allclose(allocated.sum(axis=1) + result["curtailed_w"], power)
+    assert np.all(result["curtailed_w"] >= -1e-6)
+    assert np.all((result["h2_kg_h"] > 0) == running)
+
+
+def test_supply_below_min_load_or_above_rating_is_curtailed():
+    power = np.array([0.05 * RATED_W, 5 * RATED_W])
+
+    result = dispatch_stacks(power, [1.0, 1.0], [STACK] * 3)
+
+    assert result["power_w"][0].sum() == 0.0
+    assert result["curtailed_w"][0] == pytest.approx(0.05 * RATED_W)
+    np.testing.assert_allclose(result["power_w"][1], RATED_W)
+    assert result["curtailed_w"][1] == pytest.approx(2 * RATED_W)
+
+
+def test_priority_rotates_between_stacks():
+    # room for a single stack only: the running stack cycles with the rotation
+    power = np.full(6, 0.15 * RATED_W)
+
+    result = dispatch_stacks(power, np.ones(6), [STACK] * 3, rotation_hours=2.0)
+
+    running = np.argmax(result["power_w"] > 0, axis=1)
+    assert running.tolist() == [0, 0, 1, 1, 2, 2]
+
+
+def test_split_makes_as_much_hydrogen_as_brute_force():
+    model = ElectrolyserModel(generate_lut(STACK), min_power_w=0.1 * RATED_W)
+    splits = np.array(list(itertools.product(np.linspace(0, 1, 41), repeat=3))) * RATED_W
+    h2 = model.interpolate(splits)["H2"].sum(axis=1)
+
+    for supply in [0.3 * RATED_W, 1.2 * RATED_W, 2.5 * RATED_W]:
+        result = dispatch_stacks([supply], [1.0], [STACK] * 3)
+        best = h2[splits.sum(axis=1) <= supply].max()
+        assert result["h2_kg_h"].sum() >= best * (1 - 1e-9)
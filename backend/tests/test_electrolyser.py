@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import lut_cache
+from lut_cache import load_lut_2d
+from main import StackParameters, generate_lut, generate_lut_2d, reversible_voltage
+from models.electrolyser import ElectrolyserModel, ThermalElectrolyserModel
+
+
+@pytest.fixture(scope="module")
+def lut() -> pd.DataFrame:
+    return generate_lut()
+
+
+@pytest.fixture(scope="module")
+def model(lut) -> ElectrolyserModel:
+    return ElectrolyserModel(lut)
+
+
+def test_lut_points_are_reproduced(lut, model):
+    result = model.evaluate(lut["P"])
+    np.testing.assert_allclose(result["I"], lut["I"], rtol=1e-9)
+    np.testing.assert_allclose(result["H2"], lut["H2"], rtol=1e-9)
+
+
+def test_power_between_lut_points_is_interpolated(lut, model):
+    power = (lut["P"].iloc[100] + lut["P"].iloc[101]) / 2
+    current = model.interpolate(power)["I"]
+    assert lut["I"].iloc[100] < current < lut["I"].iloc[101]
+
+
+def test_power_outside_load_range_is_clipped(model):
+    result = model.interpolate(np.array([0.0, model.max_power_w * 10]))
+    assert result["I"][0] == 0.0
+    assert result["H2"][0] == 0.0
+    assert result["P"][1] == pytest.approx(model.max_power_w)
+
+
+def test_min_power_switches_stack_off(lut):
+    min_power = lut["P"].iloc[500]
+    model = ElectrolyserModel(lut, min_power_w=min_power)
+    result = model.interpolate([min_power * 0.99, min_power])
+    assert result["I"][0] == 0.0
+    assert result["I"][1] == pytest.approx(lut["I"].iloc[500])
+
+
+def test_series_index_is_preserved(model):
+    power = pd.Series([1_000.0, 2_000.0], index=pd.Index([10, 20]))
+    result = model.evaluate(power)
+    assert list(result.index) == [10, 20]
+    assert list(result.columns) == ["I", "V_stack", "P", "H2", "Heat"]
+
+
+def test_reversible_voltage_matches_reference_points():
+    assert reversible_voltage(298.15) == pytest.approx(1.229, abs=2e-3)
+    assert reversible_voltage(353) == pytest.approx(1.18, abs=5e-3)
+
+
+def test_lut_2d_row_matches_isothermal_lut():
+    lut_2d = generate_lut_2d(temperatures_k=[300.0, 330.0, 353.0])
+    lut = generate_lut(temperature_k=330.0)
+    np.testing.assert_allclose(lut_2d["V_stack"][1], lut["V_stack"])
+    assert lut_2d["P"].shape == (3, len(lut))
+
+
+def test_thermal_model_interpolates_between_grid_points():
+    lut_2d = generate_lut_2d(temperatures_k=[300.0, 340.0])
+    model = ThermalElectrolyserModel(lut_2d)
+    v_low = generate_lut(temperature_k=300.0)["V_stack"].iloc[1000]
+    v_high = generate_lut(temperature_k=340.0)["V_stack"].iloc[1000]
+    current = lut_2d["I"][1000]
+    result = model.interpolate(current, 320.0)
+    assert result["V_stack"] == pytest.approx((v_low + v_high) / 2)
+
+
+def test_thermal_model_inverts_power_per_temperature():
+    temperatures = [290.0, 320.0, 353.0]
+    model = ThermalElectrolyserModel(generate_lut_2d(temperatures_k=temperatures))
+    for temperature in temperatures:
+        lut = generate_lut(temperature_k=temperature)
+        result = model.operating_point(lut["P"].to_numpy()[::50], temperature)
+        np.testing.assert_allclose(result["I"], lut["I"].to_numpy()[::50], rtol=1e-9)
+
+
+def test_thermal_model_idles_below_min_power():
+    model = ThermalElectrolyserModel(generate_lut_2d(), min_power_w=5_000.0)
+    result = model.operating_point([4_000.0, 6_000.0], [330.0, 330.0])
+    assert result["H2"][0] == 0.0
+    assert result["H2"][1] > 0.0
+
+
+def test_lut_cache_is_built_once_and_memory_mapped(tmp_path, monkeypatch):
+    first = load_lut_2d(cache_dir=tmp_path)
+    assert isinstance(first["P"], np.memmap)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("LUT rebuilt despite cache")
+
+    monkeypatch.setattr(lut_cache, "generate_lut_2d", fail)
+    second = load_lut_2d(cache_dir=tmp_path)
+    np.testing.assert_array_equal(first["P"], second["P"])
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_lut_cache_key_depends_on_parameters():
+    key = lut_cache.lut_cache_key(StackParameters(), [300.0])
+    assert key != lut_cache.lut_cache_key(StackParameters(n_cells=20), [300.0])
+
+
+def test_incomplete_lut_cache_entry_is_replaced(tmp_path, monkeypatch):
+    lut_dir = tmp_path / lut_cache.lut_cache_key(StackParameters(), lut_cache.TEMPERATURES)
+    lut_dir.mkdir()
+    np.save(lut_dir / "P.npy", np.zeros(3))  # the other arrays are missing
+
+    lut = load_lut_2d(cache_dir=tmp_path)
+
+    arrays = sorted(f"{name}.npy" for name in lut_cache.LUT_ARRAYS)
+    assert sorted(path.name for path in lut_dir.iterdir()) == arrays
+    assert lut["P"].shape == lut["H2"].shape
+    assert [path.name for path in tmp_path.iterdir()] == [lut_dir.name]
+
+
+def test_lut_cache_key_depends_on_the_arrays(monkeypatch):
+    key = lut_cache.lut_cache_key(StackParameters(), [300.0])
+    monkeypatch.setattr(lut_cache, "LUT_ARRAYS", (*lut_cache.LUT_ARRAYS, "efficiency"))
+    assert key != lut_cache.lut_cache_key(StackParameters(), [300.0])
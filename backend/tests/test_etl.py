@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+from prefect import flow
+from prefect.flow_engine import run_flow_in_subprocess
+from sqlalchemy import create_engine, select
+
+from config import settings
+from db_models.simulation import Simulation
+from db_models.weather import Weather
+from etl import deployments, load_weather_frames, transform_weather_data
+from metrics import multiprocess_registry, share_metrics_with_children
+from simulation import SIMULATION_COLUMNS
+
+
+def weather(site: str, wind_speed_m_s: float) -> Weather:
+    return Weather(
+        site=site,
+        timestamp=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        temperature_k=280.0,
+        pressure_pa=101_300.0,
+        humidity_percent=80.0,
+        dew_point_k=276.0,
+        wind_speed_m_s=wind_speed_m_s,
+        wind_deg=270,
+    )
+
+
+def test_transform_simulates_every_weather_row():
+    weather_frame, simulation = transform_weather_data.fn([weather("a", 0.0), weather("b", 12.0)])
+
+    assert list(simulation.columns) == ["site", "timestamp", *SIMULATION_COLUMNS]
+    assert simulation["timestamp"].dt.tz is None
+    assert (simulation["site"] == weather_frame["site"]).all()
+    calm, windy = simulation.to_dict("records")
+    assert calm["h2_kg_h"] == 0.0
+    assert windy["h2_kg_h"] > 0.0
+    assert 0.0 < windy["efficiency"] < 1.0
+
+
+def test_simulation_rows_are_loaded_with_their_weather(engine):
+    weather_frame, simulation = transform_weather_data.fn([weather("a", 8.0), weather("b", 12.0)])
+
+    weather_result, simulation_result = load_weather_frames(engine, weather_frame, simulation)
+    assert weather_result.inserted == simulation_result.inserted == 2
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(Weather.wind_speed_m_s, Simulation.turbine_power_w)
+            .join(
+                Simulation,
+                (Simulation.site == Weather.site) & (Simulation.timestamp == Weather.timestamp),
+            )
+            .order_by(Weather.site)
+        ).all()
+    assert [row.wind_speed_m_s for row in rows] == [8.0, 12.0]
+    assert rows[0].turbine_power_w < rows[1].turbine_power_w
+    pd.testing.assert_series_equal(
+        pd.Series([row.turbine_power_w for row in rows]),
+        simulation["turbine_power_w"],
+        check_names=False,
+    )
+
+
+@flow
+def load_weather_flow(database_url: str, records: list[Weather]) -> None:
+    weather_frame, simulation = transform_weather_data(records)
+    load_weather_frames(create_engine(database_url), weather_frame, simulation)
+
+
+def test_metrics_of_served_flow_runs_reach_the_exporter(engine, tmp_path, monkeypatch):
+    # flow runs of a served deployment execute in spawned subprocesses
+    monkeypatch.setattr(settings, "METRICS_MULTIPROC_DIR", str(tmp_path / "metrics"))
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    directory = share_metrics_with_children()
+
+    process = run_flow_in_subprocess(
+        load_weather_flow,
+        parameters={"database_url": str(engine.url), "records": [weather("a", 8.0), weather("b", 12.0)]},
+    )
+    process.join(timeout=120)
+
+    assert process.exitcode == 0
+    registry = multiprocess_registry(directory)
+    assert registry.get_sample_value("etl_rows_total", {"table": "weather", "result": "inserted"}) == 2
+    assert registry.get_sample_value("etl_task_duration_seconds_count", {"task": "transform"}) == 1
+
+
+def test_the_compaction_is_served_daily_next_to_the_etl():
+    schedules = {
+        deployment.name: [schedule.schedule.cron for schedule in deployment.schedules]
+        for deployment in deployments()
+    }
+
+    assert schedules == {
+        "etl-weather-data": [f"*/{settings.WEATHER_UPDATE_INTERVAL_MINUTES} * * * *"],
+        "compact-weather-data": [settings.ARCHIVE_CRON],
+    }
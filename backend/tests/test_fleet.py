@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from clients.fleet import TokenBucket, fetch_fleet_weather
+from clients.openweather import OpenWeatherClient
+from sites import Site, load_sites
+
+CURRENT = {
+    "dt": 1_767_225_600,
+    "temp": 280.0,
+    "pressure": 1013,
+    "humidity": 80,
+    "dew_point": 276.0,
+    "wind_speed": 6.5,
+    "wind_deg": 270,
+}
+
+
+def make_sites(n: int) -> list[Site]:
+    return [Site(name=f"site-{i}", latitude=50 + i / 100, longitude=10.0) for i in range(n)]
+
+
+def run_fleet(handler, sites, **kwargs):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            client = OpenWeatherClient(api_key="key", api_uri="https://api.test/onecall")
+            return await fetch_fleet_weather(
+                client, sites, http_client, calls_per_minute=60_000, backoff_s=0.001, **kwargs
+            )
+
+    return asyncio.run(run())
+
+
+def test_all_sites_are_fetched_concurrently():
+    in_flight, peak = 0, 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"current": CURRENT})
+
+    responses, errors = run_fleet(handler, make_sites(50), max_concurrency=8)
+
+    assert len(responses) == 50
+    assert not errors
+    assert 1 < peak <= 8
+
+
+def test_rate_limited_site_is_retried():
+    calls = {}
+
+    def handler(request):
+        lat = request.url.params["lat"]
+        calls[lat] = calls.get(lat, 0) + 1
+        if calls[lat] == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"current": CURRENT})
+
+    responses, errors = run_fleet(handler, make_sites(3), max_retries=2)
+
+    assert len(responses) == 3
+    assert set(calls.values()) == {2}
+
+
+def test_failing_site_does_not_fail_the_fleet():
+    def handler(request):
+        if request.url.params["lat"] == "50.0":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"current": CURRENT})
+
+    responses, errors = run_fleet(handler, make_sites(3), max_retries=3)
+
+    assert set(responses) == {"site-1", "site-2"}
+    assert isinstance(errors["site-0"], httpx.HTTPStatusError)
+
+
+def test_token_bucket_limits_the_call_rate():
+    async def run():
+        bucket = TokenBucket(rate=100, capacity=1)
+        start = time.monotonic()
+        for _ in range(11):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) == pytest.approx(0.1, abs=0.05)
+
+
+def test_site_registry_from_csv(tmp_path):
+    path = tmp_path / "sites.csv"
+    path.write_text("name,latitude,longitude\nnorth,54.1,9.2\nsouth,48.0,11.5\n")
+    assert [site.name for site in load_sites(str(path))] == ["north", "south"]
+
+
+def test_site_registry_rejects_duplicate_names(tmp_path):
+    path = tmp_path / "sites.json"
+    path.write_text('[{"name": "a", "latitude": 1, "longitude": 2}, {"name": "a", "latitude": 3, "longitude": 4}]')
+    with pytest.raises(ValueError):
+        load_sites(str(path))
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+import api
+from clients.openweather import OpenWeatherClient, parse_forecast
+from config import settings
+from db_models.forecast import WeatherForecast
+from forecast import (
+    forecast_frame,
+    load_forecast_frame,
+    project_forecast,
+    projection_totals,
+    prune_forecasts,
+)
+from simulation import simulate_weather_frame
+
+ISSUED = 1_767_225_600  # 2026-01-01 00:00 UTC
+CURRENT = {
+    "dt": ISSUED + 600,
+    "temp": 280.0,
+    "pressure": 1013,
+    "humidity": 80,
+    "dew_point": 276.0,
+    "wind_speed": 6.5,
+    "wind_deg": 270,
+}
+HOURLY = [dict(CURRENT, dt=ISSUED + 3600 * i, wind_speed=4.0 + i / 4) for i in range(48)]
+HOURLY[5]["wind_gust"] = 12.0
+DAILY = [
+    dict(CURRENT, dt=ISSUED + 86400 * i + 43200, temp={"day": 282.0, "min": 276.0})
+    for i in range(8)
+]
+PAYLOAD = {"current": CURRENT, "hourly": HOURLY, "daily": DAILY}
+
+
+@pytest.fixture
+def response(tmp_path):
+    client = OpenWeatherClient(
+        api_key="key",
+        api_uri="https://api.test/onecall",
+        cache_path=str(tmp_path / "cache.db"),
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=PAYLOAD)),
+    )
+    yield client.fetch_current_weather_sync(50.0, 10.0)
+    client.close()
+
+
+def test_forecast_arrays_are_parsed(response):
+    forecast = parse_forecast(response)
+
+    hourly = forecast[forecast["resolution"] == "hourly"]
+    daily = forecast[forecast["resolution"] == "daily"]
+    assert (len(hourly), len(daily)) == (48, 8)
+    assert (forecast["issued_at"] == datetime(2026, 1, 1, 0, 10)).all()
+    assert hourly["target_time"].iloc[1] == datetime(2026, 1, 1, 1)
+    assert (forecast["pressure_pa"] == 101_300.0).all()
+    assert (daily["temperature_k"] == 282.0).all()
+    assert hourly["wind_gust_m_s"].notna().sum() == 1
+
+
+def test_forecast_is_stored_once_per_issue(engine, response):
+    forecast = forecast_frame({"a": response, "b": response})
+
+    first = load_forecast_frame(engine, forecast)
+    second = load_forecast_frame(engine, forecast)
+
+    assert (first.inserted, first.updated) == (112, 0)
+    assert (second.inserted, second.updated) == (0, 112)
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(WeatherForecast)).scalar() == 112
+
+
+def test_only_the_latest_issue_of_each_hour_is_kept(engine, response, monkeypatch):
+    monkeypatch.setattr(settings, "FORECAST_RETENTION_DAYS", 7)
+    forecast = forecast_frame({"a": response, "b": response})
+    issued = forecast["issued_at"].iloc[0]  # 00:10
+    for minutes in (0, 5, 40, 55):  # 00:10 to 01:05
+        load_forecast_frame(engine, forecast.assign(issued_at=issued + timedelta(minutes=minutes)))
+    load_forecast_frame(engine, forecast[forecast["site"] == "b"].assign(issued_at=issued - timedelta(days=8)))
+
+    deleted = prune_forecasts(engine, now=issued + timedelta(hours=1))
+
+    assert deleted == 56 + 2 * 2 * 56
+    with engine.connect() as conn:
+        kept = conn.execute(
+            select(WeatherForecast.site, WeatherForecast.issued_at, func.count())
+            .group_by(WeatherForecast.site, WeatherForecast.issued_at)
+        ).all()
+    assert sorted(kept) == [
+        (site, issued + timedelta(minutes=minutes), 56) for site in "ab" for minutes in (40, 55)
+    ]
+
+
+def test_pruning_after_a_load_checks_only_its_sites_and_hour(engine, response):
+    forecast = forecast_frame({"a": response, "b": response})
+    issued = forecast["issued_at"].iloc[0]  # 00:10
+    for minutes in (0, 5, 60, 65):  # two issues in each of two hours
+        load_forecast_frame(engine, forecast.assign(issued_at=issued + timedelta(minutes=minutes)))
+
+    deleted = prune_forecasts(engine, now=issued, sites=["a"], since=issued + timedelta(minutes=65))
+
+    assert deleted == 56  # the 01:10 issue of site a
+    with engine.connect() as conn:
+        kept = conn.execute(
+            select(WeatherForecast.site, WeatherForecast.issued_at).distinct()
+        ).all()
+    assert len(kept) == 7
+
+
+def test_projection_covers_the_next_hours(response):
+    forecast = forecast_frame({"a": response})
+
+    projection = project_forecast(forecast, horizon_hours=24)
+
+    # the hour in progress at the issue time and the 23 after it
+    assert len(projection) == 24
+    assert projection["target_time"].iloc[0] == datetime(2026, 1, 1)
+    hourly = forecast[forecast["resolution"] == "hourly"].head(24)
+    expected = simulate_weather_frame(hourly)["h2_kg_h"].to_numpy()
+    assert projection["h2_kg_h"].to_numpy() == pytest.approx(expected)
+
+    (totals,) = projection_totals(projection).to_dict("records")
+    assert totals["hours"] == 24
+    assert totals["h2_kg"] == pytest.approx(expected.sum())
+
+
+def test_forecast_endpoint_projects_latest_issue(engine, response, monkeypatch):
+    monkeypatch.setattr(api, "get_read_engine", lambda: engine)
+    older = forecast_frame({"default": response})
+    older["issued_at"] -= timedelta(hours=1)
+    load_forecast_frame(engine, older)
+    load_forecast_frame(engine, forecast_frame({"default": response}))
+
+    with TestClient(api.app) as client:
+        body = client.get("/forecast/", params={"horizon_hours": 12}).json()
+        missing = client.get("/forecast/", params={"site": "nowhere"}).json()
+
+    assert len(body["hours"]) == 12
+    assert {row["issued_at"] for row in body["hours"]} == {"2026-01-01T00:10:00"}
+    assert body["totals"]["h2_kg"] == pytest.approx(sum(row["h2_kg_h"] for row in body["hours"]))
+    assert missing == {"totals": None, "hours": []}
@@ -0,0 +1,112 @@
+import asyncio
+import sqlite3
+
+import httpx
+
+from clients.openweather import OpenWeatherClient
+
+CURRENT = {
+    "dt": 1_767_225_600,
+    "temp": 280.0,
+    "pressure": 1013,
+    "humidity": 80,
+    "dew_point": 276.0,
+    "wind_speed": 6.5,
+    "wind_deg": 270,
+}
+
+
+def counting_transport(calls: list, status: int = 200) -> httpx.MockTransport:
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(status, json={"current": CURRENT})
+
+    return httpx.MockTransport(handler)
+
+
+def make_client(tmp_path, transport) -> OpenWeatherClient:
+    return OpenWeatherClient(
+        api_key="key",
+        api_uri="https://api.test/onecall",
+        cache_path=str(tmp_path / "cache.db"),
+        transport=transport,
+        async_transport=transport,
+    )
+
+
+def test_repeated_call_is_served_from_cache(tmp_path):
+    calls = []
+    client = make_client(tmp_path, counting_transport(calls))
+
+    first = client.fetch_current_weather_sync(50.0, 10.0)
+    second = client.fetch_current_weather_sync(50.0, 10.0)
+    client.fetch_current_weather_sync(51.0, 10.0)
+    client.close()
+
+    assert first == second
+    assert len(calls) == 2
+    assert (client.cache_stats.hits, client.cache_stats.misses) == (1, 2)
+
+
+def test_cache_persists_across_clients_and_event_loops(tmp_path):
+    calls = []
+    transport = counting_transport(calls)
+
+    async def fetch(client):
+        return await client.fetch_current_weather(50.0, 10.0)
+
+    first = make_client(tmp_path, transport)
+    asyncio.run(fetch(first))
+    asyncio.run(fetch(first))  # new event loop, new async client, same cache
+    second = make_client(tmp_path, transport)
+    asyncio.run(fetch(second))
+
+    assert len(calls) == 1
+    assert first.cache_stats.hits == 1
+    assert second.cache_stats.hits == 1
+
+
+def test_async_client_is_closed_with_its_event_loop(tmp_path):
+    client = make_client(tmp_path, counting_transport([]))
+
+    async def fetch() -> httpx.AsyncClient:
+        await client.fetch_current_weather(50.0, 10.0)
+        assert not client.async_http_client.is_closed
+        return client.async_http_client
+
+    first = asyncio.run(fetch())
+    second = asyncio.run(fetch())
+
+    assert first is not second
+    assert first.is_closed and second.is_closed
+    assert first._transport.storage.connection is None  # the cache database is closed too
+
+
+def test_errors_are_not_cached(tmp_path):
+    calls = []
+    client = make_client(tmp_path, counting_transport(calls, status=503))
+
+    for _ in range(2):
+        try:
+            client.fetch_current_weather_sync(50.0, 10.0)
+        except httpx.HTTPStatusError:
+            pass
+
+    assert len(calls) == 2
+
+
+def test_cache_keeps_at_most_max_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr("clients.openweather.settings.HTTP_CACHE_MAX_ENTRIES", 3)
+    calls = []
+    client = make_client(tmp_path, counting_transport(calls))
+
+    for i in range(5):
+        client.fetch_current_weather_sync(50.0 + i, 10.0)
+    client.fetch_current_weather_sync(50.0, 10.0)  # evicted, fetched again
+    client.fetch_current_weather_sync(54.0, 10.0)  # most recent, still cached
+    client.close()
+
+    with sqlite3.connect(tmp_path / "cache.db") as conn:
+        (entries,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+    assert entries == 3
+    assert len(calls) == 6
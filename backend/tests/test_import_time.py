@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# modules imported by the API and the dashboard's data paths, with the most
+# their import may cost relative to `import fastapi, sqlalchemy` in the same
+# interpreter; measured at about 1.6, 1.1, 0.2 and 0.3
+IMPORT_BUDGET_RATIOS = {
+    "api": 3.0,
+    "database": 2.0,
+    "db_models.weather": 0.75,
+    "clients.openweather": 1.0,
+}
+LIGHT_MODULES = tuple(IMPORT_BUDGET_RATIOS)
+# imported by the flows only, costs about a second on its own
+DEFERRED_MODULES = ("prefect", "prefect_sqlalchemy")
+
+
+def run_in_src(
+    code: str, database_url: str = "sqlite+pysqlite:///:memory:", options: tuple[str, ...] = ()
+) -> subprocess.CompletedProcess:
+    """`code` run by a fresh interpreter, so nothing is imported yet."""
+    env = {**os.environ, "DATABASE_URL": database_url}
+    command = [sys.executable, *options, "-c", code]
+    return subprocess.run(command, cwd=SRC, env=env, capture_output=True, text=True, check=True)
+
+
+def cumulative_import_times(code: str) -> dict[str, float]:
+    """Cumulative seconds of every module imported by `code`, from `-X importtime`."""
+    times = {}
+    for line in run_in_src(code, options=("-X", "importtime")).stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, name = line.removeprefix("import time:").split("|")
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+# Absolute times vary with the machine and its load, which slows the
+# frameworks as much as the modules; so the budgets are relative to them.
+@pytest.mark.parametrize(("module", "ratio"), IMPORT_BUDGET_RATIOS.items())
+def test_import_time_stays_within_budget(module, ratio):
+    times = cumulative_import_times(f"import fastapi, sqlalchemy; import {module}")
+
+    assert times[module] < ratio * (times["fastapi"] + times["sqlalchemy"])
+
+
+@pytest.mark.parametrize("module", LIGHT_MODULES)
+def test_import_defers_the_flow_modules(module):
+    code = f"import sys, {module}; print(' '.join(sorted(sys.modules)))"
+    imported = run_in_src(code).stdout.split()
+
+    assert not [name for name in DEFERRED_MODULES if name in imported]
+
+
+def test_import_does_not_connect(tmp_path):
+    database = tmp_path / "test.db"
+    code = (
+        "import api, database; "
+        "print(database.get_engine.cache_info().currsize + "
+        "database.get_read_engine.cache_info().currsize)"
+    )
+    assert run_in_src(code, f"sqlite+pysqlite:///{database}").stdout.strip() == "0"
+    assert not database.exists()  # nor created the schema
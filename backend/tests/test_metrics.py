@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from prometheus_client import CollectorRegistry, Histogram
+
+from config import settings
+from metrics import multiprocess_registry, span, timed
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def test_spans_are_traced_only_when_enabled(tmp_path, monkeypatch):
+    trace_file = tmp_path / "trace.jsonl"
+    with span("untraced"):
+        pass
+
+    monkeypatch.setattr(settings, "TRACE_FILE", str(trace_file))
+    with span("parent", site="a"):
+        with span("child") as attributes:
+            attributes["rows"] = 3
+
+    child, parent = (json.loads(line) for line in trace_file.read_text().splitlines())
+    assert (parent["name"], parent["parent_id"], parent["attributes"]) == ("parent", None, {"site": "a"})
+    assert child["parent_id"] == parent["span_id"]
+    assert child["trace_id"] == parent["trace_id"]
+    assert child["attributes"] == {"rows": 3}
+    assert 0 <= child["duration_s"] <= parent["duration_s"]
+
+
+def test_timed_blocks_are_observed_even_when_they_fail():
+    registry = CollectorRegistry()
+    histogram = Histogram("test_seconds", "test", ["task"], registry=registry)
+    try:
+        with timed(histogram, "failing", task="load"):
+            raise ValueError
+    except ValueError:
+        pass
+
+    assert registry.get_sample_value("test_seconds_count", {"task": "load"}) == 1
+
+
+def test_metric_files_of_exited_processes_are_merged(tmp_path):
+    registry = multiprocess_registry(str(tmp_path))
+    code = (
+        "import metrics; "
+        "metrics.ETL_ROWS.labels(table='weather', result='inserted').inc(2); "
+        "metrics.ETL_TASK_SECONDS.labels(task='load').observe(0.5)"
+    )
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+
+    for run in range(1, 4):
+        subprocess.run([sys.executable, "-c", code], cwd=SRC, env=env, check=True)
+        labels = {"table": "weather", "result": "inserted"}
+        assert registry.get_sample_value("etl_rows_total", labels) == 2 * run
+        assert registry.get_sample_value("etl_task_duration_seconds_count", {"task": "load"}) == run
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "counter_merged.db",
+            "histogram_merged.db",
+        ]
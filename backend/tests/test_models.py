@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.air import AirState, calc_humid_air_density, weather_air_density
+from models.wind import WindTurbineModel, fleet_power_output_watts
+
+
+def test_air_density_scalar_returns_float():
+    density = calc_humid_air_density(15.0, 101_325.0, 0.0)
+    assert isinstance(density, float)
+    assert density == pytest.approx(1.225, abs=1e-3)
+
+
+def test_air_density_array_matches_scalar_path():
+    temperature_c = pd.Series([-10.0, 0.0, 15.0, 30.0])
+    pressure_pa = np.array([99_000.0, 100_000.0, 101_325.0, 102_000.0])
+    density = calc_humid_air_density(temperature_c, pressure_pa, 0.5)
+    expected = [
+        AirState(temperature_c=t, pressure_pa=p, relative_humidity=0.5).density_kg_m3
+        for t, p in zip(temperature_c, pressure_pa)
+    ]
+    np.testing.assert_allclose(density, expected)
+
+
+def test_weather_air_density_converts_units():
+    density = weather_air_density([288.15], [101_325.0], [50.0])
+    assert density[0] == pytest.approx(calc_humid_air_density(15.0, 101_325.0, 0.5))
+
+
+def test_fleet_power_broadcasts_samples_over_turbines():
+    turbines = [
+        WindTurbineModel(rotor_diameter_m=20, power_coefficient=0.3),
+        WindTurbineModel(rotor_diameter_m=40, power_coefficient=0.45),
+    ]
+    wind_speed = np.array([0.0, 5.0, 10.0])
+    density = np.array([1.2, 1.25, 1.3])
+
+    power = fleet_power_output_watts(turbines, wind_speed, density)
+
+    assert power.shape == (3, 2)
+    for m, turbine in enumerate(turbines):
+        expected = [turbine.power_output_watts(v, rho) for v, rho in zip(wind_speed, density)]
+        np.testing.assert_allclose(power[:, m], expected)
+
+
+def test_fleet_power_of_a_scalar_sample_has_one_value_per_turbine():
+    turbines = [
+        WindTurbineModel(rotor_diameter_m=20, power_coefficient=0.3),
+        WindTurbineModel(rotor_diameter_m=40, power_coefficient=0.45),
+    ]
+
+    power = fleet_power_output_watts(turbines, 8.0)
+
+    np.testing.assert_allclose(power, [turbine.power_output_watts(8.0) for turbine in turbines])
+    assert fleet_power_output_watts(turbines, 8.0, [1.2, 1.3]).shape == (2, 2)
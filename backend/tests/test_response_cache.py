@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from response_cache import CachedResponse, DataVersion, ResponseCache, is_not_modified
+
+V1 = DataVersion(datetime(2026, 1, 1), 10)
+V2 = DataVersion(datetime(2026, 1, 1, 0, 5), 11)
+
+
+def body(size: int) -> CachedResponse:
+    return CachedResponse(b"x" * size, {})
+
+
+def test_least_recently_used_bodies_are_evicted_past_the_byte_bound():
+    cache = ResponseCache(max_bytes=100)
+    cache.put("a", V1, body(40))
+    cache.put("b", V1, body(40))
+    assert cache.get("a", V1) is not None  # now b is the least recently used
+    cache.put("c", V1, body(40))
+    cache.put("huge", V1, body(101))
+
+    assert cache.get("b", V1) is None and cache.get("huge", V1) is None
+    assert cache.get("a", V1) is not None and cache.get("c", V1) is not None
+    assert cache.size == 80
+
+
+def test_a_body_is_only_served_at_its_version():
+    cache = ResponseCache(max_bytes=100)
+    cache.put("a", V1, body(10))
+    cache.put("b", V2, body(10))  # another site, at its own version
+
+    assert cache.get("a", V1) is not None and cache.get("b", V2) is not None
+    assert cache.get("a", V2) is None
+    assert len(cache) == 1 and cache.size == 10
+
+
+def test_if_none_match_lists_and_weak_tags_match():
+    assert is_not_modified('"x", W/"abc"', '"abc"')
+    assert is_not_modified("*", '"abc"')
+    assert not is_not_modified('"x"', '"abc"') and not is_not_modified(None, '"abc"')
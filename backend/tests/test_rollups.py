@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import select
+
+from conftest import weather_frame
+from db_models.rollup import DailyWeatherRollup, HourlyWeatherRollup
+from db_models.weather import Weather
+from etl import load_weather_frames, simulate_weather_rows
+from rollups import MAX_SAMPLE_S, rebuild_rollups, refresh_rollups
+
+HOUR = datetime(2026, 1, 1, 23)
+
+
+def load(engine, weather: pd.DataFrame) -> None:
+    load_weather_frames(engine, weather, simulate_weather_rows(weather))
+
+
+def rollups(engine, model) -> list:
+    with engine.connect() as conn:
+        return conn.execute(select(model).order_by(model.site, model.bucket)).all()  # type: ignore[arg-type]
+
+
+def test_load_updates_the_touched_buckets(engine):
+    load(engine, weather_frame(range(0, 60, 5), start=HOUR))
+    (hour,) = rollups(engine, HourlyWeatherRollup)
+    assert (hour.bucket, hour.count) == (datetime(2026, 1, 1, 23), 12)
+
+    # rows of the next hour (and day) arrive, and one row of the first is corrected
+    load(engine, weather_frame(range(55, 75, 5), start=HOUR, wind_speed_m_s=4.0))
+    first, second = rollups(engine, HourlyWeatherRollup)
+    assert (first.count, first.wind_speed_m_s_min, first.wind_speed_m_s_max) == (12, 4.0, 10.0)
+    assert (second.bucket, second.count) == (datetime(2026, 1, 2), 3)
+    assert [day.count for day in rollups(engine, DailyWeatherRollup)] == [12, 3]
+
+
+def test_energy_integrates_over_the_covered_time(engine):
+    # one hour of 5-minute rows, and one more row after a gap of two hours
+    weather = weather_frame([*range(0, 60, 5), 180], start=HOUR)
+    simulation = simulate_weather_rows(weather)
+    load_weather_frames(engine, weather, simulation)
+
+    first, after_gap = rollups(engine, HourlyWeatherRollup)
+    # the last row of the hour stands for MAX_SAMPLE_S, not for the gap
+    hours = np.array([5 / 60] * 11 + [MAX_SAMPLE_S / 3600])
+    assert first.covered_hours == pytest.approx(hours.sum())
+    assert first.turbine_energy_wh == pytest.approx(simulation["turbine_power_w"][:12] @ hours)
+    assert first.h2_kg == pytest.approx(simulation["h2_kg_h"][:12] @ hours)
+    assert after_gap.covered_hours == pytest.approx(5 / 60)  # one polling interval
+
+    days = rollups(engine, DailyWeatherRollup)
+    hours_by_day = rollups(engine, HourlyWeatherRollup)
+    assert days[0].h2_kg == pytest.approx(first.h2_kg)  # a partial day is not scaled up
+    assert sum(day.h2_kg for day in days) == pytest.approx(sum(hour.h2_kg for hour in hours_by_day))
+
+
+def test_incremental_rollups_match_a_rebuild_across_buckets(engine):
+    # the 23:58 row stands for the time up to the next row, loaded later
+    load(engine, weather_frame([0, 5, 10, 58], start=HOUR))
+    load(engine, weather_frame([68], start=HOUR, wind_speed_m_s=4.0))
+    incremental = {model: rollups(engine, model) for model in (HourlyWeatherRollup, DailyWeatherRollup)}
+
+    rebuild_rollups(engine)
+
+    for model, rows in incremental.items():
+        rebuilt = rollups(engine, model)
+        assert [row.bucket for row in rows] == [row.bucket for row in rebuilt]
+        for row, expected in zip(rows, rebuilt):
+            assert row.covered_hours == pytest.approx(expected.covered_hours)
+            assert row.turbine_energy_wh == pytest.approx(expected.turbine_energy_wh)
+            assert row.h2_kg == pytest.approx(expected.h2_kg)
+    assert incremental[HourlyWeatherRollup][0].covered_hours == pytest.approx((5 + 5 + 15 + 10) / 60)
+
+
+def test_buckets_without_rows_are_deleted(engine):
+    load(engine, weather_frame(range(0, 75, 5), start=HOUR))
+    with engine.begin() as conn:
+        conn.execute(Weather.__table__.delete().where(Weather.timestamp >= datetime(2026, 1, 2)))  # type: ignore[attr-defined]
+        refresh_rollups(conn, [("default", datetime(2026, 1, 1, 23), datetime(2026, 1, 2, 0, 10))])
+
+    assert [hour.bucket for hour in rollups(engine, HourlyWeatherRollup)] == [datetime(2026, 1, 1, 23)]
+    assert [day.bucket for day in rollups(engine, DailyWeatherRollup)] == [datetime(2026, 1, 1)]
+
+
+def test_rebuild_replaces_stale_buckets(engine):
+    load(engine, weather_frame(range(0, 60, 5), start=HOUR))
+    load(engine, weather_frame(range(0, 60, 5), start=HOUR, site="north"))
+    with engine.begin() as conn:
+        conn.execute(HourlyWeatherRollup.__table__.delete())  # type: ignore[attr-defined]
+        conn.execute(
+            HourlyWeatherRollup.__table__.insert(),  # type: ignore[attr-defined]
+            {**stale_row(), "bucket": datetime(2020, 1, 1)},
+        )
+
+    written = rebuild_rollups(engine, site="default")
+
+    assert written == {"hourly": 1, "daily": 1}
+    assert [(row.site, row.bucket) for row in rollups(engine, HourlyWeatherRollup)] == [
+        ("default", datetime(2020, 1, 1)),  # outside the rebuilt range
+        ("default", datetime(2026, 1, 1, 23)),
+    ]
+
+
+def stale_row() -> dict:
+    stats = {
+        f"{name}_{stat}": 0.0
+        for name in (
+            "temperature_k",
+            "pressure_pa",
+            "humidity_percent",
+            "dew_point_k",
+            "wind_speed_m_s",
+            "wind_deg",
+        )
+        for stat in ("min", "mean", "max")
+    }
+    return {"site": "default", "count": 1, **stats}
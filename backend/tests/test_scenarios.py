@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from conftest import half_hourly_weather
+from etl import load_weather_frames, simulate_weather_rows
+from models.wind import BETZ_LIMIT
+from scenarios import (
+    HOURS_PER_YEAR,
+    METRICS,
+    ParameterSpread,
+    load_weather_history,
+    run_scenarios,
+    sample_scenarios,
+    summarize,
+)
+from simulation import simulate_weather_frame
+
+NO_SPREAD = ParameterSpread(power_coefficient=0, r_cell_ohm=0, a_tafel_v=0, j0_a_cm2=0)
+
+
+def test_baseline_scenario_matches_simulation(engine):
+    weather = half_hourly_weather(96, seed=1)
+    load_weather_frames(engine, weather, simulate_weather_rows(weather))
+
+    history = load_weather_history(engine)
+    results = run_scenarios(history, sample_scenarios(3, NO_SPREAD, seed=0), workers=1)
+
+    # half-hourly samples: every row stands for 0.5 h
+    simulation = simulate_weather_frame(weather)
+    h2_kg = simulation["h2_kg_h"].sum() * 0.5
+    energy_kwh = simulation["stack_power_w"].sum() * 0.5 / 1000
+    assert results["h2_kg_per_year"].to_numpy() == pytest.approx(h2_kg * HOURS_PER_YEAR / 48)
+    assert results["specific_energy_kwh_kg"].to_numpy() == pytest.approx(energy_kwh / h2_kg)
+    assert ((results["capacity_factor"] > 0) & (results["capacity_factor"] <= 1)).all()
+
+
+def test_sampling_is_seeded_and_bounded():
+    spread = ParameterSpread(power_coefficient=0.5, n_cells=0.3)
+    scenarios = sample_scenarios(500, spread, seed=7)
+
+    pd.testing.assert_frame_equal(scenarios, sample_scenarios(500, spread, seed=7))
+    assert scenarios["power_coefficient"].max() <= BETZ_LIMIT
+    assert (scenarios > 0).all().all()
+    assert (scenarios["n_cells"] == scenarios["n_cells"].round()).all()
+
+
+def test_worker_pool_matches_serial_run():
+    weather = half_hourly_weather(200, seed=1)
+    scenarios = sample_scenarios(20, seed=3)
+
+    serial = run_scenarios(weather, scenarios, workers=1)
+    pooled = run_scenarios(weather, scenarios, workers=2, chunk_size=6)
+
+    pd.testing.assert_frame_equal(serial, pooled)
+    summary = summarize(pooled)
+    assert list(summary.index) == ["p5", "p50", "p95"]
+    assert list(summary.columns) == METRICS
+    assert (summary.diff().iloc[1:] >= 0).all().all()
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sizing
+from conftest import half_hourly_weather
+from scenarios import HOURS_PER_YEAR
+from simulation import simulate_weather_frame
+from sizing import Design, SizingProblem, grid_search, pareto_front, refine
+
+
+def test_default_design_matches_simulation():
+    weather = half_hourly_weather(96, seed=2)
+    metrics = SizingProblem(weather).evaluate(
+        Design(rotor_diameter_m=40, n_cells=10, area_cm2=250)
+    )
+
+    simulation = simulate_weather_frame(weather)
+    h2_kg = simulation["h2_kg_h"].sum() * 0.5
+    stack_wh = simulation["stack_power_w"].sum() * 0.5
+    turbine_wh = simulation["turbine_power_w"].sum() * 0.5
+    assert metrics["h2_kg_per_year"] == pytest.approx(h2_kg * HOURS_PER_YEAR / 48)
+    assert metrics["curtailed_fraction"] == pytest.approx(1 - stack_wh / turbine_wh)
+
+
+def test_stack_sweep_reuses_turbine_series(monkeypatch):
+    calls = []
+    rotor_power_watts = sizing.rotor_power_watts
+    monkeypatch.setattr(
+        sizing,
+        "rotor_power_watts",
+        lambda *args: calls.append(args[2]) or rotor_power_watts(*args),
+    )
+    problem = SizingProblem(half_hourly_weather(48, seed=2))
+
+    designs = grid_search(problem, [30, 40], [5, 10, 20], [150, 250])
+
+    assert len(designs) == 12
+    assert len(calls) == 2
+    assert len(problem._electrolysers) == 6
+
+
+def test_refine_does_not_get_worse():
+    problem = SizingProblem(half_hourly_weather(96, seed=2))
+    start = Design(rotor_diameter_m=30, n_cells=10, area_cm2=250)
+
+    best, metrics = refine(problem, start, "capacity_factor")
+
+    assert metrics["capacity_factor"] >= problem.evaluate(start)["capacity_factor"]
+    assert 20 <= best.rotor_diameter_m <= 80
+    assert isinstance(best.n_cells, int)
+
+
+def test_pareto_front_drops_dominated_designs():
+    designs = pd.DataFrame(
+        {
+            "h2_kg_per_year": [10.0, 8.0, 12.0, 7.0, np.nan],
+            "curtailed_fraction": [0.2, 0.1, 0.3, 0.3, 0.0],
+        }
+    )
+
+    front = pareto_front(designs, {"h2_kg_per_year": "max", "curtailed_fraction": "min"})
+
+    assert front["h2_kg_per_year"].tolist() == [12.0, 10.0, 8.0]
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import thermal
+from main import V_TN, generate_lut_2d
+from models.electrolyser import ThermalElectrolyserModel
+from thermal import ThermalParameters, _affine_min_scan, simulate_stacks, simulate_weather_thermal
+
+N_CELLS = 10
+
+
+@pytest.fixture(scope="module")
+def model():
+    return ThermalElectrolyserModel(generate_lut_2d())
+
+
+def reference_loop(model, power, ambient, hours, params, temperature):
+    """One Python iteration per step, for comparison with the scan."""
+    temperature = np.array(temperature, dtype=float)
+    operating_hours = np.zeros_like(temperature)
+    temperatures = []
+    for p, t_amb, dt in zip(power, ambient, hours):
+        temperatures.append(temperature.copy())
+        point = model.operating_point(p, temperature)
+        running = point["I"] > 0
+        voltage = point["V_stack"] + N_CELLS * params.degradation_v_h * operating_hours
+        current = np.where(running, point["P"] / np.where(running, voltage, 1.0), 0.0)
+        heat = np.where(running, point["P"] - current * N_CELLS * V_TN, 0.0)
+        equilibrium = t_amb + heat / params.heat_loss_w_k
+        decay = np.exp(-dt * 3600 * params.heat_loss_w_k / params.heat_capacity_j_k)
+        temperature = np.minimum(
+            equilibrium + (temperature - equilibrium) * decay, params.max_temperature_k
+        )
+        operating_hours += running * dt
+    return np.array(temperatures)
+
+
+def test_scan_matches_sequential_composition():
+    rng = np.random.default_rng(0)
+    a, b, c = rng.uniform(0, 1, 37), rng.normal(0, 1, 37), rng.normal(1, 1, 37)
+
+    scan_a, scan_b, scan_c = _affine_min_scan(a, b, c)
+
+    x, expected = 0.3, []
+    for k in range(37):
+        x = min(a[k] * x + b[k], c[k])
+        expected.append(x)
+    np.testing.assert_allclose(np.minimum(scan_a * 0.3 + scan_b, scan_c), expected)
+
+
+def test_stacks_match_reference_loop(model, monkeypatch):
+    monkeypatch.setattr(thermal, "BLOCK_STEPS", 64)  # several blocks
+    rng = np.random.default_rng(1)
+    steps = 300
+    power = rng.uniform(0, 3_000, (steps, 2)) * [1.0, 0.3]
+    ambient = 280 + 5 * np.sin(np.arange(steps) / 20)
+    hours = np.full(steps, 1 / 12)
+    params = ThermalParameters(heat_capacity_j_k=2_000.0, heat_loss_w_k=10.0)
+
+    result = simulate_stacks(
+        model, power, ambient, hours, N_CELLS, params, tolerance_k=1e-6
+    )
+
+    expected = reference_loop(model, power, ambient, hours, params, [ambient[0]] * 2)
+    np.testing.assert_allclose(result["temperature_k"], expected, atol=1e-4)
+    assert result["temperature_k"].shape == (steps, 2)
+
+
+def test_cooling_caps_and_idle_stack_relaxes(model):
+    steps = 2_000
+    hours = np.full(steps, 1 / 12)
+    power = np.zeros((steps, 2))
+    power[:, 0] = 100_000.0
+    params = ThermalParameters(degradation_v_h=1e-3)
+
+    result = simulate_stacks(
+        model, power, 285.0, hours, N_CELLS, params, initial_temperature_k=[300.0, 330.0]
+    )
+
+    hot, idle = result["temperature_k"][:, 0], result["temperature_k"][:, 1]
+    assert hot.max() == pytest.approx(params.max_temperature_k)
+    assert idle[-1] == pytest.approx(285.0, abs=0.5)
+    assert np.all(np.diff(idle) <= 1e-9)
+    # ageing: same power, more voltage, less current and hydrogen
+    assert result["operating_hours"][-1, 0] == pytest.approx((steps - 1) / 12)
+    assert result["operating_hours"][-1, 1] == 0.0
+    assert result["cell_voltage_v"][-1, 0] > result["cell_voltage_v"][1, 0]
+    assert result["h2_kg_h"][-1, 0] < result["h2_kg_h"][1, 0]
+
+
+def test_weather_frame_simulation_keeps_index():
+    weather = pd.DataFrame(
+        {
+            "timestamp": [datetime(2026, 1, 1) + timedelta(minutes=5 * i) for i in range(50)],
+            "temperature_k": 275.0,
+            "pressure_pa": 101_300.0,
+            "humidity_percent": 80.0,
+            "wind_speed_m_s": np.linspace(0, 12, 50),
+        },
+        index=range(100, 150),
+    )
+
+    result = simulate_weather_thermal(weather)
+
+    assert result.index.equals(weather.index)
+    assert result["temperature_k"].iloc[0] == 275.0
+    assert result["temperature_k"].iloc[-1] > 275.0
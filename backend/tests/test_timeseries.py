@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from timeseries import Resampler, TrapezoidIntegrator, lttb
+
+
+def test_short_series_is_kept_whole():
+    assert list(lttb([0, 1, 2], [5, 6, 7], 10)) == [0, 1, 2]
+
+
+def test_endpoints_and_extremes_survive():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 50.0
+    y[7777] = -50.0
+
+    keep = lttb(x, y, 200)
+
+    assert len(keep) == 200
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert {4321, 7777} <= set(keep.tolist())
+
+
+def test_at_least_three_points_are_required():
+    with pytest.raises(ValueError):
+        lttb(np.arange(10), np.arange(10), 2)
+
+
+def resample_all(resampler, chunks):
+    pieces = [resampler.push(t, values) for t, values in chunks] + [resampler.finish()]
+    pieces = [piece for piece in pieces if len(piece[0])]
+    return tuple(np.concatenate(part) for part in zip(*pieces))
+
+
+def test_resampling_fills_short_gaps_and_flags_long_ones():
+    # samples at 0, 250, 250 (duplicate), 600 and, after a long gap, 1800 s
+    t = [0.0, 250.0, 250.0, 600.0, 1800.0]
+    y = [0.0, 99.0, 5.0, 12.0, 0.0]
+
+    grid, values, gap = resample_all(Resampler(100, max_gap_s=900), [(t, y)])
+
+    assert grid.tolist() == [100.0 * k for k in range(19)]
+    assert values[:7, 0] == pytest.approx([0, 2, 4, 6, 8, 10, 12])
+    assert np.isnan(values[7:18, 0]).all() and gap[7:18].all()
+    assert values[18, 0] == 0.0 and not gap[:7].any() and not gap[18]
+
+    _, previous, _ = resample_all(Resampler(100, "previous"), [(t, y)])
+    _, nearest, _ = resample_all(Resampler(100, "nearest"), [(t, y)])
+    assert previous[:7, 0].tolist() == [0, 0, 0, 5, 5, 5, 12]
+    assert nearest[:7, 0].tolist() == [0, 0, 5, 5, 5, 12, 12]
+
+
+def test_chunks_do_not_change_the_result():
+    rng = np.random.default_rng(3)
+    t = np.cumsum(rng.uniform(0, 700, 2000)).round()  # irregular, with duplicates
+    y = rng.uniform(0, 1000, (2000, 2))
+
+    whole = resample_all(Resampler(300, max_gap_s=900), [(t, y)])
+    cuts = np.sort(rng.choice(len(t), 40, replace=False))
+    chunks = [(t[a:b], y[a:b]) for a, b in zip(np.r_[0, cuts], np.r_[cuts, len(t)])]
+    chunked = resample_all(Resampler(300, max_gap_s=900), chunks)
+    for expected, actual in zip(whole, chunked):
+        np.testing.assert_array_equal(actual, expected)
+
+    grid, values, _ = whole
+    integrator = TrapezoidIntegrator(900)
+    cumulative = np.concatenate(
+        [integrator.push(grid[i : i + 97], values[i : i + 97]) for i in range(0, len(grid), 97)]
+    )
+    reference = TrapezoidIntegrator(900)
+    np.testing.assert_allclose(cumulative, reference.push(grid, values))
+    np.testing.assert_allclose(integrator.totals, cumulative[-1])
+    assert integrator.covered_s + integrator.gap_s == grid[-1] - grid[0]
+
+
+def test_trapezoid_integrates_rates_over_hours():
+    # 1 kW ramping to 3 kW over two hours, then a two-hour gap
+    integrator = TrapezoidIntegrator(max_gap_s=3600)
+    cumulative = integrator.push([0, 3600, 7200, 14400], [1000.0, 2000.0, 3000.0, 3000.0])
+
+    assert cumulative[:, 0].tolist() == [0.0, 1500.0, 4000.0, 4000.0]
+    assert integrator.covered_s == 7200 and integrator.gap_s == 7200
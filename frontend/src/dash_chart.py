@@ -1,26 +1,15 @@
-import os
-from itertools import compress
-from typing import TypedDict
-
 import dash
 from dash import dcc, html
-from dash.dependencies import Input, Output, State
+from dash.dependencies import Input, Output
 
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-from sqlalchemy import create_engine
-import pandas as pd
-
 from loguru import logger
 
+from weather_feed import Y_COLUMN_NAMES, WeatherWindow, register_event_stream, register_metrics
 
-UPDATE_INTERVAL_MS = int(os.getenv("DASH_UPDATE_INTERVAL_MS", 60_000))  
-DB_URL = os.getenv("DATABASE_URL")
-ENGINE = create_engine(DB_URL)
 
-UPDATE_COLUMN = "updated_at"
-X_COLUMN = "timestamp"
 Y_TITLES = {
     "temperature_k": "Temperature [K]",
     "pressure_pa": "Pressure [Pa]",
@@ -29,19 +18,6 @@ Y_TITLES = {
     # "wind_deg": "Wind Direction [deg]",
     # "wind_gust_m_s": "Wind Gust [m/s]",
 }
-Y_COLUMN_NAMES = list(Y_TITLES.keys())
-
-
-class WeatherDataStore(TypedDict):
-    id: list[int]
-    updated_at: list[str]
-    x: list[str]
-    y: list[list[float]]
-
-
-class ExtendDataDict(TypedDict):
-    x: list[list[str]]
-    y: list[list[float]]
 
 
 def create_empty_figure() -> go.Figure:
@@ -69,165 +45,82 @@ def create_empty_figure() -> go.Figure:
     return fig
 
 
-def fetch_weather_data(min_updated_at: str|None=None) -> pd.DataFrame:
-    """Fetches only records that have been updated since 'min_updated_at'.
-
-    If min_updated_at is None, fetches a default window (e.g., last 24h).
-    """
-    table_name = "weather"
-
-    cols_to_select = ["id", UPDATE_COLUMN, X_COLUMN] + Y_COLUMN_NAMES
-
-    if min_updated_at is not None:
-        where_clause = f"{UPDATE_COLUMN} > {min_updated_at}"
-        logger.debug(f"Incremental fetch: {where_clause}")
-    else:
-        logger.info("Initial load: Fetching last 24h of data")
-        where_clause = f"{X_COLUMN} >= datetime('now', '-1 day')"
-
-    query = f"""
-    SELECT {", ".join(cols_to_select)}
-    FROM {table_name}
-    WHERE {where_clause}
-    ORDER BY {X_COLUMN} ASC
-    """
-    try:
-        logger.debug(f"Executing SQL query:\n{query}")
-        df = pd.read_sql_query(query, ENGINE, parse_dates=[X_COLUMN, UPDATE_COLUMN])
-    except Exception as e:
-        logger.error(f"Database error: {e}")
-        return pd.DataFrame(columns=cols_to_select)
-    return df.drop_duplicates(subset=[X_COLUMN] + Y_COLUMN_NAMES)
-
-
-def append_to_store(current_store: WeatherDataStore, new_df: pd.DataFrame) -> WeatherDataStore:
-    """Append new DataFrame rows to existing data store."""
-    if new_df.empty:
-        return current_store
-    
-    def extend_list(key, values):
-        current_store[key].extend(values)
-
-    extend_list("id", new_df["id"].tolist())
-    extend_list(UPDATE_COLUMN, new_df[UPDATE_COLUMN].dt.isoformat().tolist())
-    extend_list(X_COLUMN, new_df[X_COLUMN].dt.isoformat().tolist())
-
-    # Append Y columns (list of lists)
-    for i, col in enumerate(Y_COLUMN_NAMES):
-        current_store["y"][i].extend(new_df[col].tolist())
-
-    return current_store
-
-
-def df_to_weather_data_store(df: pd.DataFrame) -> WeatherDataStore:
-    return {
-        "id": df["id"].tolist(),
-        "x": df[X_COLUMN].tolist(),
-        "y": [df[col].tolist() for col in Y_COLUMN_NAMES],
-    }
+def create_figure(window: WeatherWindow) -> go.Figure:
+    """Chart of the rows currently in the shared window."""
+    fig = create_empty_figure()
+    rows = window.rows_since(0)
+    x = [row.x for row in rows]
+    for i in range(len(Y_COLUMN_NAMES)):
+        fig.data[i].x = x
+        fig.data[i].y = [row.y[i] for row in rows]
+    return fig
 
 
 # --- DASH APP SETUP ---
 app = dash.Dash(__name__)
 
-# Initial empty state
-initial_store: WeatherDataStore = {
-    "id": [],
-    "updated_at": [],
-    "x": [],
-    "y": [[] for _ in Y_COLUMN_NAMES],
-}
+window = WeatherWindow()
+register_event_stream(app.server, window)
+register_metrics(app.server)
 
 logger.info("Dash app initialized for live weather monitoring.")
 
-app.layout = html.Div(
-    [
-        html.H2("Live Weather Monitoring", style={"textAlign": "center"}),
-        # The Graph Component
-        html.Div(
-            dcc.Graph(
-                id="live-weather-plot",
-                figure=create_empty_figure(),
-                style={"height": "80vh"},
-            ),
-        ),
-        dcc.Store(
-            id="weather-data-store",
-            data={"id": [], "x": [], "y": [[] for _ in Y_COLUMN_NAMES]},
-            # data=df_to_weather_data_store(fetch_weather_data(0)),
-        ),
-        # Interval Component: Fires every 5 minutes (300,000 milliseconds)
-        dcc.Interval(
-            id="interval-component", 
-            interval=UPDATE_INTERVAL_MS, 
-            n_intervals=0
-            ),
-    ]
-)
-
-
-# --- CALLBACK FOR UPDATES ---
-@app.callback(
-    Output("weather-data-store", "data"),
-    [Input("interval-component", "n_intervals")],
-    [State("weather-data-store", "data")],
-)
-def update_weather_data(n, store_data: WeatherDataStore) -> WeatherDataStore:
-    logger.debug(f"Updating data at interval {n}")
-    last_updated_at = None
-    if store_data[UPDATE_COLUMN]:
-        last_updated_at = max(store_data[UPDATE_COLUMN])
 
-    new_df = fetch_weather_data(min_updated_at=last_updated_at)
+def serve_layout() -> html.Div:
+    """Layout of a new page, prefilled from the shared window."""
+    window.start()
+    return html.Div(
+        [
+            html.H2("Live Weather Monitoring", style={"textAlign": "center"}),
+            # The Graph Component
+            html.Div(
+                dcc.Graph(
+                    id="live-weather-plot",
+                    figure=create_figure(window),
+                    style={"height": "80vh"},
+                ),
+            ),
+            # version of the newest point of the page, to resume the event stream
+            dcc.Store(id="weather-version", data=window.version),
+            # last event pushed by the server
+            dcc.Store(id="weather-event"),
+        ]
+    )
 
-    if new_df.empty:
-        logger.debug("No new data found.")
-        return store_data
 
-    logger.info(f"Fetched {len(new_df)} new records.")
+app.layout = serve_layout
 
-    updated_data = append_to_store(store_data, new_df)
-    return updated_data
 
+# --- PUSHED UPDATES ---
+# Both callbacks run in the browser: an EventSource writes each event into the
+# weather-event store, which extends the chart. Viewers cost no server callbacks.
+app.clientside_callback(
+    """
+    function (version) {
+        if (!window.weatherEvents) {
+            window.weatherEvents = new EventSource(`/events/weather?after=${version}`);
+            window.weatherEvents.addEventListener("weather", (event) => {
+                window.dash_clientside.set_props("weather-event", {data: JSON.parse(event.data)});
+            });
+        }
+    }
+    """,
+    Input("weather-version", "data"),
+)
 
-@app.callback(
+app.clientside_callback(
+    """
+    function (event) {
+        if (!event) {
+            return window.dash_clientside.no_update;
+        }
+        const traces = event.y.map((_, i) => i);
+        return [{x: event.y.map(() => event.x), y: event.y}, traces, event.max_points];
+    }
+    """,
     Output("live-weather-plot", "extendData"),
-    [Input("weather-data-store", "data")],
-    [State("live-weather-plot", "figure")],
+    Input("weather-event", "data"),
 )
-def update_graph(store_data: WeatherDataStore, existing_figure) -> ExtendDataDict:
-    # or ExtendDataDict, Optional[list[int]] , Optional[int]
-    logger.debug("Extending graph data.")
-    if not store_data[X_COLUMN]:
-        return dash.no_update
-
-    # Identify timestamps that are new (not already in the graph)
-    try:
-        existing_timestamps = set(existing_figure["data"][0][X_COLUMN])
-    except (IndexError, KeyError):
-        existing_timestamps = set()
-    
-    new_indices = [
-        i for i, x_val in enumerate(store_data[X_COLUMN])
-        if x_val not in existing_timestamps
-    ]
-
-    if not new_indices:
-        return dash.no_update
-    
-    logger.debug(f"Pushing {len(new_indices)} new points to graph.")
-
-    # Extract the data subsets based on the new indices
-    new_x = [store_data["x"][i] for i in new_indices]
-    new_y = [
-        [col_data[i] for i in new_indices] 
-        for col_data in store_data["y"]
-    ]
-
-    return {
-        "x": [new_x for _ in Y_COLUMN_NAMES],
-        "y": new_y
-    }
 
 
 # --- RUN SERVER ---
@@ -0,0 +1,296 @@
+"""Shared live weather window, refreshed once per process and pushed to viewers.
+
+Every dashboard tab used to poll the database on its own. Instead, one
+background thread per process follows the weather table through an
+(updated_at, id) cursor, keeps the latest MAX_POINTS rows in memory, and
+wakes the Server-Sent Events streams of all viewers when rows arrive. The
+database load depends on the number of processes, not of viewers.
+
+Rows are versioned by their own timestamp, in epoch milliseconds, and the
+events carry that version as their id. A browser reconnecting after the
+dashboard restarted thus resumes after the last point it has, as the
+window reloaded by the new process holds the same rows.
+
+The dashboard cannot be notified by the ETL, which runs in another process.
+The thread checks the latest (updated_at, id) of the site every few
+seconds, one lookup of its index, and fetches rows only after each ETL load.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, TypedDict
+
+import pandas as pd
+from flask import Flask, Response, request
+from loguru import logger
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+from sqlalchemy import create_engine, event, text
+
+
+UPDATE_INTERVAL_MS = int(os.getenv("DASH_UPDATE_INTERVAL_MS", 2_000))  # checks for new rows
+MAX_POINTS = int(os.getenv("DASH_MAX_POINTS", 2_000))  # points kept per trace
+INITIAL_WINDOW = timedelta(hours=int(os.getenv("DASH_INITIAL_WINDOW_HOURS", 24)))
+# longer initial windows are drawn from hourly means instead of raw rows
+ROLLUP_AFTER = timedelta(hours=int(os.getenv("DASH_ROLLUP_AFTER_HOURS", 72)))
+SITE = os.getenv("DASH_SITE", "default")
+KEEPALIVE_S = 15  # comment sent on idle event streams, so proxies keep them open
+DB_URL = os.getenv("DATABASE_URL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 10_000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 2**20))
+ENGINE = create_engine(DB_URL)
+
+
+def set_read_only_pragmas(dbapi_connection, connection_record):
+    """The ETL writes the database file in WAL mode while the dashboard reads it.
+
+    The dashboard only reads: it waits for locks instead of failing with
+    "database is locked", maps the file instead of copying it, and never
+    writes.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA query_only = ON")
+    cursor.close()
+
+
+if ENGINE.dialect.name == "sqlite":
+    event.listen(ENGINE, "connect", set_read_only_pragmas)
+
+QUERY_SECONDS = Histogram(
+    "dashboard_query_duration_seconds", "Duration of the dashboard database queries", ["query"]
+)
+
+UPDATE_COLUMN = "updated_at"
+X_COLUMN = "timestamp"
+Y_COLUMN_NAMES = ["temperature_k", "pressure_pa", "humidity_percent", "wind_speed_m_s"]
+COLUMNS = ["id", UPDATE_COLUMN, X_COLUMN] + Y_COLUMN_NAMES
+
+
+class WeatherCursor(TypedDict):
+    updated_at: str | None  # (updated_at, id) of the last row fetched
+    id: int | None
+    last_x: str | None  # latest timestamp pushed
+
+
+class WindowRow(NamedTuple):
+    version: int  # timestamp of the row, in epoch milliseconds
+    x: str
+    y: list[float]
+
+
+LATEST_ROW_QUERY = text(f"""
+    SELECT {UPDATE_COLUMN}, id FROM weather
+    WHERE site = :site
+    ORDER BY {UPDATE_COLUMN} DESC, id DESC
+    LIMIT 1
+""")
+
+INITIAL_QUERY = text(f"""
+    SELECT {", ".join(COLUMNS)} FROM weather
+    WHERE site = :site AND {X_COLUMN} >= :since
+    ORDER BY {X_COLUMN} DESC
+    LIMIT :limit
+""")
+
+INITIAL_ROLLUP_QUERY = text(f"""
+    SELECT 0 AS id, {UPDATE_COLUMN}, bucket AS {X_COLUMN},
+           {", ".join(f"{col}_mean AS {col}" for col in Y_COLUMN_NAMES)}
+    FROM weather_rollup_hourly
+    WHERE site = :site AND bucket >= :since
+    ORDER BY bucket DESC
+    LIMIT :limit
+""")
+
+# keyset on (updated_at, id): rows written since the last fetch, oldest first
+INCREMENTAL_QUERY = text(f"""
+    SELECT {", ".join(COLUMNS)} FROM weather
+    WHERE site = :site
+      AND ({UPDATE_COLUMN} > :updated_at OR ({UPDATE_COLUMN} = :updated_at AND id > :id))
+    ORDER BY {UPDATE_COLUMN}, id
+    LIMIT :limit
+""")
+
+
+def fetch_weather_data(cursor: WeatherCursor) -> tuple[pd.DataFrame, WeatherCursor]:
+    """Fetches the records written since the cursor, and the advanced cursor.
+
+    Without a cursor position, fetches the last MAX_POINTS records of the
+    initial window, or of its hourly rollup when it is longer than
+    ROLLUP_AFTER. Cursor values are bound as parameters and kept as the
+    database returns them, so comparisons match the stored format.
+    """
+    cursor = cursor.copy()
+    try:
+        with ENGINE.connect() as conn:
+            if cursor[UPDATE_COLUMN] is None:
+                logger.info(f"Initial load: Fetching last {INITIAL_WINDOW} of data")
+                since = datetime.now(timezone.utc).replace(tzinfo=None) - INITIAL_WINDOW
+                query = INITIAL_ROLLUP_QUERY if INITIAL_WINDOW > ROLLUP_AFTER else INITIAL_QUERY
+                with QUERY_SECONDS.labels(query="initial").time():
+                    df = pd.read_sql_query(
+                        query, conn, params={"site": SITE, "since": since, "limit": MAX_POINTS}
+                    )
+                    latest = conn.execute(LATEST_ROW_QUERY, {"site": SITE}).first()
+                if latest is not None:
+                    cursor[UPDATE_COLUMN], cursor["id"] = str(latest[0]), latest[1]
+            else:
+                logger.debug(f"Incremental fetch after ({cursor[UPDATE_COLUMN]}, {cursor['id']})")
+                params = {
+                    "site": SITE,
+                    "updated_at": cursor[UPDATE_COLUMN],
+                    "id": cursor["id"],
+                    "limit": MAX_POINTS,
+                }
+                with QUERY_SECONDS.labels(query="incremental").time():
+                    df = pd.read_sql_query(INCREMENTAL_QUERY, conn, params=params)
+                if not df.empty:
+                    cursor[UPDATE_COLUMN], cursor["id"] = str(df[UPDATE_COLUMN].iloc[-1]), int(df["id"].iloc[-1])
+    except Exception as e:
+        logger.error(f"Database error: {e}")
+        return pd.DataFrame(columns=COLUMNS), cursor
+
+    # timestamps are stored as UTC, in more than one text format on SQLite
+    df[X_COLUMN] = pd.to_datetime(df[X_COLUMN], format="ISO8601", utc=True).dt.tz_localize(None)
+    # rows updated after being pushed are already on the charts
+    if cursor["last_x"] is not None:
+        df = df[df[X_COLUMN] > pd.Timestamp(cursor["last_x"])]
+    df = df.sort_values(X_COLUMN)
+    if not df.empty:
+        cursor["last_x"] = df[X_COLUMN].iloc[-1].isoformat()
+    return df, cursor
+
+
+def epoch_ms(timestamps: pd.Series) -> pd.Series:
+    """Naive UTC timestamps as integer milliseconds since the epoch."""
+    return (timestamps - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)
+
+
+class WeatherWindow:
+    """Latest MAX_POINTS rows of the site, shared by all viewers of the process."""
+
+    def __init__(self, max_points: int = MAX_POINTS, interval_s: float = UPDATE_INTERVAL_MS / 1000):
+        self.max_points = max_points
+        self.interval_s = interval_s
+        self.version = 0
+        self._rows: deque[WindowRow] = deque(maxlen=max_points)
+        self._cursor: WeatherCursor = {"updated_at": None, "id": None, "last_x": None}
+        self._changed = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Load the initial window and start the refresh thread, once per process."""
+        with self._start_lock:
+            if self._thread is None:
+                self.refresh()
+                self._thread = threading.Thread(target=self._run, name="weather-window", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval_s)
+            if self.has_new_rows():
+                self.refresh()
+
+    def has_new_rows(self) -> bool:
+        """Whether rows were written after the cursor; one index lookup."""
+        try:
+            with ENGINE.connect() as conn, QUERY_SECONDS.labels(query="latest").time():
+                latest = conn.execute(LATEST_ROW_QUERY, {"site": SITE}).first()
+        except Exception as e:
+            logger.error(f"Database error: {e}")
+            return False
+        if latest is None:
+            return False
+        return (str(latest[0]), latest[1]) != (self._cursor[UPDATE_COLUMN], self._cursor["id"])
+
+    def refresh(self) -> int:
+        """Append the rows written since the last refresh, and wake the viewers."""
+        new_df, self._cursor = fetch_weather_data(self._cursor)
+        if new_df.empty:
+            return 0
+        versions = epoch_ms(new_df[X_COLUMN]).tolist()
+        x = new_df[X_COLUMN].map(pd.Timestamp.isoformat).tolist()
+        y = new_df[Y_COLUMN_NAMES].to_numpy(dtype=float).tolist()
+        with self._changed:
+            self._rows.extend(WindowRow(*row) for row in zip(versions, x, y))
+            self.version = versions[-1]  # fetched rows are newer than the window's
+            self._changed.notify_all()
+        logger.info(f"Weather window version {self.version}: {len(new_df)} new records")
+        return len(new_df)
+
+    def rows_since(self, version: int) -> list[WindowRow]:
+        """Rows newer than `version`, oldest first; O(new rows)."""
+        rows = []
+        with self._changed:
+            for row in reversed(self._rows):
+                if row.version <= version:
+                    break
+                rows.append(row)
+        return rows[::-1]
+
+    def wait(self, version: int, timeout: float) -> list[WindowRow]:
+        """Rows newer than `version`, waiting up to `timeout` seconds for some."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > version, timeout)
+        return self.rows_since(version)
+
+
+def event_payload(rows: list[WindowRow], max_points: int) -> dict:
+    return {
+        "version": rows[-1].version,
+        "x": [row.x for row in rows],
+        "y": [list(column) for column in zip(*(row.y for row in rows))],
+        "max_points": max_points,
+    }
+
+
+def iter_events(window: WeatherWindow, version: int) -> Iterator[str]:
+    while True:
+        rows = window.wait(version, KEEPALIVE_S)
+        if rows:
+            version = rows[-1].version
+            payload = json.dumps(event_payload(rows, window.max_points))
+            yield f"id: {version}\nevent: weather\ndata: {payload}\n\n"
+        else:
+            yield ": keepalive\n\n"
+
+
+def parse_version(value: str | None) -> int:
+    """Version of a Last-Event-ID or `?after=`, from the start if malformed."""
+    try:
+        return max(int(value or 0), 0)
+    except ValueError:
+        return 0
+
+
+def register_event_stream(server: Flask, window: WeatherWindow, route: str = "/events/weather") -> None:
+    """Serve the window as a Server-Sent Events stream.
+
+    Clients resume from the window version of their page (`?after=`), or
+    from the last event they received when the browser reconnects.
+    """
+
+    @server.route(route)
+    def weather_events():
+        window.start()
+        after = request.headers.get("Last-Event-ID") or request.args.get("after")
+        return Response(
+            iter_events(window, parse_version(after)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+
+def register_metrics(server: Flask, route: str = "/metrics") -> None:
+    """Serve the Prometheus metrics of this process."""
+
+    @server.route(route)
+    def metrics():
+        return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
@@ -0,0 +1,68 @@
+import os
+
+# weather_feed creates its engine from DATABASE_URL at import time
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from datetime import datetime, timedelta, timezone  # noqa: E402
+
+import pytest  # noqa: E402
+from sqlalchemy import Engine, create_engine, text  # noqa: E402
+
+import weather_feed  # noqa: E402
+
+# the columns of the backend's weather table that the dashboard reads
+WEATHER_DDL = """
+    CREATE TABLE weather (
+        id INTEGER PRIMARY KEY,
+        site VARCHAR NOT NULL,
+        timestamp DATETIME NOT NULL,
+        temperature_k FLOAT NOT NULL,
+        pressure_pa FLOAT NOT NULL,
+        humidity_percent FLOAT NOT NULL,
+        wind_speed_m_s FLOAT NOT NULL,
+        updated_at DATETIME NOT NULL
+    )
+"""
+
+
+def recent(minutes: float) -> datetime:
+    """Naive UTC time `minutes` after the start of the hour before the last."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    return now - timedelta(hours=2) + timedelta(minutes=minutes)
+
+
+def stored(value: datetime) -> str:
+    """A datetime in the text format SQLAlchemy stores on SQLite."""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def insert_weather(engine: Engine, minutes: list[float], updated_at: datetime, site: str = "default") -> None:
+    """Weather rows at `recent(minute)`, all written at `updated_at`, stored as SQLAlchemy does."""
+    rows = [
+        {
+            "site": site,
+            "timestamp": stored(recent(minute)),
+            "updated_at": stored(updated_at),
+            "wind_speed_m_s": float(minute),
+        }
+        for minute in minutes
+    ]
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO weather (site, timestamp, temperature_k, pressure_pa, "
+                "humidity_percent, wind_speed_m_s, updated_at) "
+                "VALUES (:site, :timestamp, 280.0, 101300.0, 80.0, :wind_speed_m_s, :updated_at)"
+            ),
+            rows,
+        )
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch) -> Engine:
+    """Empty weather table in a SQLite file, read by weather_feed in place of DATABASE_URL."""
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'weather.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(WEATHER_DDL))
+    monkeypatch.setattr(weather_feed, "ENGINE", engine)
+    return engine
@@ -0,0 +1,145 @@
+import json
+import threading
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+import weather_feed
+from conftest import insert_weather, recent, stored
+from weather_feed import (
+    WeatherCursor,
+    WeatherWindow,
+    fetch_weather_data,
+    iter_events,
+    parse_version,
+    register_event_stream,
+)
+
+UPDATED = datetime(2026, 1, 1, 12)
+EMPTY_CURSOR: WeatherCursor = {"updated_at": None, "id": None, "last_x": None}
+
+
+def ms(minutes: float) -> int:
+    return int(pd.Timestamp(recent(minutes)).value // 1_000_000)
+
+
+def read_event(events) -> tuple[int, dict]:
+    lines = next(events).splitlines()
+    assert lines[1] == "event: weather"
+    return int(lines[0].removeprefix("id: ")), json.loads(lines[2].removeprefix("data: "))
+
+
+def test_first_fetch_loads_the_window_and_positions_the_cursor(engine):
+    df, cursor = fetch_weather_data(EMPTY_CURSOR)
+    assert df.empty
+    assert cursor == EMPTY_CURSOR
+
+    insert_weather(engine, [10, 0, 5], UPDATED)
+    insert_weather(engine, [15], UPDATED, site="other")
+    df, cursor = fetch_weather_data(EMPTY_CURSOR)
+
+    assert df["wind_speed_m_s"].tolist() == [0.0, 5.0, 10.0]
+    assert cursor == {"updated_at": stored(UPDATED), "id": 3, "last_x": recent(10).isoformat()}
+
+
+def test_incremental_fetches_page_through_rows_written_at_the_same_time(engine, monkeypatch):
+    monkeypatch.setattr(weather_feed, "MAX_POINTS", 2)
+    insert_weather(engine, [0], UPDATED)
+    _, cursor = fetch_weather_data(EMPTY_CURSOR)
+    # one ETL run writes all of its rows with the same updated_at
+    insert_weather(engine, [5, 10, 15], UPDATED.replace(hour=13))
+    insert_weather(engine, [20], UPDATED.replace(hour=14))
+
+    pages = []
+    for _ in range(3):
+        df, cursor = fetch_weather_data(cursor)
+        pages.append(df["wind_speed_m_s"].tolist())
+
+    assert pages == [[5.0, 10.0], [15.0, 20.0], []]
+    assert (cursor["updated_at"], cursor["id"]) == (stored(UPDATED.replace(hour=14)), 5)
+
+
+def test_rows_rewritten_before_the_last_point_are_not_pushed_again(engine):
+    insert_weather(engine, [0, 5], UPDATED)
+    _, cursor = fetch_weather_data(EMPTY_CURSOR)
+    with engine.begin() as conn:  # the ETL upserts an observation it had already written
+        conn.execute(
+            text("UPDATE weather SET updated_at = :updated_at WHERE id = 1"),
+            {"updated_at": stored(UPDATED.replace(hour=13))},
+        )
+
+    df, cursor = fetch_weather_data(cursor)
+
+    assert df.empty
+    assert (cursor["updated_at"], cursor["id"]) == (stored(UPDATED.replace(hour=13)), 1)
+
+
+@pytest.mark.parametrize(
+    ("value", "version"), [("57", 57), (None, 0), ("", 0), ("abc", 0), ("-3", 0), ("1.5", 0)]
+)
+def test_malformed_versions_resume_from_the_start(value, version):
+    assert parse_version(value) == version
+
+
+def test_rows_are_versioned_by_their_timestamp(engine):
+    insert_weather(engine, [0, 5, 10], UPDATED)
+    window = WeatherWindow()
+
+    assert window.refresh() == 3
+    assert window.version == ms(10)
+    assert [row.version for row in window.rows_since(ms(0))] == [ms(5), ms(10)]
+    assert window.rows_since(window.version) == []
+
+    insert_weather(engine, [15], UPDATED.replace(hour=13))
+    assert window.refresh() == 1
+    assert [row.y[3] for row in window.rows_since(ms(10))] == [15.0]
+
+
+def test_wait_returns_when_rows_arrive(engine):
+    insert_weather(engine, [0], UPDATED)
+    window = WeatherWindow()
+    window.refresh()
+    assert window.wait(window.version, timeout=0.01) == []
+
+    version = window.version
+    insert_weather(engine, [5], UPDATED.replace(hour=13))
+    refresher = threading.Timer(0.05, window.refresh)
+    refresher.start()
+    rows = window.wait(version, timeout=5)
+    refresher.join()
+
+    assert [row.version for row in rows] == [ms(5)]
+
+
+def test_events_resume_after_the_last_point_across_restarts(engine, monkeypatch):
+    monkeypatch.setattr(weather_feed, "KEEPALIVE_S", 0.01)
+    insert_weather(engine, [0, 5, 10], UPDATED)
+    window = WeatherWindow()
+    window.refresh()
+
+    # a browser that saw the 5-minute point reconnects to a new process
+    events = iter_events(window, ms(5))
+    version, payload = read_event(events)
+    assert version == payload["version"] == ms(10)
+    assert payload["x"] == [recent(10).isoformat()]
+    assert payload["y"][3] == [10.0]
+    assert next(events) == ": keepalive\n\n"
+
+
+def test_stream_with_a_malformed_id_sends_the_whole_window(engine, monkeypatch):
+    insert_weather(engine, [0, 5], UPDATED)
+    window = WeatherWindow()
+    window.refresh()
+    monkeypatch.setattr(window, "start", lambda: None)  # no refresh thread
+    server = Flask(__name__)
+    register_event_stream(server, window)
+
+    response = server.test_client().get("/events/weather", headers={"Last-Event-ID": "x"}, buffered=False)
+    _, payload = read_event(iter(chunk.decode() for chunk in response.response))
+    response.close()
+
+    assert response.status_code == 200
+    assert len(payload["x"]) == 2